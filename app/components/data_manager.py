@@ -6,7 +6,10 @@ Manages three data categories: matching, unmatching, and manually entered data.
 
 import streamlit as st
 import pandas as pd
-from typing import Tuple, Optional
+from itertools import chain
+from typing import Callable, Tuple, Optional
+
+from app.data.bulk import BulkInsertResult, STREAM_CHUNK_SIZE
 
 
 class DataManager:
@@ -16,7 +19,13 @@ class DataManager:
     """
 
     def __init__(
-        self, key_prefix: str, expected_columns: list, conn=None, insert_func=None
+        self,
+        key_prefix: str,
+        expected_columns: list,
+        conn=None,
+        insert_func=None,
+        bulk_insert_func=None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
     ):
         """
         Initialize DataManager with column validation and database insertion support.
@@ -26,15 +35,22 @@ class DataManager:
             expected_columns: List of expected column names for validation
             conn: Database connection (optional, for inserting matching data)
             insert_func: Function to insert rows into database (optional)
+            bulk_insert_func: Function(conn, df) inserting a whole DataFrame and
+                returning a BulkInsertResult (optional, preferred over insert_func)
+            chunk_size: Rows read per CSV chunk when streaming uploads into the database
         """
         self.key_prefix = key_prefix
         self.expected_columns = expected_columns  # Required columns for validation
         self.conn = conn  # Database connection for direct insertion
         self.insert_func = insert_func  # Function to insert data into database
+        self.bulk_insert_func = bulk_insert_func  # Vectorized insert for whole uploads
+        self.last_insert_result = None  # Report of the most recent bulk insert
+        self.chunk_size = chunk_size  # Rows per streamed CSV chunk
         # Create unique session state keys for each data category
         self.matching_key = f"{key_prefix}_matching_data"
         self.unmatching_key = f"{key_prefix}_unmatching_data"
         self.manual_key = f"{key_prefix}_manual_data"
+        self.editor_version_key = f"{key_prefix}_editor_version"
 
         # Initialize session state DataFrames for each data category
         if self.matching_key not in st.session_state:
@@ -46,6 +62,9 @@ class DataManager:
         if self.manual_key not in st.session_state:
             st.session_state[self.manual_key] = pd.DataFrame()
 
+        if self.editor_version_key not in st.session_state:
+            st.session_state[self.editor_version_key] = 0
+
     def check_columns_match(self, df: pd.DataFrame) -> bool:
         """
         Check if uploaded CSV columns match expected columns.
@@ -68,15 +87,34 @@ class DataManager:
         # Compare sets to check if all columns match (order-independent)
         return set(df_cols) == set(expected_cols)
 
+    def _id_dtypes(self) -> dict:
+        """Get dtype overrides that keep ID columns as strings."""
+        id_columns = ["ticket_id", "incident_id", "dataset_id"]
+        return {col: str for col in id_columns if col in self.expected_columns}
+
     def _read_csv_file(self, uploaded_file) -> pd.DataFrame:
         """Read CSV file with proper type handling for ID columns."""
-        id_columns = ["ticket_id", "incident_id", "dataset_id"]
-        dtype_dict = {col: str for col in id_columns if col in self.expected_columns}
+        dtype_dict = self._id_dtypes()
 
         if dtype_dict:
             return pd.read_csv(uploaded_file, dtype=dtype_dict)
         return pd.read_csv(uploaded_file)
 
+    def _read_csv_chunks(self, uploaded_file):
+        """Read CSV file lazily in chunks of self.chunk_size rows."""
+        return pd.read_csv(
+            uploaded_file, dtype=self._id_dtypes() or None, chunksize=self.chunk_size
+        )
+
+    @staticmethod
+    def _upload_fraction(uploaded_file) -> float:
+        """Estimate how much of the uploaded file has been consumed (0.0 - 1.0)."""
+        try:
+            size = getattr(uploaded_file, "size", None) or 0
+            return min(uploaded_file.tell() / size, 1.0) if size else 0.0
+        except Exception:
+            return 0.0
+
     def _normalize_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize column names to match expected columns (case-insensitive)."""
         column_mapping = {}
@@ -139,8 +177,53 @@ class DataManager:
                 return col, row_dict[col]
         return None, None
 
+    def _bulk_insert_matching_rows_to_db(
+        self, df: pd.DataFrame, on_conflict: str = "skip"
+    ) -> Tuple[bool, str]:
+        """Insert matching CSV rows with the vectorized bulk path."""
+        df_normalized = self._normalize_column_names(df)
+        result = self.bulk_insert_func(self.conn, df_normalized, on_conflict=on_conflict)
+        return self._finish_bulk_insert(result)
+
+    def _finish_bulk_insert(self, result) -> Tuple[bool, str]:
+        """Store, display and summarize a bulk insert result."""
+        self.last_insert_result = result
+        self._show_insert_report(result)
+        return self._build_insert_result_message(
+            result.inserted,
+            len(result.duplicates) + result.unchanged,
+            len(result.errors),
+            result.updated,
+        )
+
+    def _show_insert_report(self, result):
+        """Show the first few duplicates/errors and the full report on demand."""
+        pk_field = next(
+            (
+                col
+                for col in ["incident_id", "ticket_id", "dataset_id"]
+                if col in self.expected_columns
+            ),
+            None,
+        )
+        for row_number, key in result.duplicates[:3]:
+            st.warning(
+                f"Row {row_number} skipped: {pk_field} '{key}' already exists"
+                if pk_field
+                else f"Row {row_number} skipped: Duplicate entry already exists"
+            )
+        for row_number, message in result.errors[:3]:
+            st.error(f"Error inserting row {row_number}: {message}")
+
+        if len(result.duplicates) + len(result.errors) > 3:
+            with st.expander("Full duplicate / error report"):
+                st.dataframe(result.to_frame(), use_container_width=True, hide_index=True)
+
     def _insert_matching_rows_to_db(self, df: pd.DataFrame) -> Tuple[bool, str]:
         """Insert matching CSV rows into database."""
+        if self.bulk_insert_func is not None:
+            return self._bulk_insert_matching_rows_to_db(df)
+
         inserted_count = 0
         error_count = 0
         skipped_count = 0
@@ -214,18 +297,20 @@ class DataManager:
             st.write(f"🔍 Debug - Processed values: {processed_values}")
 
     def _build_insert_result_message(
-        self, inserted: int, skipped: int, errors: int
+        self, inserted: int, skipped: int, errors: int, updated: int = 0
     ) -> Tuple[bool, str]:
         """Build result message for database insertion."""
         result_parts = []
         if inserted > 0:
             result_parts.append(f"Successfully inserted {inserted} row(s)")
+        if updated > 0:
+            result_parts.append(f"Updated {updated} existing row(s)")
         if skipped > 0:
             result_parts.append(f"Skipped {skipped} duplicate(s)")
         if errors > 0:
             result_parts.append(f"{errors} error(s)")
 
-        if inserted > 0:
+        if inserted > 0 or updated > 0:
             return True, ", ".join(result_parts) + "."
         elif skipped > 0 and errors == 0:
             return (
@@ -238,6 +323,54 @@ class DataManager:
                 f"Failed to insert any rows. {errors} error(s), {skipped} duplicate(s).",
             )
 
+    def _stream_csv_upload(
+        self,
+        uploaded_file,
+        progress_callback: Optional[Callable] = None,
+        on_conflict: str = "skip",
+    ) -> Tuple[bool, str]:
+        """
+        Stream a CSV upload into the database chunk by chunk.
+        Columns are validated on the first chunk; each chunk is bulk inserted as
+        soon as it is parsed, so peak memory is bounded by chunk_size.
+
+        Args:
+            uploaded_file: Streamlit uploaded file object
+            progress_callback: Optional callable(rows_processed, fraction_done)
+            on_conflict: Policy for ids that already exist (see CONFLICT_POLICIES)
+
+        Returns:
+            tuple: (success: bool, message: str) - Upload result
+        """
+        chunks = self._read_csv_chunks(uploaded_file)
+        first_chunk = next(chunks, None)
+        if first_chunk is None or first_chunk.empty:
+            return False, "Uploaded CSV is empty"
+
+        if not self.check_columns_match(first_chunk):
+            # Columns don't match - keep the whole upload for review as before
+            return self._store_unmatching_data(
+                pd.concat(chain([first_chunk], chunks), ignore_index=True)
+            )
+
+        result = BulkInsertResult()
+        rows_processed = 0
+        for chunk in chain([first_chunk], chunks):
+            chunk = self._normalize_column_names(chunk)
+            result.merge(
+                self.bulk_insert_func(
+                    self.conn,
+                    chunk,
+                    first_row_number=rows_processed + 1,
+                    on_conflict=on_conflict,
+                )
+            )
+            rows_processed += len(chunk)
+            if progress_callback is not None:
+                progress_callback(rows_processed, self._upload_fraction(uploaded_file))
+
+        return self._finish_bulk_insert(result)
+
     def _store_matching_data(self, df: pd.DataFrame) -> Tuple[bool, str]:
         """Store matching data in session state (backward compatibility)."""
         if st.session_state[self.matching_key].empty:
@@ -258,13 +391,23 @@ class DataManager:
             )
         return True, f"Columns don't match. Added {len(df)} rows to unmatching data"
 
-    def handle_csv_upload(self, uploaded_file) -> Tuple[bool, str]:
+    def handle_csv_upload(
+        self,
+        uploaded_file,
+        progress_callback: Optional[Callable] = None,
+        on_conflict: str = "skip",
+    ) -> Tuple[bool, str]:
         """
         Handle CSV file upload with validation and routing.
         Validates columns, routes to database or session state based on configuration.
+        With a bulk insert function the file is streamed in chunks instead of
+        being read into memory at once.
         
         Args:
             uploaded_file: Streamlit uploaded file object
+            progress_callback: Optional callable(rows_processed, fraction_done)
+            on_conflict: Policy for ids that already exist when inserting via the
+                bulk path - "skip", "overwrite" or "merge_newer"
             
         Returns:
             tuple: (success: bool, message: str) - Upload result
@@ -274,6 +417,12 @@ class DataManager:
             return False, "No file uploaded"
 
         try:
+            # Stream straight into the database when a bulk insert path exists
+            if self.conn is not None and self.bulk_insert_func is not None:
+                return self._stream_csv_upload(
+                    uploaded_file, progress_callback, on_conflict
+                )
+
             # Read CSV file with proper type handling
             df = self._read_csv_file(uploaded_file)
 
@@ -284,7 +433,9 @@ class DataManager:
             # Check if columns match expected structure
             if self.check_columns_match(df):
                 # Columns match - insert into database or store in session state
-                if self.conn is not None and self.insert_func is not None:
+                if self.conn is not None and (
+                    self.insert_func is not None or self.bulk_insert_func is not None
+                ):
                     # Insert directly into database
                     return self._insert_matching_rows_to_db(df)
                 else:
@@ -382,6 +533,65 @@ class DataManager:
             st.error(f"Error deleting row: {str(e)}")
             return False
 
+    def editor_key(self, name: str) -> str:
+        """
+        Get the widget key for a data editor over this manager's rows.
+        The key changes after every applied edit so the new editor starts
+        without the previous run's pending deletions and edits.
+
+        Args:
+            name: Base widget key
+        """
+        return f"{name}_{st.session_state[self.editor_version_key]}"
+
+    def _reconcile_session_rows(self, key_column: str, changes):
+        """Remove deleted keys from, and apply edits to, the matching and manual rows."""
+        edited_keys = changes.updated.index
+        for key in (self.matching_key, self.manual_key):
+            session_rows = st.session_state[key]
+            if session_rows.empty or key_column not in session_rows.columns:
+                continue
+            ids = session_rows[key_column].astype(str)
+            kept = ~ids.isin(changes.deleted)
+            session_rows = session_rows[kept].copy()
+            ids = ids[kept]
+            for col in changes.edited.columns:
+                col_keys = edited_keys[changes.edited[col].to_numpy()]
+                rows = ids.isin(col_keys)
+                if rows.any():
+                    if col not in session_rows.columns:
+                        session_rows[col] = None
+                    session_rows[col] = session_rows[col].astype(object)
+                    session_rows.loc[rows, col] = ids[rows].map(changes.updated[col])
+            st.session_state[key] = session_rows.reset_index(drop=True)
+
+    def apply_editor_changes(
+        self, reconciler, shown: pd.DataFrame, edited: pd.DataFrame
+    ) -> Tuple[int, int]:
+        """
+        Persist row deletions and cell edits made in a data editor.
+        Rows are matched by primary key; database rows are deleted/updated in
+        one transaction and session rows are changed in place.
+
+        Args:
+            reconciler: EditorReconciler for the table behind the editor
+            shown: Rows passed to the editor
+            edited: Rows returned by the editor
+
+        Returns:
+            tuple: (rows deleted, rows edited)
+        """
+        changes = reconciler.diff(shown, edited)
+        if changes.is_empty():
+            return 0, 0
+
+        self._reconcile_session_rows(reconciler.key_column, changes)
+        if self.conn is not None:
+            reconciler.apply(self.conn, changes)
+        # Start the next editor from the saved state
+        st.session_state[self.editor_version_key] += 1
+        return len(changes.deleted), len(changes.updated)
+
     def get_matching_data(self) -> pd.DataFrame:
         """Get matching data."""
         return st.session_state[self.matching_key]
@@ -399,18 +609,39 @@ class DataManager:
         # This should be called with original data from outside
         pass
 
-    def combine_with_original(self, original_df: pd.DataFrame) -> pd.DataFrame:
-        """Combine original data with matching and manual data."""
-        combined = original_df.copy()
+    def combine_with_original(
+        self, original_df: pd.DataFrame, row_filter=None
+    ) -> pd.DataFrame:
+        """
+        Combine original data with matching and manual data.
 
-        if not st.session_state[self.matching_key].empty:
-            combined = pd.concat(
-                [combined, st.session_state[self.matching_key]], ignore_index=True
-            )
+        Args:
+            original_df: Rows from the database (already filtered if row_filter is set)
+            row_filter: FilterSpec applied to the session rows (optional)
+        """
+        combined = original_df.copy()
 
-        if not st.session_state[self.manual_key].empty:
-            combined = pd.concat(
-                [combined, st.session_state[self.manual_key]], ignore_index=True
-            )
+        session_rows = self.get_session_rows(row_filter)
+        if not session_rows.empty:
+            combined = pd.concat([combined, session_rows], ignore_index=True)
 
         return combined
+
+    def get_session_rows(self, row_filter=None) -> pd.DataFrame:
+        """
+        Get matching and manual rows held in the session.
+
+        Args:
+            row_filter: FilterSpec applied to the rows (optional)
+        """
+        frames = []
+        for key in (self.matching_key, self.manual_key):
+            session_rows = st.session_state[key]
+            if row_filter is not None:
+                session_rows = row_filter.apply(session_rows)
+            if not session_rows.empty:
+                frames.append(session_rows)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,68 @@
+"""
+Description Search Component Module
+Search box that finds incidents or tickets by the text of their description.
+Searches run against the full-text index (see app.data.search), so results
+are ranked by relevance and show a snippet of the matching text.
+"""
+
+import sqlite3
+
+import streamlit as st
+
+from app.data.search import SEARCH_LIMIT, DescriptionSearch
+
+
+class DescriptionSearchBox:
+    """
+    Text input plus ranked results for one table's descriptions.
+    """
+
+    def __init__(self, key_prefix, table, label="Search descriptions", limit=SEARCH_LIMIT):
+        """
+        Initialize DescriptionSearchBox.
+
+        Args:
+            key_prefix: Prefix for widget keys (ensures uniqueness)
+            table: Table to search (cyber_incidents or it_tickets)
+            label: Label of the search box
+            limit: Most results shown
+        """
+        self.key_prefix = key_prefix
+        self.table = table
+        self.label = label
+        self.limit = limit
+
+    def render(self, conn):
+        """
+        Show the search box and, once something is typed, the best matches.
+
+        Args:
+            conn: SQLite database connection object
+
+        Returns:
+            pd.DataFrame: Results shown (best first), or None without a search
+        """
+        text = st.text_input(
+            self.label,
+            key=f"{self.key_prefix}_description_search",
+            placeholder="e.g. phishing email, password reset",
+        )
+        if not text.strip():
+            return None
+
+        search = DescriptionSearch(conn, self.table)
+        try:
+            total = search.count(text)
+            hits = search.search(text, self.limit)
+        except sqlite3.Error as e:
+            st.warning(f"Search unavailable: {str(e)[:100]}")
+            return None
+
+        if hits.empty:
+            st.info(f"No descriptions match '{text}'.")
+            return hits
+
+        st.caption(f"{total:,} matching descriptions · best {len(hits)} shown")
+        for _, hit in hits.iterrows():
+            st.markdown(f"**{hit[search.key_column]}** · {hit['status']} — {hit['snippet']}")
+        return hits
@@ -21,7 +21,8 @@ def draggable_chatbox(
 
     Args:
         title: Title for the chatbox
-        context_df: Main combined DataFrame (database + matching + manual)
+        context_df: Main combined DataFrame (database + matching + manual), or a
+            function returning it (called only when a message is submitted)
         role_hint: Hint about the data type (cyber_incident, it_ticket, dataset)
         unmatching_df: Unmatching uploaded data (separate DataFrame)
     """
@@ -283,6 +284,9 @@ def draggable_chatbox(
     if user_input:
         # Add user message to chat history
         st.session_state[chat_key].append({"role": "user", "content": user_input})
+        # Load the context data only now that it is needed
+        if callable(context_df):
+            context_df = context_df()
         # Generate AI response using context data and role hint
         ai_response = generate_response(
             user_input, context_df, role_hint, unmatching_df
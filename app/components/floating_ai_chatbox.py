@@ -9,6 +9,15 @@ import pandas as pd
 import google.generativeai as genai
 # Chat history persistence manager
 from app.data.chat_history import ChatHistory
+from app.data.llm_cache import response_cache
+from app.services.conversation_memory import conversation_memory
+from app.services.prompt_budget import (
+    DEFAULT_TOKEN_BUDGET,
+    HISTORY_SHARE,
+    MINIMAL_TOKEN_BUDGET,
+    ContextBudgeter,
+)
+from app.services.retrieval import relevant_rows
 
 
 class FloatingAIChatbox:
@@ -168,7 +177,7 @@ class FloatingAIChatbox:
                     key=f"{self.chat_key}_clear",
                 ):
                     st.session_state[self.state_key] = []
-                    self.chat_history.save_chat([], f"{self.user_id}_{self.chat_key}")
+                    self.chat_history.clear_chat(f"{self.user_id}_{self.chat_key}")
                     st.rerun()
 
                 # Minimal mode toggle to reduce API usage (defaults to True)
@@ -221,31 +230,29 @@ class FloatingAIChatbox:
         pass
 
     def get_all_data_context(self):
-        """Combine all data sources for AI context."""
-        all_data = {}
-
-        if self.df is not None and not self.df.empty:
-            all_data["original_data"] = self.df.to_dict(orient="records")
-
-        if self.matching_df is not None and not self.matching_df.empty:
-            all_data["uploaded_matching_data"] = self.matching_df.to_dict(
-                orient="records"
-            )
-
-        if self.unmatching_df is not None and not self.unmatching_df.empty:
-            all_data["uploaded_unmatching_data"] = self.unmatching_df.to_dict(
-                orient="records"
-            )
-
-        if self.manual_data is not None and not self.manual_data.empty:
-            all_data["manually_added_data"] = self.manual_data.to_dict(orient="records")
+        """
+        Collect the non-empty data sources for AI context.
+        Frames are returned as they are; the prompt budget decides how much
+        of each is described (see generate_ai_response).
 
-        return all_data
+        Returns:
+            dict: Source name -> DataFrame
+        """
+        sources = {
+            "original_data": self.df,
+            "uploaded_matching_data": self.matching_df,
+            "uploaded_unmatching_data": self.unmatching_df,
+            "manually_added_data": self.manual_data,
+        }
+        return {
+            name: df
+            for name, df in sources.items()
+            if isinstance(df, pd.DataFrame) and not df.empty
+        }
 
     def generate_ai_response(self, user_message: str) -> str:
         """Generate AI response using Gemini with retry logic and quota handling."""
         import time
-        import json
         import re
 
         # Get model and temperature from sidebar controls
@@ -282,84 +289,61 @@ class FloatingAIChatbox:
         # Check if we should use minimal mode (metadata only, not full data) to reduce quota usage
         use_minimal_mode = st.session_state.get(f"{self.chat_key}_minimal_mode", False)
 
-        # Get all data context
-        all_data = self.get_all_data_context()
+        # Fit instructions, recent turns and data into the token budget
+        # (minimal mode uses a smaller budget: mostly structure and aggregates)
+        budgeter = ContextBudgeter(
+            MINIMAL_TOKEN_BUDGET if use_minimal_mode else DEFAULT_TOKEN_BUDGET
+        )
+        conversation = "You are a helpful AI assistant. Answer questions about the data clearly and concisely (not JSON).\n\n"
+        question = f"User: {user_message}\n"
+        budgeter.spend(conversation + question + "Assistant:")
+
+        # Earlier turns (the current question is already the last message):
+        # a rolling summary of older ones, then the most recent verbatim
+        history = st.session_state[self.state_key]
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == user_message:
+            history = history[:-1]
+        conversation += conversation_memory.history_context(
+            budgeter,
+            f"{self.user_id}_{self.chat_key}",
+            history,
+            limit=budgeter.share(HISTORY_SHARE),
+        )
+        conversation += question
 
-        # Build context text - limit size aggressively to speed up responses
+        # Split what is left evenly between the data sources; a source with
+        # records the retrieval index finds relevant sends only those
+        all_data = self.get_all_data_context()
         context_text = ""
         if all_data:
-            if use_minimal_mode:
-                # Minimal mode: Send only metadata (column names, types, 1-2 sample rows) so AI can still answer questions
-                minimal_metadata = {}
-                for key, value in all_data.items():
-                    if isinstance(value, list) and len(value) > 0:
-                        # Get column names from first row
-                        if len(value) > 0:
-                            first_row = value[0]
-                            if isinstance(first_row, dict):
-                                columns = list(first_row.keys())
-                                # Send only 1 sample row (further reduced for quota) for structure reference
-                                sample_rows = value[:1]  # Only 1 row instead of 2
-                                minimal_metadata[key] = {
-                                    "columns": columns,
-                                    "total_rows": len(value),
-                                    "sample_data": sample_rows,  # Just 1 row for structure
-                                }
-                            else:
-                                minimal_metadata[key] = {
-                                    "total_rows": len(value),
-                                    "sample_data": value[:1],
-                                }
-                        else:
-                            minimal_metadata[key] = {"total_rows": 0}
-                    else:
-                        minimal_metadata[key] = value
-
-                # Use compact JSON format - even more compact to reduce tokens
-                context_text = f"\n\nDB:\n{json.dumps(minimal_metadata, indent=0, separators=(',', ':'), default=str)}\n\n"
-            else:
-                # Full mode: Send more data but still limited
-                limited_data = {}
-                total_rows = 0
-                for key, value in all_data.items():
-                    if isinstance(value, list):
-                        # Only send first 3 rows to minimize token usage
-                        if len(value) > 3:
-                            limited_data[key] = value[:3]
-                            limited_data[f"{key}_total_count"] = len(value)
-                            total_rows += 3
-                        else:
-                            limited_data[key] = value
-                            total_rows += len(value)
-                    else:
-                        limited_data[key] = value
-
-                # Only include data if total rows are reasonable (less than 15 rows total)
-                if total_rows < 15:
-                    # Use compact JSON format (no indentation) to reduce token count
-                    context_text = f"\n\nData:\n{json.dumps(limited_data, indent=0, separators=(',', ':'), default=str)}\n\n"
-                else:
-                    # Too much data - just provide summary
-                    context_text = f"\n\nData summary: {len(all_data)} data sources available with {total_rows} total rows.\n\n"
-
-        # Build conversation history - keep it very concise for fastest responses
-        conversation = "You are a helpful AI assistant. Answer questions about the data clearly and concisely (not JSON).\n\n"
-
-        # Add only the last message (if any) to reduce tokens
-        recent_messages = st.session_state[self.state_key][-1:]  # Only last message
-        for msg in recent_messages:
-            role = "User" if msg["role"] == "user" else "Assistant"
-            # Truncate long messages to keep context small
-            content = (
-                msg["content"][:100] if len(msg["content"]) > 100 else msg["content"]
-            )
-            conversation += f"{role}: {content}\n"
-
-        conversation += f"User: {user_message}\n"
+            per_source = budgeter.remaining // len(all_data)
+            parts = []
+            for name, df in all_data.items():
+                focus = relevant_rows(df, user_message)
+                parts.append(
+                    budgeter.frame_context(
+                        df, label=name, focus=focus, limit=per_source, spread=len(focus) == 0
+                    )
+                )
+            context_text = "\n\n" + "\n".join(part for part in parts if part) + "\n"
         if context_text:
             conversation += context_text
         conversation += "Assistant:"
 
+        # Same question about the same data: answer from the response cache
+        # (from whichever model answered it before, in order of preference);
+        # the key leaves out the chat history so repeated questions hit
+        cache_keys = {
+            model_name: response_cache.key(
+                model_name, temperature, user_message, context_text
+            )
+            for model_name in models_to_try
+        }
+        for model_name in models_to_try:
+            cached = response_cache.get(cache_keys[model_name])
+            if cached is not None:
+                return cached
+
         # Try each model - no blocking waits (Streamlit doesn't handle long sleeps well)
         last_error = None
         retry_time = None
@@ -383,12 +367,16 @@ class FloatingAIChatbox:
                     # Re-raise to be caught by outer try-except
                     raise api_error
                 # Safely extract text from response
+                text = None
                 if hasattr(response, "text") and response.text:
-                    return response.text
+                    text = response.text
                 elif hasattr(response, "candidates") and response.candidates:
                     # Try to get text from candidates
                     if response.candidates[0].content.parts:
-                        return response.candidates[0].content.parts[0].text
+                        text = response.candidates[0].content.parts[0].text
+                if text:
+                    response_cache.put(cache_keys[model_name], model_name, text)
+                    return text
                 # Fallback
                 return (
                     str(response) if response else "⚠️ Error: Invalid response from API"
@@ -0,0 +1,146 @@
+"""
+Paginated Grid Component Module
+Sort and page controls for browsing a table one page at a time.
+Pages come from a KeysetPaginator, so sorting happens in SQL and only the
+visible rows are read and sent to the browser.
+"""
+
+import streamlit as st
+
+from app.data.pagination import DEFAULT_PAGE_SIZE
+
+# Page sizes offered in the grid controls
+PAGE_SIZES = [50, DEFAULT_PAGE_SIZE, 250, 500]
+
+
+class PaginatedGrid:
+    """
+    Keeps a grid's sort order and page position in session state.
+    The cursors of the pages visited so far are stored as a stack: Next
+    pushes the current page's end cursor and Previous pops it, so moving
+    back never re-counts rows the way OFFSET would.
+    """
+
+    def __init__(self, key_prefix, paginator, default_sort=None, descending=True):
+        """
+        Initialize PaginatedGrid.
+
+        Args:
+            key_prefix: Prefix for session state and widget keys (ensures uniqueness)
+            paginator: KeysetPaginator over the table
+            default_sort: Initial sort column (defaults to the first sort column)
+            descending: Initial sort direction
+        """
+        self.key_prefix = key_prefix
+        self.paginator = paginator
+        self.default_sort = default_sort or paginator.sort_columns[0]
+        self.default_descending = descending
+        self.cursors_key = f"{key_prefix}_page_cursors"
+        self.signature_key = f"{key_prefix}_page_signature"
+        self.version_key = f"{key_prefix}_page_version"
+        self.first_row = 1  # Position of the page's first row (set by render)
+
+        if self.cursors_key not in st.session_state:
+            st.session_state[self.cursors_key] = [None]
+        if self.version_key not in st.session_state:
+            st.session_state[self.version_key] = 0
+
+    @property
+    def page_number(self) -> int:
+        """1-based number of the page being shown."""
+        return len(st.session_state[self.cursors_key])
+
+    @property
+    def editor_key(self) -> str:
+        """Widget key for an editor over the page (changes whenever the page does)."""
+        return f"{self.key_prefix}_editor_{st.session_state[self.version_key]}"
+
+    def _move(self, cursors):
+        """Replace the cursor stack and start a fresh editor for the new page."""
+        st.session_state[self.cursors_key] = cursors
+        st.session_state[self.version_key] += 1
+
+    def _render_sort_controls(self):
+        """
+        Show sort column, direction and page size selectors.
+
+        Returns:
+            tuple: (sort column, descending, page size)
+        """
+        columns = list(self.paginator.sort_columns)
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            sort_by = st.selectbox(
+                "Sort by",
+                columns,
+                index=columns.index(self.default_sort),
+                key=f"{self.key_prefix}_sort_by",
+            )
+        with col2:
+            direction = st.selectbox(
+                "Order",
+                ["Descending", "Ascending"],
+                index=0 if self.default_descending else 1,
+                key=f"{self.key_prefix}_sort_order",
+            )
+        with col3:
+            page_size = st.selectbox(
+                "Rows per page",
+                PAGE_SIZES,
+                index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                key=f"{self.key_prefix}_page_size",
+            )
+        return sort_by, direction == "Descending", page_size
+
+    def render(self, conn, spec=None):
+        """
+        Show the controls and read the current page.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec applied to every page (optional)
+
+        Returns:
+            pd.DataFrame: Rows of the current page
+        """
+        sort_by, descending, page_size = self._render_sort_controls()
+
+        # A different filter or ordering invalidates every stored cursor
+        signature = (repr(spec.conditions) if spec else "", sort_by, descending, page_size)
+        if st.session_state.get(self.signature_key) != signature:
+            st.session_state[self.signature_key] = signature
+            self._move([None])
+
+        cursors = st.session_state[self.cursors_key]
+        page, next_cursor = self.paginator.page(
+            conn, spec, sort_by, descending, cursors[-1], page_size
+        )
+        total = self.paginator.count(conn, spec)
+
+        self.first_row = first_row = (self.page_number - 1) * page_size + 1
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            if st.button(
+                "◀ Previous",
+                key=f"{self.key_prefix}_prev_page",
+                disabled=self.page_number == 1,
+            ):
+                self._move(cursors[:-1])
+                st.rerun()
+        with col2:
+            if page.empty:
+                st.caption(f"Page {self.page_number} · no rows")
+            else:
+                st.caption(
+                    f"Page {self.page_number} · rows {first_row:,}–"
+                    f"{first_row + len(page) - 1:,} of {total:,}"
+                )
+        with col3:
+            if st.button(
+                "Next ▶",
+                key=f"{self.key_prefix}_next_page",
+                disabled=next_cursor is None,
+            ):
+                self._move(cursors + [next_cursor])
+                st.rerun()
+        return page
@@ -0,0 +1,90 @@
+"""
+Pending Reply Component Module
+Shows an AI reply that the background LLM executor is still working on.
+A fragment reruns on a timer to poll the request, so the page never sleeps:
+it streams the reply in as it arrives, counts down quota backoffs, and
+stays usable the whole time.
+"""
+
+import streamlit as st
+
+
+# Seconds between polls of a pending request
+POLL_INTERVAL = 0.5
+
+
+class PendingReply:
+    """
+    Tracks one in-flight LLMRequest in session state and renders its progress.
+    The page calls start() after submitting and render() on every run; once
+    the request finishes, render() hands it to the page's finish callback
+    and reruns the app so the reply shows up in the chat history.
+    """
+
+    def __init__(self, key, bubble_class="bubble-ai"):
+        """
+        Initialize PendingReply.
+
+        Args:
+            key: Session state key holding the pending request (ensures uniqueness)
+            bubble_class: CSS class of the reply bubble
+        """
+        self.key = key
+        self.bubble_class = bubble_class
+
+    def start(self, request, **context):
+        """
+        Remember a submitted request.
+
+        Args:
+            request: LLMRequest from the executor
+            **context: Values the finish callback needs (cache key, model, ...)
+        """
+        st.session_state[self.key] = {"request": request, **context}
+
+    def is_pending(self):
+        """Check whether a request is in flight."""
+        return self.key in st.session_state
+
+    def _show_progress(self, request):
+        """Render the text received so far, or what the request is waiting for."""
+        if request.status == "waiting":
+            seconds = int(request.seconds_until_retry()) + 1
+            if request.error is not None:
+                st.info(
+                    f"⏳ Quota limit reached. Retrying in {seconds} seconds "
+                    f"(attempt {request.attempts + 1})..."
+                )
+            else:
+                st.info(f"⏳ Waiting for API capacity ({seconds}s)...")
+        text = request.text.replace("\n", "<br>") if request.text else ""
+        st.markdown(
+            f"<div class='{self.bubble_class}'>{text}<span class='typing-cursor'></span></div>",
+            unsafe_allow_html=True,
+        )
+
+    def render(self, on_finish):
+        """
+        Poll the pending request (if any) until it finishes.
+
+        Args:
+            on_finish: Called once with (request, context dict) when the request
+                is done or failed; it should store the reply in the chat history
+        """
+        if not self.is_pending():
+            return
+
+        @st.fragment(run_every=POLL_INTERVAL)
+        def poll():
+            pending = st.session_state.get(self.key)
+            if pending is None:
+                return
+            request = pending["request"]
+            if request.done():
+                del st.session_state[self.key]
+                context = {k: v for k, v in pending.items() if k != "request"}
+                on_finish(request, context)
+                st.rerun()
+            self._show_progress(request)
+
+        poll()
@@ -7,6 +7,8 @@ import streamlit as st
 from pathlib import Path
 import base64
 
+from app.data.chat_buffer import flush_chats
+
 
 def to_base64(path):
     """
@@ -306,6 +308,11 @@ class Sidebar:
         """
         # Check if logout was triggered via query parameter
         if st.query_params.get("logout"):
+            # Session ends: write the user's buffered chat messages now
+            try:
+                flush_chats()
+            except Exception:
+                pass  # Still pending; the background flusher retries
             # Clear authentication and user data from session
             st.session_state.logged_in = False
             st.session_state.username = None
@@ -8,9 +8,17 @@ Uses rule-based pattern matching and data analysis instead of external AI APIs.
 import streamlit as st
 import pandas as pd
 import re
+import sqlite3
 from datetime import datetime
 import numpy as np
 
+from app.data.db import DB_PATH, get_pool
+from app.data.search import SEARCH_COLUMNS, DescriptionSearch
+from app.data.timestamps import to_datetime64
+
+# Database table behind each role hint (for full-text search of descriptions)
+ROLE_TABLES = {"cyber_incident": "cyber_incidents", "it_ticket": "it_tickets"}
+
 
 def simple_ai_chat(
     title="AI Assistant", context_df=None, role_hint=None, unmatching_df=None
@@ -564,36 +572,64 @@ def handle_comprehensive_search(user_input, df, columns, mentioned_cols, role_hi
     if not search_terms:
         return "Please provide specific search terms. For example: 'Find incidents with high severity'"
 
+    pattern = "|".join(search_terms)
+
+    # Descriptions of database rows are searched through the full-text index
+    # (ranked, with snippets); rows without a key (e.g. unmatching uploads)
+    # still have their description scanned
+    table = ROLE_TABLES.get(role_hint)
+    key_column = SEARCH_COLUMNS[table][0] if table else None
+    ranks = None
+    snippets = {}
+    if key_column in df.columns and "description" in df.columns:
+        try:
+            with get_pool(DB_PATH).connection() as conn:
+                search = DescriptionSearch(conn, table)
+                keys = search.matching_keys(" ".join(search_terms))
+                hits = search.search(" ".join(search_terms), limit=10)
+            ranks = df[key_column].astype(str).map({str(key): i for i, key in enumerate(keys)})
+            if not hits.empty:
+                snippets = dict(zip(hits[key_column].astype(str), hits["snippet"]))
+        except sqlite3.Error:
+            ranks = None  # No index (e.g. database not migrated): scan instead
+
+    mask = pd.Series(False, index=df.index)
+    if ranks is not None:
+        mask |= ranks.notna()
+
     # Search across all text columns (including unmatching data columns)
-    text_columns = [col for col in columns if df[col].dtype == "object"]
-    matches = pd.DataFrame()
+    text_columns = [
+        col
+        for col in columns
+        if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])
+    ]
 
     for col in text_columns:
         # Search in this column, handling NaN values properly
         try:
-            mask = (
-                df[col]
-                .astype(str)
-                .str.lower()
-                .str.contains("|".join(search_terms), case=False, na=False, regex=True)
-            )
-            if mask.any():
-                # Get matching rows
-                matching_rows = df[mask].copy()
-                matches = pd.concat([matches, matching_rows], ignore_index=True)
+            values = df[col]
+            if col == "description" and ranks is not None:
+                values = values[df[key_column].isna()]
+            # Match each distinct value once rather than every row
+            text = values.astype(str)
+            distinct = pd.Series(text.unique())
+            found = distinct[distinct.str.contains(pattern, case=False, na=False, regex=True)]
+            if not found.empty:
+                mask |= text.isin(found).reindex(df.index, fill_value=False)
         except Exception:
             # Skip columns that can't be searched (e.g., complex types)
             continue
 
-    # Remove duplicates (based on all columns)
-    if not matches.empty:
-        matches = matches.drop_duplicates()
+    matches = df[mask]
+    if ranks is not None and not matches.empty:
+        # Best full-text matches first
+        matches = matches.iloc[np.argsort(ranks[mask].fillna(len(df)).to_numpy(), kind="stable")]
 
     if not matches.empty:
         response = f"🔍 **Found {len(matches)} matching records:**\n\n"
 
         # Show key information for each match (limit to 10)
-        for idx, row in matches.head(10).iterrows():
+        for number, (idx, row) in enumerate(matches.head(10).iterrows(), start=1):
             # Show primary key or first few columns
             key_info = []
             for col in columns[:5]:  # Show first 5 columns
@@ -601,8 +637,12 @@ def handle_comprehensive_search(user_input, df, columns, mentioned_cols, role_hi
                 if pd.notna(val) and str(val).strip():
                     key_info.append(f"{col}: {val}")
 
-            response += f"**Record {idx + 1}:**\n"
-            response += " - ".join(key_info[:3]) + "\n\n"
+            response += f"**Record {number}:**\n"
+            response += " - ".join(key_info[:3]) + "\n"
+            snippet = snippets.get(str(row.get(key_column)))
+            if snippet:
+                response += f"> {snippet}\n"
+            response += "\n"
 
         if len(matches) > 10:
             response += f"... and {len(matches) - 10} more results.\n"
@@ -780,7 +820,7 @@ def handle_comprehensive_trend(user_input, df, columns, mentioned_cols, role_hin
 
     if date_cols:
         date_col = date_cols[0]
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+        df[date_col] = to_datetime64(df[date_col])
         df_sorted = df.sort_values(date_col, na_position="last")
 
         response = "📈 **Trend Analysis:**\n\n"
@@ -0,0 +1,364 @@
+"""
+Bulk Insert Module
+Vectorized ingestion path for incidents, tickets and dataset metadata.
+Converts column types with pandas, inserts with executemany in one
+transaction per chunk and reports duplicate and failed rows individually.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.data.cache import invalidate_tables
+from app.data.delta import ChangeLog
+from app.data.schema import EPOCH_COLUMNS
+from app.data.timestamps import STORED_FORMAT, normalize_text, to_datetime64
+
+
+# Rows written per transaction
+BULK_CHUNK_SIZE = 5000
+
+# Rows parsed per CSV chunk when streaming a file (bounds peak memory)
+STREAM_CHUNK_SIZE = 50000
+
+# SQLite limits host parameters per statement; stay well below it for IN (...) lookups
+_LOOKUP_BATCH_SIZE = 500
+
+# Values treated as a missing primary key (matches ITTicket.save behaviour)
+_MISSING_KEY_VALUES = ["", "none", "nan"]
+
+# What to do when an uploaded row's primary key already exists
+CONFLICT_POLICIES = {
+    "skip": "Skip existing records",
+    "overwrite": "Overwrite existing records",
+    "merge_newer": "Update only if the upload is newer",
+}
+
+
+class BulkInsertResult:
+    """
+    Outcome of a bulk insert.
+    Tracks inserted/updated row counts plus per-row duplicate and error reports,
+    where row numbers are 1-based positions in the uploaded file.
+    """
+
+    def __init__(self):
+        """Initialize an empty result."""
+        self.inserted = 0
+        self.updated = 0  # Existing rows replaced by overwrite / merge_newer
+        self.unchanged = 0  # Existing rows kept because the upload was not newer
+        self.duplicates = []  # (row_number, primary key value)
+        self.errors = []  # (row_number, error message)
+
+    def merge(self, other):
+        """
+        Add another result (e.g. from the next streamed chunk) into this one.
+
+        Args:
+            other: BulkInsertResult to fold in
+
+        Returns:
+            BulkInsertResult: self, for chaining
+        """
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.duplicates.extend(other.duplicates)
+        self.errors.extend(other.errors)
+        return self
+
+    def to_frame(self):
+        """
+        Get duplicate and error reports as one DataFrame.
+
+        Returns:
+            pd.DataFrame: Columns row, type, detail (sorted by row)
+        """
+        records = [
+            {"row": row, "type": "duplicate", "detail": f"'{key}' already exists"}
+            for row, key in self.duplicates
+        ] + [{"row": row, "type": "error", "detail": msg} for row, msg in self.errors]
+        return pd.DataFrame(records, columns=["row", "type", "detail"]).sort_values(
+            "row", ignore_index=True
+        )
+
+
+class BulkInserter:
+    """
+    Inserts DataFrames into one table using column-wise conversion and executemany.
+    The column specification mirrors the model's save() so bulk and single-row
+    inserts store identical values.
+    """
+
+    def __init__(
+        self,
+        conn,
+        table,
+        key_column,
+        column_sql,
+        id_factory,
+        timestamp_columns=(),
+        float_columns=(),
+        integer_columns=(),
+        version_column=None,
+    ):
+        """
+        Initialize BulkInserter.
+
+        Args:
+            conn: SQLite database connection object
+            table: Target table name
+            key_column: Primary key column
+            column_sql: Ordered dict of column -> SQL value expression using one "?"
+            id_factory: Callable(count) returning new primary keys for rows without one
+            timestamp_columns: Columns normalized to "%Y-%m-%d %H:%M:%S" text (epoch
+                numbers and other date formats included; unparseable text is kept)
+            float_columns: Columns coerced to floats (invalid values become NULL)
+            integer_columns: Columns coerced to integers (invalid values become NULL)
+            version_column: Column compared by the merge_newer policy (optional;
+                compared through its epoch-millisecond column when it has one)
+        """
+        self.conn = conn
+        self.table = table
+        self.key_column = key_column
+        self.column_sql = column_sql
+        self.id_factory = id_factory
+        self.timestamp_columns = timestamp_columns
+        self.float_columns = float_columns
+        self.integer_columns = integer_columns
+        self.version_column = version_column
+        table_column, epoch_column = EPOCH_COLUMNS.get(table, (None, None))
+        self.version_epoch_column = epoch_column if table_column == version_column else None
+
+        columns = ", ".join(column_sql)
+        values = ", ".join(column_sql.values())
+        self.insert_sql = f"INSERT INTO {table} ({columns}) VALUES ({values})"
+
+    # ---------------- CONVERSION ----------------
+    @staticmethod
+    def _text(series):
+        """Convert a column to stripped text with empty strings as missing."""
+        text = series.astype("string").str.strip()
+        return text.mask(text == "")
+
+    def prepare(self, df):
+        """
+        Convert an upload to insertable columns in a vectorized pass.
+
+        Args:
+            df: Uploaded rows (extra columns are ignored, missing ones become NULL)
+
+        Returns:
+            pd.DataFrame: Rows with exactly the insert columns, in insert order
+        """
+        prepared = df.reindex(columns=list(self.column_sql))
+
+        # Primary key: stripped text; generate ids where missing/placeholder
+        keys = prepared[self.key_column].astype("string").str.strip()
+        missing = keys.isna() | keys.str.lower().isin(_MISSING_KEY_VALUES)
+        if missing.any():
+            keys[missing] = pd.Series(
+                self.id_factory(int(missing.sum())),
+                index=keys.index[missing],
+                dtype="string",
+            )
+        prepared[self.key_column] = keys
+
+        for col in self.timestamp_columns:
+            prepared[col] = normalize_text(self._text(prepared[col]), STORED_FORMAT)
+
+        for col in self.float_columns:
+            prepared[col] = pd.to_numeric(prepared[col], errors="coerce")
+
+        for col in self.integer_columns:
+            prepared[col] = pd.to_numeric(prepared[col], errors="coerce").round().astype(
+                "Int64"
+            )
+
+        return prepared
+
+    @staticmethod
+    def _to_records(frame):
+        """Convert a prepared frame to tuples of native Python values (NULL for missing)."""
+        values = frame.astype(object).where(frame.notna(), None)
+        return list(values.itertuples(index=False, name=None))
+
+    def _existing_keys(self, keys):
+        """
+        Look up which keys already exist in the table.
+
+        Args:
+            keys: Candidate primary key values
+
+        Returns:
+            set: Keys already present
+        """
+        existing = set()
+        for start in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+            batch = keys[start : start + _LOOKUP_BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self.conn.execute(
+                f"SELECT {self.key_column} FROM {self.table} "
+                f"WHERE {self.key_column} IN ({placeholders})",
+                batch,
+            ).fetchall()
+            existing.update(row[0] for row in rows)
+        return existing
+
+    # ---------------- INSERTING ----------------
+    def _write_sql(self, policy):
+        """
+        Build the INSERT statement for a conflict policy.
+
+        Args:
+            policy: One of CONFLICT_POLICIES
+
+        Returns:
+            str: INSERT ... ON CONFLICT statement
+        """
+        if policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {policy}")
+
+        conflict = f" ON CONFLICT({self.key_column})"
+        if policy == "skip":
+            return self.insert_sql + conflict + " DO NOTHING"
+
+        updates = ", ".join(
+            f"{col} = excluded.{col}" for col in self.column_sql if col != self.key_column
+        )
+        sql = self.insert_sql + conflict + f" DO UPDATE SET {updates}"
+        if policy == "merge_newer":
+            # Compare the upload's own version value, bound after the insert
+            # values (see _version_params): excluded.{version} holds the column
+            # default when the upload has none, which would always look newer
+            version = f"?{len(self.column_sql) + 1}"
+            existing = f"{self.table}.{self.version_epoch_column or self.version_column}"
+            # Only replace when the incoming row is strictly newer (NULL counts as
+            # oldest, so rows without a version never replace anything)
+            sql += (
+                f" WHERE {version} IS NOT NULL"
+                f" AND ({existing} IS NULL OR {version} > {existing})"
+            )
+        return sql
+
+    def _version_params(self, frame):
+        """
+        Get the merge_newer comparison value of each row: epoch milliseconds
+        (matching the table's generated column) or the version text itself.
+
+        Args:
+            frame: Prepared rows
+
+        Returns:
+            list: One value per row (None when the row has no version)
+        """
+        versions = frame[self.version_column]
+        if self.version_epoch_column is None:
+            return versions.astype(object).where(versions.notna(), None).tolist()
+        times = to_datetime64(versions)
+        epochs = times.to_numpy().astype("datetime64[ms]").astype("int64").tolist()
+        return [epoch if present else None for epoch, present in zip(epochs, times.notna())]
+
+    def _write_rows_individually(self, sql, records, row_numbers, is_new, result):
+        """Fallback for a failed chunk: isolate bad rows with one savepoint per row."""
+        for record, row_number, new in zip(records, row_numbers, is_new):
+            self.conn.execute("SAVEPOINT bulk_row")
+            try:
+                # rowcount counts this statement's row only (not trigger writes)
+                changed = 1 if self.conn.execute(sql, record).rowcount > 0 else 0
+                self.conn.execute("RELEASE bulk_row")
+                if not changed:
+                    result.unchanged += 1
+                elif new:
+                    result.inserted += 1
+                else:
+                    result.updated += 1
+            except Exception as e:
+                self.conn.execute("ROLLBACK TO bulk_row")
+                self.conn.execute("RELEASE bulk_row")
+                result.errors.append((row_number, str(e)[:200]))
+
+    def _insert_chunk(self, chunk, row_numbers, result, policy):
+        """Write one prepared chunk inside a single transaction."""
+        sql = self._write_sql(policy)
+        keys = chunk[self.key_column]
+        first_seen = ~keys.duplicated(keep="first").to_numpy()
+
+        self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # One indexed lookup per batch of keys - no per-row exceptions
+            existing = self._existing_keys(keys[first_seen].tolist())
+            is_new = ~keys.isin(existing).to_numpy() & first_seen
+
+            if policy == "skip":
+                # Existing keys and repeats inside the upload are reported, not written
+                write = is_new
+                result.duplicates.extend(
+                    zip(row_numbers[~write].tolist(), keys[~write].tolist())
+                )
+            else:
+                # Overwrite / merge: every row is written, later repeats win
+                write = np.ones(len(chunk), dtype=bool)
+
+            records = self._to_records(chunk[write])
+            if policy == "merge_newer":
+                records = [
+                    record + (version,)
+                    for record, version in zip(records, self._version_params(chunk[write]))
+                ]
+            self.conn.execute("SAVEPOINT bulk_chunk")
+            try:
+                # rowcount sums the rows the statements wrote; unlike total_changes
+                # it leaves out rows written by triggers (change log, rollups, FTS)
+                cursor = self.conn.executemany(sql, records)
+                self.conn.execute("RELEASE bulk_chunk")
+                changed = min(max(cursor.rowcount, 0), len(records))
+                new_rows = int(is_new[write].sum())
+                result.inserted += min(new_rows, changed)
+                result.updated += max(changed - new_rows, 0)
+                result.unchanged += len(records) - changed
+            except Exception:
+                self.conn.execute("ROLLBACK TO bulk_chunk")
+                self.conn.execute("RELEASE bulk_chunk")
+                self._write_rows_individually(
+                    sql, records, row_numbers[write].tolist(), is_new[write], result
+                )
+
+            self.conn.commit()
+            invalidate_tables(self.conn, self.table)
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def insert(self, df, chunk_size=BULK_CHUNK_SIZE, first_row_number=1, on_conflict="skip"):
+        """
+        Insert a DataFrame in chunks using native UPSERT for existing keys.
+
+        Args:
+            df: Rows to insert
+            chunk_size: Rows per transaction
+            first_row_number: Report number of the first row (for streamed uploads)
+            on_conflict: "skip", "overwrite" or "merge_newer" (see CONFLICT_POLICIES)
+
+        Returns:
+            BulkInsertResult: Inserted/updated counts plus duplicate and error reports
+        """
+        result = BulkInsertResult()
+        if df is None or df.empty:
+            return result
+
+        if on_conflict == "merge_newer" and self.version_column is None:
+            raise ValueError(f"{self.table} has no version column for merge_newer")
+
+        prepared = self.prepare(df.reset_index(drop=True))
+        row_numbers = pd.RangeIndex(first_row_number, first_row_number + len(prepared))
+
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared.iloc[start : start + chunk_size]
+            self._insert_chunk(
+                chunk, row_numbers[start : start + chunk_size], result, on_conflict
+            )
+
+        # Large loads grow the change log fastest - keep it bounded
+        ChangeLog(self.conn).prune()
+        return result
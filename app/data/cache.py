@@ -0,0 +1,147 @@
+"""
+Query Cache Module
+Process-wide cache of query results shared by all Streamlit sessions.
+Entries are keyed by database, query and parameters and remember the
+generation of every table they read; writers bump a table's generation
+after committing, so readers get the cached frame until the table changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Maximum cached result frames (least recently used are dropped first)
+QUERY_CACHE_MAX_ENTRIES = 128
+
+
+def database_key(conn):
+    """
+    Identify the database behind a connection (pooled or plain).
+
+    Args:
+        conn: SQLite database connection object
+
+    Returns:
+        str: Database file path (or a per-connection key for in-memory databases)
+    """
+    pool = getattr(conn, "pool", None)
+    if pool is not None:
+        return os.path.abspath(pool.db_path)
+    row = conn.execute("PRAGMA database_list").fetchone()
+    # In-memory databases have no file name - fall back to the connection itself
+    return row[2] if row and row[2] else f"memory:{id(conn)}"
+
+
+class QueryCache:
+    """
+    LRU cache of DataFrames with per-table generation counters.
+    Counters are process-local, which covers the single Streamlit server
+    process; writes made by other processes are not observed.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES):
+        """
+        Initialize QueryCache.
+
+        Args:
+            max_entries: Maximum number of cached results (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _snapshot_locked(self, database, tables):
+        """Current generation of each table, in the given order."""
+        return tuple(self._generations.get((database, table), 0) for table in tables)
+
+    def invalidate(self, conn, *tables):
+        """
+        Mark tables as changed. Call after the writing transaction commits.
+
+        Args:
+            conn: Connection that wrote the tables
+            *tables: Names of the changed tables
+        """
+        database = database_key(conn)
+        with self._lock:
+            for table in tables:
+                key = (database, table)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def read_sql(self, conn, query, tables, params=None):
+        """
+        Run a query through the cache.
+
+        Args:
+            conn: SQLite database connection object
+            query: SQL query
+            tables: Tables the query reads (their generations validate the entry)
+            params: Query parameters (optional)
+
+        Returns:
+            pd.DataFrame: Query result (a copy callers may modify freely)
+        """
+        database = database_key(conn)
+        tables = tuple(tables)
+        key = (database, query, tuple(params) if params else ())
+
+        with self._lock:
+            # Snapshot before querying: a write committed meanwhile bumps the
+            # generation, so the stored frame is already stale and will miss
+            snapshot = self._snapshot_locked(database, tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == snapshot:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1].copy()
+            self.misses += 1
+
+        df = pd.read_sql_query(query, conn, params=params)
+
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = (snapshot, df)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return df.copy()
+
+    def clear(self):
+        """Drop every cached result (generations are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, hits, misses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Process-wide cache shared by all models
+query_cache = QueryCache()
+
+
+# Module-level helpers using the shared cache
+def cached_query(conn, query, tables, params=None):
+    """Run a read query through the shared cache."""
+    return query_cache.read_sql(conn, query, tables, params)
+
+
+def invalidate_tables(conn, *tables):
+    """Bump the generation of tables after a committed write."""
+    query_cache.invalidate(conn, *tables)
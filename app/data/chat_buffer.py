@@ -0,0 +1,237 @@
+"""
+Chat Write Buffer Module
+Write-behind buffer in front of the chat store. Appended messages are
+kept in memory and written by a background thread in batches: when a
+thread of messages has waited CHAT_FLUSH_INTERVAL seconds, when
+CHAT_FLUSH_MAX_MESSAGES are pending, at logout and at interpreter exit.
+Each flush is one SQLite transaction covering every pending thread, so a
+crash leaves either the whole batch or none of it on disk (never a torn
+history); reads merge the stored and pending messages so callers always
+see their latest turns.
+"""
+
+import atexit
+import threading
+import time
+
+from app.data.chat_store import DEFAULT_THREAD, chat_store
+
+
+# Seconds a buffered message may wait before the flusher writes it
+CHAT_FLUSH_INTERVAL = 2.0
+
+# Pending messages (across all threads) that trigger an immediate flush
+CHAT_FLUSH_MAX_MESSAGES = 50
+
+# Longest wait before the flusher retries after failed flushes (the wait
+# doubles from CHAT_FLUSH_INTERVAL with each failure in a row)
+CHAT_FLUSH_MAX_BACKOFF = 60.0
+
+
+class ChatWriteBuffer:
+    """
+    Buffers chat appends per (user, thread) and flushes them in batches.
+    Shared by every session; the flusher thread starts with the first
+    append. Flushes, loads and clears are serialized, so a read never
+    misses messages that are in the middle of being written.
+    """
+
+    def __init__(
+        self,
+        store=chat_store,
+        flush_interval=CHAT_FLUSH_INTERVAL,
+        max_pending=CHAT_FLUSH_MAX_MESSAGES,
+        max_backoff=CHAT_FLUSH_MAX_BACKOFF,
+    ):
+        """
+        Initialize ChatWriteBuffer.
+
+        Args:
+            store: ChatStore the messages are written to
+            flush_interval: Seconds the oldest pending message may wait
+            max_pending: Pending messages that trigger a flush right away
+            max_backoff: Longest wait before retrying after failed flushes
+        """
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self._pending = {}  # (user_id, thread) -> messages, oldest first
+        self._size = 0
+        self._oldest = None  # time.monotonic() of the oldest pending message
+        self._failures = 0  # Failed flushes in a row
+        self._retry_after = None  # time.monotonic() before which the flusher does not retry
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def _start_flusher(self):
+        """Start the flusher thread if it is not running yet (caller holds _cond)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chat-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Flusher loop: write the pending messages once a threshold is reached."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # After a failure, back off however many messages are pending
+                now = time.monotonic()
+                if self._retry_after is not None and now < self._retry_after:
+                    self._cond.wait(self._retry_after - now)
+                    continue
+                wait = self._oldest + self.flush_interval - now
+                if wait > 0 and self._size < self.max_pending:
+                    self._cond.wait(wait)
+                    continue
+            try:
+                self.flush()
+            except Exception:
+                # Messages stay pending and are retried after the next interval
+                pass
+
+    def append(self, user_id, message, thread=DEFAULT_THREAD):
+        """
+        Buffer one message for the end of a thread.
+
+        Args:
+            user_id: Chat owner
+            message: Message dict with role and content
+            thread: Conversation name
+        """
+        self.extend(user_id, [message], thread)
+
+    def extend(self, user_id, messages, thread=DEFAULT_THREAD):
+        """
+        Buffer messages for the end of a thread.
+
+        Args:
+            user_id: Chat owner
+            messages: Message dicts, oldest first
+            thread: Conversation name
+        """
+        if not messages:
+            return
+        with self._cond:
+            self._pending.setdefault((user_id, thread), []).extend(
+                dict(message) for message in messages
+            )
+            self._size += len(messages)
+            self._start_flusher()
+            if self._oldest is None or self._size >= self.max_pending:
+                # Wake the flusher: it idles while nothing is pending
+                self._oldest = self._oldest or time.monotonic()
+                self._cond.notify()
+
+    def _take(self, key=None):
+        """Remove and return pending messages (of one thread, or all as a dict)."""
+        with self._cond:
+            if key is not None:
+                messages = self._pending.pop(key, [])
+                self._size -= len(messages)
+                if not self._pending:
+                    self._oldest = None
+                return messages
+            batches, self._pending = self._pending, {}
+            self._size = 0
+            self._oldest = None
+            return batches
+
+    def _pending_for(self, key):
+        """Copy of a thread's pending messages."""
+        with self._cond:
+            return list(self._pending.get(key, []))
+
+    def flush(self):
+        """
+        Write every pending message in one transaction.
+        On failure the messages are put back in front of anything appended
+        since, and the error is raised.
+
+        Returns:
+            int: Number of messages written
+        """
+        with self._flush_lock:
+            batches = self._take()
+            if not batches:
+                return 0
+            try:
+                self.store.extend_many(batches)
+            except Exception:
+                with self._cond:
+                    for key, messages in batches.items():
+                        self._pending[key] = messages + self._pending.get(key, [])
+                        self._size += len(messages)
+                    now = time.monotonic()
+                    self._oldest = now
+                    # Back off (doubling up to max_backoff) rather than spinning on
+                    # a locked database; _run honours this even past max_pending
+                    backoff = self.flush_interval * 2 ** min(self._failures, 16)
+                    self._retry_after = now + min(backoff, self.max_backoff)
+                    self._failures += 1
+                raise
+            with self._cond:
+                self._failures = 0
+                self._retry_after = None
+            return sum(len(messages) for messages in batches.values())
+
+    def load(self, user_id, thread=DEFAULT_THREAD, limit=None):
+        """
+        Get a thread's messages, stored and pending.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+            limit: Return only the last N messages (optional)
+
+        Returns:
+            list: Message dicts, oldest first
+        """
+        with self._flush_lock:
+            pending = self._pending_for((user_id, thread))
+            if limit is not None and len(pending) >= limit:
+                return pending[len(pending) - limit:] if limit > 0 else []
+            stored = self.store.load(
+                user_id, thread, None if limit is None else limit - len(pending)
+            )
+        return stored + pending
+
+    def count(self, user_id, thread=DEFAULT_THREAD):
+        """
+        Count a thread's messages, stored and pending.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+
+        Returns:
+            int: Number of messages
+        """
+        with self._flush_lock:
+            return self.store.count(user_id, thread) + len(
+                self._pending_for((user_id, thread))
+            )
+
+    def clear(self, user_id, thread=DEFAULT_THREAD):
+        """
+        Clear a thread, dropping its pending messages. Commits.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+        """
+        with self._flush_lock:
+            self._take((user_id, thread))
+            self.store.clear(user_id, thread)
+
+
+# Process-wide buffer in front of the application chat store
+chat_buffer = ChatWriteBuffer()
+
+
+def flush_chats():
+    """Write all buffered chat messages now (see ChatWriteBuffer.flush)."""
+    return chat_buffer.flush()
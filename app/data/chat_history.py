@@ -1,95 +1,111 @@
 """
 Chat History Persistence Module
-Manages saving and loading of user chat histories to/from JSON files.
-Provides persistent storage for AI conversation history across sessions.
+Manages saving and loading of user chat histories.
+Histories live in the append-only chat store (see chat_store); the JSON
+files this module used to rewrite on every message are imported into it
+the first time each user's chat is loaded. New messages go through the
+write-behind chat buffer (see chat_buffer), so a chat turn does not wait
+for the disk.
 """
 
-import os
-import json
 from pathlib import Path
 
-# Data directory for storing chat history files
-DATA_DIR = Path("DATA")
+from app.data.chat_buffer import ChatWriteBuffer, chat_buffer
+from app.data.chat_store import ChatStore, LEGACY_CHAT_DIR
+
+# Data directory holding legacy chat history JSON files
+DATA_DIR = LEGACY_CHAT_DIR
 
 
 class ChatHistory:
     """
     Manages chat history persistence for users.
-    Stores chat conversations in JSON format for retrieval across sessions.
+    Each user's chat is one thread of the chat store, so saving a new
+    message appends one row instead of rewriting the whole history.
+    Writes are buffered and flushed in batches by the chat buffer.
     """
 
-    def __init__(self, data_dir=DATA_DIR):
+    def __init__(self, data_dir=DATA_DIR, buffer=None):
         """
-        Initialize ChatHistory with data directory path.
-        
+        Initialize ChatHistory.
+
         Args:
-            data_dir: Directory path for storing chat history files
+            data_dir: Directory of legacy chat history JSON files to import
+            buffer: ChatWriteBuffer to use (defaults to the shared one of the
+                application database)
         """
         self.data_dir = Path(data_dir)
-        # Create directory if it doesn't exist
-        self.data_dir.mkdir(exist_ok=True)
+        if buffer is None:
+            if self.data_dir == Path(DATA_DIR):
+                buffer = chat_buffer
+            else:
+                buffer = ChatWriteBuffer(ChatStore(legacy_dir=self.data_dir))
+        self.buffer = buffer
 
     def get_chat_path(self, user_id):
         """
-        Get the file path for a user's chat history JSON file.
-        
+        Get the file path of a user's legacy chat history JSON file.
+
         Args:
             user_id: Unique user identifier
-            
+
         Returns:
-            Path: Full path to user's chat history file
+            Path: Full path to user's legacy chat history file
         """
         return self.data_dir / f"chat_{user_id}.json"
 
     def load_chat(self, user_id):
         """
-        Load chat history for a specific user from JSON file.
-        
+        Load chat history for a specific user.
+
         Args:
             user_id: Unique user identifier
-            
+
         Returns:
-            list: List of chat messages (empty list if file doesn't exist or error occurs)
+            list: List of chat messages (empty list if there are none or an error occurs)
         """
-        path = self.get_chat_path(user_id)
-
-        # Return empty list if file doesn't exist
-        if not path.exists():
-            return []
-
         try:
-            # Read and parse JSON file
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.buffer.load(user_id)
         except Exception:
-            # Return empty list on any error (corrupted file, etc.)
+            # Return empty list on any error (locked database, etc.)
             return []
 
+    def append_message(self, user_id, message):
+        """
+        Save one new message at the end of a user's chat history.
+
+        Args:
+            user_id: Unique user identifier
+            message: Message dict with role and content
+        """
+        self.buffer.append(user_id, message)
+
     def save_chat(self, history, user_id):
         """
-        Save chat history for a specific user to JSON file.
-        
+        Save chat history for a specific user.
+        Messages past the stored count are appended; a shorter history
+        (e.g. after clearing) replaces the stored one.
+
         Args:
             history: List of chat messages to save
             user_id: Unique user identifier
         """
-        path = self.get_chat_path(user_id)
-
-        # Write chat history to JSON file with pretty formatting
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=4, ensure_ascii=False)
+        stored = self.buffer.count(user_id)
+        if len(history) >= stored:
+            new_messages = history[stored:]
+        else:
+            self.buffer.clear(user_id)
+            new_messages = history
+        self.buffer.extend(user_id, new_messages)
 
     def clear_chat(self, user_id):
         """
-        Clear chat history for a specific user by deleting their JSON file.
-        
+        Clear chat history for a specific user.
+
         Args:
             user_id: Unique user identifier
         """
-        path = self.get_chat_path(user_id)
-        # Delete file if it exists
-        if path.exists():
-            path.unlink()
+        self.buffer.clear(user_id)
 
 
 # Backward compatibility wrapper functions
@@ -103,3 +119,15 @@ def save_chat(history, user_id):
     """Save chat for a specific user - backward compatibility."""
     chat_manager = ChatHistory()
     return chat_manager.save_chat(history, user_id)
+
+
+def append_message(user_id, message):
+    """Append one message to a user's chat history."""
+    chat_manager = ChatHistory()
+    return chat_manager.append_message(user_id, message)
+
+
+def clear_chat(user_id):
+    """Clear a user's chat history."""
+    chat_manager = ChatHistory()
+    return chat_manager.clear_chat(user_id)
@@ -0,0 +1,335 @@
+"""
+Chat Store Module
+Append-only, SQLite-backed storage of AI chat conversations.
+Every message is one row appended with the next sequence number of its
+thread, so saving a turn costs the same however long the conversation is;
+recent turns are read from the (user, thread, seq) index. Clearing a thread
+only records the sequence number it was cleared at (and drops the
+thread's rolling summary, see conversation_memory). Legacy
+DATA/chat_<user>.json files are imported once, the first time their
+thread is used.
+"""
+
+import json
+
+from app.data.db import DB_PATH, get_pool
+
+
+# Thread used by callers that have a single conversation per user
+DEFAULT_THREAD = "default"
+
+# Directory holding legacy chat_<user>.json files
+LEGACY_CHAT_DIR = DB_PATH.parent
+
+
+def _split_message(message):
+    """Split a message dict into (role, content, extra JSON or None)."""
+    extra = {k: v for k, v in message.items() if k not in ("role", "content")}
+    return (
+        message.get("role", "assistant"),
+        str(message.get("content", "")),
+        json.dumps(extra, ensure_ascii=False, default=str) if extra else None,
+    )
+
+
+def _join_message(role, content, extra):
+    """Rebuild a message dict from its stored columns."""
+    message = {"role": role, "content": content}
+    if extra:
+        message.update(json.loads(extra))
+    return message
+
+
+class ChatStore:
+    """
+    Reads and appends chat messages of one database.
+    Each call uses a pooled connection of its own, so the store can be
+    shared by every session.
+    """
+
+    def __init__(self, db_path=DB_PATH, legacy_dir=LEGACY_CHAT_DIR):
+        """
+        Initialize ChatStore.
+
+        Args:
+            db_path: Path to database file (defaults to DB_PATH)
+            legacy_dir: Directory of legacy chat_<user>.json files to import
+        """
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+
+    def legacy_path(self, user_id):
+        """Path of a user's legacy JSON chat file."""
+        return self.legacy_dir / f"chat_{user_id}.json"
+
+    def _read_legacy(self, user_id):
+        """Messages of a legacy JSON chat file (empty if missing or unreadable)."""
+        path = self.legacy_path(user_id)
+        if not path.exists():
+            return None, []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (OSError, ValueError):
+            return path, []
+        if not isinstance(messages, list):
+            return path, []
+        return path, [m for m in messages if isinstance(m, dict) and "content" in m]
+
+    def _ensure_thread(self, conn, user_id, thread):
+        """
+        Create a thread's row on first use, importing its legacy JSON file once.
+
+        Returns:
+            int: The thread's cleared_seq
+        """
+        row = conn.execute(
+            "SELECT cleared_seq FROM chat_threads WHERE user_id = ? AND thread = ?",
+            (user_id, thread),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another session may have created it while we waited for the lock
+            row = conn.execute(
+                "SELECT cleared_seq FROM chat_threads WHERE user_id = ? AND thread = ?",
+                (user_id, thread),
+            ).fetchone()
+            if row is None:
+                path, messages = (
+                    self._read_legacy(user_id) if thread == DEFAULT_THREAD else (None, [])
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO chat_messages (user_id, thread, seq, role, content, extra)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (user_id, thread, seq, *_split_message(message))
+                        for seq, message in enumerate(messages, start=1)
+                    ],
+                )
+                conn.execute(
+                    "INSERT INTO chat_threads (user_id, thread, imported_from) VALUES (?, ?, ?)",
+                    (user_id, thread, str(path) if path else None),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return row[0] if row is not None else 0
+
+    def load(self, user_id, thread=DEFAULT_THREAD, limit=None):
+        """
+        Get a thread's messages since it was last cleared.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+            limit: Return only the last N messages (optional)
+
+        Returns:
+            list: Message dicts (role, content and any extra fields), oldest first
+        """
+        with get_pool(self.db_path).connection() as conn:
+            cleared_seq = self._ensure_thread(conn, user_id, thread)
+            rows = conn.execute(
+                """
+                SELECT role, content, extra FROM chat_messages
+                WHERE user_id = ? AND thread = ? AND seq > ?
+                ORDER BY seq DESC
+                LIMIT ?
+                """,
+                (user_id, thread, cleared_seq, -1 if limit is None else int(limit)),
+            ).fetchall()
+        return [_join_message(*row) for row in reversed(rows)]
+
+    def append(self, user_id, message, thread=DEFAULT_THREAD):
+        """
+        Append one message to a thread. Commits.
+
+        Args:
+            user_id: Chat owner
+            message: Message dict with role and content (other fields are kept)
+            thread: Conversation name
+
+        Returns:
+            int: Sequence number of the new message
+        """
+        return self.extend(user_id, [message], thread)
+
+    def extend(self, user_id, messages, thread=DEFAULT_THREAD):
+        """
+        Append messages to a thread in one transaction. Commits.
+
+        Args:
+            user_id: Chat owner
+            messages: Message dicts, oldest first
+            thread: Conversation name
+
+        Returns:
+            int: Sequence number of the last message in the thread
+        """
+        return self.extend_many({(user_id, thread): messages})[(user_id, thread)]
+
+    def extend_many(self, batches):
+        """
+        Append messages to several threads in one transaction. Commits.
+        Either every message is stored or (on error) none is.
+
+        Args:
+            batches: Dict of (user_id, thread) -> message dicts, oldest first
+
+        Returns:
+            dict: (user_id, thread) -> sequence number of the thread's last message
+        """
+        last_seqs = {}
+        with get_pool(self.db_path).connection() as conn:
+            for user_id, thread in batches:
+                self._ensure_thread(conn, user_id, thread)
+            # Take the write lock before reading the last seqs so appends never collide
+            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for (user_id, thread), messages in batches.items():
+                    last = conn.execute(
+                        "SELECT COALESCE(MAX(seq), 0) FROM chat_messages "
+                        "WHERE user_id = ? AND thread = ?",
+                        (user_id, thread),
+                    ).fetchone()[0]
+                    conn.executemany(
+                        """
+                        INSERT INTO chat_messages (user_id, thread, seq, role, content, extra)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (user_id, thread, seq, *_split_message(message))
+                            for seq, message in enumerate(messages, start=last + 1)
+                        ],
+                    )
+                    last_seqs[(user_id, thread)] = last + len(messages)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return last_seqs
+
+    def count(self, user_id, thread=DEFAULT_THREAD):
+        """
+        Count a thread's messages since it was last cleared.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+
+        Returns:
+            int: Number of messages
+        """
+        with get_pool(self.db_path).connection() as conn:
+            cleared_seq = self._ensure_thread(conn, user_id, thread)
+            # Sequence numbers have no gaps, so the count is one index lookup
+            last = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM chat_messages WHERE user_id = ? AND thread = ?",
+                (user_id, thread),
+            ).fetchone()[0]
+        return last - cleared_seq
+
+    def clear(self, user_id, thread=DEFAULT_THREAD):
+        """
+        Clear a thread. Messages stay in the log; only the clear marker moves. Commits.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+        """
+        with get_pool(self.db_path).connection() as conn:
+            self._ensure_thread(conn, user_id, thread)
+            try:
+                conn.execute(
+                    """
+                    UPDATE chat_threads SET cleared_seq = (
+                        SELECT COALESCE(MAX(seq), 0) FROM chat_messages
+                        WHERE user_id = ? AND thread = ?
+                    )
+                    WHERE user_id = ? AND thread = ?
+                    """,
+                    (user_id, thread, user_id, thread),
+                )
+                conn.execute(
+                    "DELETE FROM chat_summaries WHERE user_id = ? AND thread = ?",
+                    (user_id, thread),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def load_summary(self, user_id, thread=DEFAULT_THREAD):
+        """
+        Get a thread's rolling summary.
+
+        Args:
+            user_id: Chat owner
+            thread: Conversation name
+
+        Returns:
+            tuple: (number of messages it covers, summary text); (0, "") if none
+        """
+        with get_pool(self.db_path).connection() as conn:
+            row = conn.execute(
+                "SELECT covered, summary FROM chat_summaries WHERE user_id = ? AND thread = ?",
+                (user_id, thread),
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else (0, "")
+
+    def save_summary(self, user_id, covered, summary, thread=DEFAULT_THREAD):
+        """
+        Store a thread's rolling summary. Commits.
+
+        Args:
+            user_id: Chat owner
+            covered: Number of messages (since the last clear) the summary covers
+            summary: Summary text
+            thread: Conversation name
+        """
+        with get_pool(self.db_path).connection() as conn:
+            try:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO chat_summaries (user_id, thread, covered, summary)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (user_id, thread, covered, summary),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def import_legacy(self):
+        """
+        Import every legacy chat_<user>.json file not imported yet.
+
+        Returns:
+            int: Number of threads imported
+        """
+        imported = 0
+        with get_pool(self.db_path).connection() as conn:
+            for path in sorted(self.legacy_dir.glob("chat_*.json")):
+                user_id = path.stem[len("chat_"):]
+                known = conn.execute(
+                    "SELECT 1 FROM chat_threads WHERE user_id = ? AND thread = ?",
+                    (user_id, DEFAULT_THREAD),
+                ).fetchone()
+                if known is None:
+                    self._ensure_thread(conn, user_id, DEFAULT_THREAD)
+                    imported += 1
+        return imported
+
+
+# Process-wide store of the application database
+chat_store = ChatStore()
+
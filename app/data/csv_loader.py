@@ -0,0 +1,293 @@
+"""
+Incremental CSV Loader Module
+Loads source CSV files into database tables idempotently.
+Tracks a content hash and byte offset per file in the csv_manifest table so
+later runs only load new files, changed files, or rows appended to the tail.
+Rows already in a table are left alone unless overwriting is asked for, so
+reloading a CSV never reverts edits made in the app.
+"""
+
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.bulk import STREAM_CHUNK_SIZE
+from app.data.cache import invalidate_tables
+from app.data.db import DB_PATH
+from app.data.delta import ChangeLog
+
+
+# Source CSV files loaded by the bootstrap, keyed by target table
+DATA_DIR = DB_PATH.parent
+CSV_SOURCES = {
+    "cyber_incidents": DATA_DIR / "cyber_incidents.csv",
+    "datasets_metadata": DATA_DIR / "datasets_metadata.csv",
+    "it_tickets": DATA_DIR / "it_tickets.csv",
+}
+
+# Primary key of each loadable table (used for conflict handling on reloads)
+TABLE_KEYS = {
+    "cyber_incidents": "incident_id",
+    "datasets_metadata": "dataset_id",
+    "it_tickets": "ticket_id",
+}
+
+HASH_BLOCK_SIZE = 1024 * 1024  # Bytes read per hashing step
+
+
+class IncrementalCsvLoader:
+    """
+    Loads CSV files into tables using the csv_manifest table to skip work.
+    A file is skipped when unchanged, only its tail is parsed when rows were
+    appended, and it is fully reloaded when earlier content changed.
+    """
+
+    def __init__(self, conn, overwrite=False):
+        """
+        Initialize IncrementalCsvLoader with database connection.
+
+        Args:
+            conn: SQLite database connection object
+            overwrite: Replace existing rows with the CSV's version (default:
+                keep them and only insert rows with new primary keys)
+        """
+        self.conn = conn
+        self.overwrite = overwrite
+
+    # ---------------- FILE HELPERS ----------------
+    @staticmethod
+    def _hash_file(path, prefix_length=0):
+        """
+        Hash a file in one streaming pass, also capturing the hash of its prefix.
+
+        Args:
+            path: File path
+            prefix_length: Length of the prefix whose hash is also returned
+
+        Returns:
+            tuple: (prefix SHA-256 hex digest, full-file SHA-256 hex digest)
+        """
+        digest = hashlib.sha256()
+        prefix_hash = digest.hexdigest() if prefix_length == 0 else None
+        position = 0
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(HASH_BLOCK_SIZE)
+                if not block:
+                    break
+                if prefix_hash is None and position + len(block) >= prefix_length:
+                    # Split the block at the prefix boundary
+                    cut = prefix_length - position
+                    digest.update(block[:cut])
+                    prefix_hash = digest.hexdigest()
+                    digest.update(block[cut:])
+                else:
+                    digest.update(block)
+                position += len(block)
+        return prefix_hash, digest.hexdigest()
+
+    @staticmethod
+    def _read_header(path):
+        """Read the raw header line (including newline) of a CSV file."""
+        with open(path, "rb") as f:
+            return f.readline()
+
+    @staticmethod
+    def _read_from(path, offset):
+        """Read file bytes starting at a byte offset."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return f.read()
+
+    def _get_manifest(self, source_path):
+        """
+        Get the manifest entry for a source file.
+
+        Returns:
+            tuple or None: (content_hash, byte_offset, file_size, mtime_ns, row_count)
+        """
+        return self.conn.execute(
+            """
+            SELECT content_hash, byte_offset, file_size, mtime_ns, row_count
+            FROM csv_manifest
+            WHERE source_path = ?
+            """,
+            (source_path,),
+        ).fetchone()
+
+    def _save_manifest(self, source_path, table_name, content_hash, offset, stat, rows):
+        """Insert or update the manifest entry for a source file."""
+        self.conn.execute(
+            """
+            INSERT INTO csv_manifest
+            (source_path, table_name, content_hash, byte_offset, file_size, mtime_ns, row_count, loaded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(source_path) DO UPDATE SET
+                table_name = excluded.table_name,
+                content_hash = excluded.content_hash,
+                byte_offset = excluded.byte_offset,
+                file_size = excluded.file_size,
+                mtime_ns = excluded.mtime_ns,
+                row_count = excluded.row_count,
+                loaded_at = excluded.loaded_at
+            """,
+            (
+                source_path,
+                table_name,
+                content_hash,
+                offset,
+                stat.st_size,
+                stat.st_mtime_ns,
+                rows,
+            ),
+        )
+
+    # ---------------- PARSING & INSERTING ----------------
+    def _parse(self, source, table_name):
+        """
+        Parse CSV content in bounded chunks, keeping primary keys as strings.
+
+        Args:
+            source: File path or buffer with CSV content including the header line
+            table_name: Target table (selects the key column)
+
+        Returns:
+            Iterator[pd.DataFrame]: Parsed row chunks
+        """
+        key_column = TABLE_KEYS.get(table_name)
+        dtype = {key_column: str} if key_column else None
+        return pd.read_csv(
+            source, dtype=dtype, skip_blank_lines=True, chunksize=STREAM_CHUNK_SIZE
+        )
+
+    def _upsert(self, df, table_name):
+        """
+        Insert rows whose primary key is new. Rows sharing a primary key with
+        an existing row are skipped, or replace it when overwrite is set.
+
+        Args:
+            df: Rows to write
+            table_name: Target table
+
+        Returns:
+            int: Number of rows inserted or replaced
+        """
+        table_columns = [
+            col[1] for col in self.conn.execute(f"PRAGMA table_info({table_name})")
+        ]
+        columns = [col for col in df.columns if col in table_columns]
+        if df.empty or not columns:
+            return 0
+
+        key_column = TABLE_KEYS.get(table_name)
+        placeholders = ", ".join("?" for _ in columns)
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        if key_column in columns:
+            updates = [col for col in columns if col != key_column]
+            if updates and self.overwrite:
+                assignments = ", ".join(f"{col} = excluded.{col}" for col in updates)
+                query += f" ON CONFLICT({key_column}) DO UPDATE SET {assignments}"
+            else:
+                query += f" ON CONFLICT({key_column}) DO NOTHING"
+
+        # NaN -> NULL, numpy scalars -> Python natives
+        values = df[columns].astype(object).where(df[columns].notna(), None)
+        cursor = self.conn.executemany(query, values.itertuples(index=False, name=None))
+        # rowcount leaves out skipped rows (and rows written by triggers)
+        return max(cursor.rowcount, 0)
+
+    # ---------------- LOADING ----------------
+    def load_file(self, csv_path, table_name):
+        """
+        Load one CSV file incrementally. Must run inside the caller's transaction.
+
+        Args:
+            csv_path: Path to the CSV file
+            table_name: Target table
+
+        Returns:
+            int: Number of rows written
+        """
+        path = Path(csv_path)
+        if not path.exists():
+            print(f"CSV not found: {path}")
+            return 0
+
+        source_path = str(path.resolve())
+        stat = os.stat(path)
+        manifest = self._get_manifest(source_path)
+
+        # Fast path: size and modification time unchanged since the last load
+        if manifest and manifest[2] == stat.st_size and manifest[3] == stat.st_mtime_ns:
+            print(f"Unchanged: {path.name}")
+            return 0
+
+        size = stat.st_size
+        old_hash, old_offset, old_rows = (
+            (manifest[0], manifest[1], manifest[4]) if manifest else (None, 0, 0)
+        )
+        prefix_hash, content_hash = self._hash_file(
+            path, old_offset if old_offset <= size else 0
+        )
+
+        if manifest and old_offset <= size and prefix_hash == old_hash:
+            if old_offset == size:
+                # Content identical (only metadata changed)
+                self._save_manifest(source_path, table_name, content_hash, size, stat, old_rows)
+                print(f"Unchanged: {path.name}")
+                return 0
+
+            # Appended rows - parse only the new tail with the original header
+            tail = self._read_from(path, old_offset)
+            chunks = self._parse(io.BytesIO(self._read_header(path) + tail), table_name)
+            rows = sum(self._upsert(chunk, table_name) for chunk in chunks)
+            self._save_manifest(
+                source_path, table_name, content_hash, size, stat, old_rows + rows
+            )
+            print(f"Appended {rows} rows from {path.name} into '{table_name}'")
+            return rows
+
+        # New or rewritten file - write every row
+        chunks = self._parse(path, table_name)
+        rows = sum(self._upsert(chunk, table_name) for chunk in chunks)
+        self._save_manifest(source_path, table_name, content_hash, size, stat, rows)
+        print(f"Loaded {rows} rows from {path.name} into '{table_name}'")
+        return rows
+
+    def load_all(self, sources=None):
+        """
+        Load every source CSV in a single transaction.
+
+        Args:
+            sources: Mapping of table name -> CSV path (defaults to CSV_SOURCES)
+
+        Returns:
+            int: Total rows written
+        """
+        sources = sources if sources is not None else CSV_SOURCES
+        total_rows = 0
+
+        # One transaction: either every file and its manifest entry lands, or none
+        self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table, csv_path in sources.items():
+                total_rows += self.load_file(csv_path, table)
+            self.conn.commit()
+            if total_rows:
+                invalidate_tables(self.conn, *sources)
+                ChangeLog(self.conn).prune()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        return total_rows
+
+
+# Backward compatibility wrapper function
+def load_csv_sources(conn, sources=None, overwrite=False):
+    """Load all source CSV files incrementally (see IncrementalCsvLoader)."""
+    return IncrementalCsvLoader(conn, overwrite).load_all(sources)
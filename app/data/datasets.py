@@ -8,6 +8,13 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from app.data.bulk import BulkInserter, BULK_CHUNK_SIZE, STREAM_CHUNK_SIZE
+from app.data.cache import cached_query, invalidate_tables
+from app.data.delta import fetch_changes, get_delta_frame
+from app.data.ids import new_id, new_ids
+from app.data.reconcile import EditorReconciler
+from app.data.timestamps import attach_datetimes
+
 
 # ============================================================
 # DATASET CLASS (OOP)
@@ -66,7 +73,7 @@ class Dataset:
     def save(self):
         """Save dataset metadata to database."""
         if self.dataset_id is None:
-            self.dataset_id = f"DS{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+            self.dataset_id = new_id("DS")
 
         query = """
             INSERT INTO datasets_metadata
@@ -86,6 +93,7 @@ class Dataset:
             ),
         )
         self.conn.commit()
+        invalidate_tables(self.conn, "datasets_metadata")
 
         return self.dataset_id
 
@@ -100,60 +108,166 @@ class Dataset:
             "upload_date": self.upload_date,
         }
 
+    @classmethod
+    def _new_ids(cls, count):
+        """Generate dataset IDs for bulk rows without one."""
+        return new_ids(count, "DS")
+
+    @classmethod
+    def bulk_insert(
+        cls,
+        conn,
+        df,
+        chunk_size=BULK_CHUNK_SIZE,
+        first_row_number=1,
+        on_conflict="skip",
+    ):
+        """
+        Insert many dataset metadata rows at once with vectorized type conversion.
+
+        Args:
+            conn: Database connection object
+            df: DataFrame with dataset metadata columns
+            chunk_size: Rows per transaction
+            first_row_number: Report number of the first row
+            on_conflict: Existing-id policy - "skip", "overwrite" or "merge_newer"
+                (merge_newer replaces only when the upload's upload_date is newer)
+
+        Returns:
+            BulkInsertResult: Inserted/updated counts plus duplicate and error reports
+        """
+        inserter = BulkInserter(
+            conn,
+            table="datasets_metadata",
+            key_column="dataset_id",
+            column_sql={
+                "dataset_id": "?",
+                "name": "?",
+                "rows": "?",
+                "columns": "?",
+                "uploaded_by": "?",
+                "upload_date": "?",
+            },
+            id_factory=cls._new_ids,
+            integer_columns=["rows", "columns"],
+            version_column="upload_date",
+        )
+        return inserter.insert(df, chunk_size, first_row_number, on_conflict)
+
+    # Columns read by get_all / get_changes_since / get_filtered (upload_date_ms
+    # becomes the datetime64 upload_date column, see attach_datetimes)
+    _COLUMNS = "dataset_id, name, rows, columns, uploaded_by, upload_date, upload_date_ms"
+
     @classmethod
     def get_all(cls, conn):
-        """Get all datasets as DataFrame."""
-        query = """
-            SELECT dataset_id, name, rows, columns, uploaded_by, upload_date
-            FROM datasets_metadata
-            ORDER BY upload_date DESC
+        """Get all datasets as DataFrame, newest first (merged incrementally from the change log)."""
+        rows = get_delta_frame(
+            conn, "datasets_metadata", "dataset_id", cls._COLUMNS, sort_by="upload_date", ascending=False
+        ).read(conn)
+        return attach_datetimes(rows, "datasets_metadata")
+
+    @classmethod
+    def get_changes_since(cls, conn, watermark):
+        """
+        Get dataset metadata changed since a watermark.
+
+        Args:
+            conn: SQLite database connection object
+            watermark: Value returned by a previous call (0 for all datasets)
+
+        Returns:
+            tuple: (changed rows, deleted dataset_ids, new watermark); rows is
+                None if the watermark is too old and a full reload is needed
+        """
+        rows, deleted, watermark = fetch_changes(
+            conn, "datasets_metadata", "dataset_id", watermark, cls._COLUMNS
+        )
+        if rows is not None:
+            attach_datetimes(rows, "datasets_metadata")
+        return rows, deleted, watermark
+
+    # Columns a FilterSpec may reference
+    FILTER_COLUMNS = ("dataset_id", "name", "uploaded_by", "upload_date")
+
+    @classmethod
+    def get_filtered(cls, conn, spec):
         """
-        df = pd.read_sql_query(query, conn)
-        return df
+        Get dataset metadata matching a filter, evaluated in SQL.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over FILTER_COLUMNS
+
+        Returns:
+            pd.DataFrame: Matching datasets, newest first (all datasets for an empty spec)
+        """
+        if spec.is_empty():
+            return cls.get_all(conn)
+        where, params = spec.to_sql(cls.FILTER_COLUMNS, table="datasets_metadata")
+        query = (
+            f"SELECT {cls._COLUMNS} FROM datasets_metadata {where} ORDER BY upload_date DESC"
+        )
+        rows = cached_query(conn, query, ["datasets_metadata"], params=params)
+        return attach_datetimes(rows, "datasets_metadata")
+
+    # Columns the dashboard data editor may change
+    EDITABLE_COLUMNS = ("name", "rows", "columns", "uploaded_by", "upload_date")
 
     @classmethod
-    def load_csv_to_table(cls, conn, csv_path, table_name):
-        """Load CSV file into a specific SQL table."""
+    def reconciler(cls):
+        """Get a reconciler writing data editor deletions and edits back to dataset metadata."""
+        return EditorReconciler(
+            "datasets_metadata",
+            "dataset_id",
+            cls.EDITABLE_COLUMNS,
+            datetime_formats={"upload_date": "%Y-%m-%d"},
+        )
+
+    @classmethod
+    def load_csv_to_table(cls, conn, csv_path, table_name, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Load CSV file into a specific SQL table.
+        Streams the file in chunks so memory stays flat regardless of file size.
+        """
         if not os.path.exists(csv_path):
             print(f"CSV not found: {csv_path}")
             return 0
 
         try:
-            df = pd.read_csv(csv_path)
+            reader = pd.read_csv(csv_path, chunksize=chunk_size)
         except Exception as e:
             print(f"Error reading CSV {csv_path}: {e}")
             return 0
 
-        if df.empty:
-            print(f"CSV is empty: {csv_path}")
-            return 0
-
+        total_rows = 0
         try:
-            df.to_sql(name=table_name, con=conn, if_exists="append", index=False)
+            for chunk in reader:
+                chunk.to_sql(name=table_name, con=conn, if_exists="append", index=False)
+                total_rows += len(chunk)
         except Exception as e:
             print(f"Error inserting into table '{table_name}': {e}")
+            return total_rows
+        finally:
+            # to_sql commits each chunk, so even a partial load changes the table
+            invalidate_tables(conn, table_name)
+
+        if total_rows == 0:
+            print(f"CSV is empty: {csv_path}")
             return 0
 
-        print(f"Loaded {len(df)} rows into '{table_name}'")
-        return len(df)
+        print(f"Loaded {total_rows} rows into '{table_name}'")
+        return total_rows
 
     @classmethod
     def load_all_csv_data(cls, conn):
-        """Load all CSV files into their respective tables."""
-        DATA_DIR = "DATA"
-
-        csv_mapping = {
-            "cyber_incidents": os.path.join(DATA_DIR, "cyber_incidents.csv"),
-            "datasets_metadata": os.path.join(DATA_DIR, "datasets_metadata.csv"),
-            "it_tickets": os.path.join(DATA_DIR, "it_tickets.csv"),
-        }
-
-        total_rows = 0
-        for table, csv_path in csv_mapping.items():
-            rows = cls.load_csv_to_table(conn, csv_path, table)
-            total_rows += rows
+        """
+        Load all CSV files into their respective tables.
+        Incremental and idempotent: unchanged files are skipped and appended
+        rows are loaded on their own (see IncrementalCsvLoader).
+        """
+        from app.data.csv_loader import load_csv_sources
 
-        return total_rows
+        return load_csv_sources(conn)
 
 
 # ============================================================
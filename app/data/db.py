@@ -1,10 +1,14 @@
 """
 Database Connection Module
 Manages SQLite database connections with Streamlit-safe configuration.
-Provides context manager support for proper connection handling.
+Provides a process-wide connection pool and context manager support
+for proper connection handling.
 """
 
+import os
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
 
@@ -13,39 +17,486 @@ from contextlib import contextmanager
 # Construct absolute path to database file (2 levels up from this file, then DATA folder)
 DB_PATH = Path(__file__).resolve().parents[2] / "DATA" / "intelligence_platform.db"
 
+# Pool sizing defaults (one pool per database file, shared by every session)
+POOL_MAX_SIZE = 16  # Maximum connections open at once
+POOL_IDLE_TIMEOUT = 300  # Seconds an idle connection is kept before eviction
+POOL_ACQUIRE_TIMEOUT = 10  # Seconds to wait for a free connection
+
+
+class ConnectionProfile:
+    """
+    PRAGMA profile applied to every pooled connection plus the WAL checkpoint policy.
+    Defaults favour many concurrent dashboard readers alongside one ingestion writer;
+    each setting can be overridden per deployment through INTEL_DB_* environment variables.
+    """
+
+    # Environment variable suffix -> (attribute name, type converter)
+    ENV_SETTINGS = {
+        "JOURNAL_MODE": ("journal_mode", str),
+        "SYNCHRONOUS": ("synchronous", str),
+        "CACHE_SIZE_KB": ("cache_size_kb", int),
+        "MMAP_SIZE": ("mmap_size", int),
+        "TEMP_STORE": ("temp_store", str),
+        "BUSY_TIMEOUT": ("busy_timeout", float),
+        "WAL_AUTOCHECKPOINT": ("wal_autocheckpoint", int),
+        "JOURNAL_SIZE_LIMIT": ("journal_size_limit", int),
+        "CHECKPOINT_INTERVAL": ("checkpoint_interval", float),
+        "CHECKPOINT_MODE": ("checkpoint_mode", str),
+    }
+
+    def __init__(
+        self,
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size_kb=65536,
+        mmap_size=268435456,
+        temp_store="MEMORY",
+        busy_timeout=10,
+        wal_autocheckpoint=1000,
+        journal_size_limit=67108864,
+        checkpoint_interval=300,
+        checkpoint_mode="PASSIVE",
+    ):
+        """
+        Initialize a connection profile.
+
+        Args:
+            journal_mode: SQLite journal mode (WAL lets readers run during writes)
+            synchronous: Sync level (NORMAL is durable enough under WAL and much faster)
+            cache_size_kb: Page cache size per connection in KiB
+            mmap_size: Bytes of the database file to memory-map (0 disables)
+            temp_store: Where temporary tables and indexes live (MEMORY, FILE, DEFAULT)
+            busy_timeout: Seconds a writer waits for a lock before failing
+            wal_autocheckpoint: WAL pages written before SQLite checkpoints automatically
+            journal_size_limit: Bytes the WAL file is truncated to after a checkpoint
+            checkpoint_interval: Seconds between pool-driven checkpoints (0 disables)
+            checkpoint_mode: wal_checkpoint mode for pool-driven checkpoints
+        """
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store
+        self.busy_timeout = busy_timeout
+        self.wal_autocheckpoint = wal_autocheckpoint
+        self.journal_size_limit = journal_size_limit
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_mode = checkpoint_mode
+
+    @classmethod
+    def from_env(cls, prefix="INTEL_DB_"):
+        """
+        Build a profile from defaults overridden by environment variables.
+        Example: INTEL_DB_SYNCHRONOUS=FULL, INTEL_DB_MMAP_SIZE=0
+
+        Args:
+            prefix: Environment variable prefix
+
+        Returns:
+            ConnectionProfile: Profile for this deployment
+        """
+        overrides = {}
+        for suffix, (attr, convert) in cls.ENV_SETTINGS.items():
+            raw = os.environ.get(prefix + suffix)
+            if raw is None or raw.strip() == "":
+                continue
+            try:
+                overrides[attr] = convert(raw.strip())
+            except ValueError:
+                print(f"Ignoring invalid {prefix + suffix}={raw!r}")
+        return cls(**overrides)
+
+    @property
+    def uses_wal(self):
+        """Whether the profile runs the database in WAL mode."""
+        return str(self.journal_mode).upper() == "WAL"
+
+    def pragmas(self):
+        """
+        Get the PRAGMA statements for a new connection.
+
+        Returns:
+            list: PRAGMA statements in the order they must run
+        """
+        statements = [
+            f"PRAGMA journal_mode = {self.journal_mode};",
+            f"PRAGMA synchronous = {self.synchronous};",
+            # Negative cache_size is interpreted by SQLite as KiB instead of pages
+            f"PRAGMA cache_size = {-abs(int(self.cache_size_kb))};",
+            f"PRAGMA mmap_size = {int(self.mmap_size)};",
+            f"PRAGMA temp_store = {self.temp_store};",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)};",
+            f"PRAGMA journal_size_limit = {int(self.journal_size_limit)};",
+            # Enable foreign key constraints for referential integrity
+            "PRAGMA foreign_keys = ON;",
+        ]
+        if self.uses_wal:
+            statements.append(
+                f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)};"
+            )
+        return statements
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection that returns itself to its pool when closed.
+    Subclasses sqlite3.Connection so pandas and existing callers treat it
+    exactly like a plain connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize connection with pool bookkeeping attributes."""
+        super().__init__(*args, **kwargs)
+        self.pool = None  # Owning pool (None = behaves like a plain connection)
+        self.last_used = time.monotonic()  # Used for idle eviction
+
+    def close(self):
+        """Check the connection back into its pool instead of closing it."""
+        if self.pool is not None:
+            self.pool.checkin(self)
+        else:
+            self.close_physical()
+
+    def close_physical(self):
+        """Really close the underlying SQLite handle."""
+        self.pool = None
+        sqlite3.Connection.close(self)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-aware pool of SQLite connections for one database file.
+    Connections are configured once when opened, handed out with checkout/checkin,
+    pinned per thread for module-level callers and evicted after sitting idle.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        max_size=POOL_MAX_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+        profile=None,
+        migrate=True,
+    ):
+        """
+        Initialize the connection pool.
+
+        Args:
+            db_path: Path to database file
+            max_size: Maximum number of open connections
+            idle_timeout: Seconds before an idle connection is closed
+            acquire_timeout: Seconds checkout waits before giving up
+            profile: ConnectionProfile to apply (defaults to ConnectionProfile.from_env())
+            migrate: Apply pending schema migrations on the first connection
+        """
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.profile = profile if profile is not None else ConnectionProfile.from_env()
+        self._last_checkpoint = time.monotonic()
+        self.migrate = migrate
+        self._migrated = False  # Schema migrations run once per pool
+
+        self._idle = []  # Connections ready for reuse (most recently used last)
+        self._open_count = 0  # Idle + checked out connections
+        self._leases = {}  # thread ident -> [thread, connection, refcount]
+        self._cond = threading.Condition(threading.Lock())
+
+    # ---------------- CONNECTION LIFECYCLE ----------------
+    def _open(self):
+        """
+        Open and configure a new connection.
+
+        Returns:
+            PooledConnection: Freshly configured connection
+        """
+        # Ensure parent directory exists before connecting
+        self.db_path.parent.mkdir(exist_ok=True)
+
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,  # pool hands connections to Streamlit worker threads
+            timeout=self.profile.busy_timeout,  # prevents "database is locked" errors
+            factory=PooledConnection,
+        )
+        self.configure(conn)
+        if self.migrate and not self._migrated:
+            # Imported lazily: schema management sits on top of the connection layer
+            from app.data.schema import migrate_database
+
+            migrate_database(conn)
+            self._migrated = True
+        conn.pool = self
+        return conn
+
+    def configure(self, conn):
+        """
+        Apply the connection profile's PRAGMA setup. Runs once per physical connection.
+
+        Args:
+            conn: Newly opened SQLite connection
+        """
+        for statement in self.profile.pragmas():
+            conn.execute(statement)
+
+    def _evict_idle_locked(self):
+        """Close idle connections that exceeded the idle timeout (lock held)."""
+        now = time.monotonic()
+        keep = []
+        for conn in self._idle:
+            if now - conn.last_used > self.idle_timeout:
+                conn.close_physical()
+                self._open_count -= 1
+            else:
+                keep.append(conn)
+        self._idle = keep
+
+    def _reap_dead_leases_locked(self):
+        """Return connections pinned by threads that have finished (lock held)."""
+        for ident, lease in list(self._leases.items()):
+            thread, conn, _ = lease
+            if not thread.is_alive():
+                del self._leases[ident]
+                self._release_locked(conn)
+
+    def _release_locked(self, conn):
+        """Put a connection back on the idle list (lock held)."""
+        # Never hand out a connection with a half-finished transaction
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close_physical()
+            self._open_count -= 1
+            self._cond.notify()
+            return
+
+        conn.last_used = time.monotonic()
+        self._idle.append(conn)
+        self._cond.notify()
+        self._maybe_checkpoint_locked(conn)
+
+    def _maybe_checkpoint_locked(self, conn):
+        """Run the profile's periodic WAL checkpoint when the interval elapsed (lock held)."""
+        interval = self.profile.checkpoint_interval
+        if not self.profile.uses_wal or not interval:
+            return
+        if conn.last_used - self._last_checkpoint < interval:
+            return
+        self._last_checkpoint = conn.last_used
+        try:
+            # PASSIVE never blocks readers or the writer; it copies what it can
+            conn.execute(f"PRAGMA wal_checkpoint({self.profile.checkpoint_mode});")
+        except sqlite3.Error as e:
+            print(f"WAL checkpoint skipped: {e}")
+
+    # ---------------- CHECKOUT / CHECKIN ----------------
+    def checkout(self, timeout=None):
+        """
+        Take a connection from the pool, opening a new one if below max_size.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to acquire_timeout)
+
+        Returns:
+            PooledConnection: Connection owned by the caller until checkin
+
+        Raises:
+            sqlite3.OperationalError: If no connection becomes available in time
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                # Reclaim connections pinned by finished threads (e.g. past reruns)
+                self._reap_dead_leases_locked()
+                self._evict_idle_locked()
+                if self._idle:
+                    return self._idle.pop()
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+                self._cond.wait(remaining)
+
+        # Open outside the lock so slow disks don't block other threads
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, conn):
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously obtained from this pool
+        """
+        with self._cond:
+            # Thread-pinned connections are only released when the last user closes them
+            for ident, lease in list(self._leases.items()):
+                if lease[1] is conn:
+                    lease[2] -= 1
+                    if lease[2] > 0:
+                        return
+                    del self._leases[ident]
+                    break
+
+            if conn in self._idle:
+                return
+            self._release_locked(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and back in.
+
+        Yields:
+            PooledConnection: Connection for the duration of the block
+        """
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def thread_connection(self):
+        """
+        Get the connection pinned to the calling thread, checking one out if needed.
+        Repeated calls from the same thread share one connection; it returns to
+        the pool when every caller closed it or the thread finishes.
+
+        Returns:
+            PooledConnection: Connection pinned to the current thread
+        """
+        ident = threading.get_ident()
+        with self._cond:
+            lease = self._leases.get(ident)
+            if lease is not None:
+                if lease[0] is threading.current_thread():
+                    lease[2] += 1
+                    return lease[1]
+                # Thread ident was recycled - the old lease belongs to a dead thread
+                del self._leases[ident]
+                self._release_locked(lease[1])
+
+        conn = self.checkout()
+        with self._cond:
+            self._leases[ident] = [threading.current_thread(), conn, 1]
+        return conn
+
+    # ---------------- MAINTENANCE ----------------
+    def checkpoint(self, mode="PASSIVE"):
+        """
+        Checkpoint the WAL file into the main database.
+
+        Args:
+            mode: PASSIVE, FULL, RESTART or TRUNCATE
+
+        Returns:
+            tuple: (busy, wal_pages, checkpointed_pages) as reported by SQLite
+        """
+        with self.connection() as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+        with self._cond:
+            self._last_checkpoint = time.monotonic()
+        return row
+
+    def evict_idle(self):
+        """Close idle connections past the idle timeout and reclaim dead-thread leases."""
+        with self._cond:
+            self._reap_dead_leases_locked()
+            self._evict_idle_locked()
+
+    def close_all(self):
+        """Checkpoint the WAL, close every idle connection and forget all thread leases."""
+        with self._cond:
+            if self._idle and self.profile.uses_wal:
+                try:
+                    # Fold the WAL back so the .db file is self-contained after shutdown
+                    self._idle[-1].execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                except sqlite3.Error:
+                    pass
+            for conn in self._idle:
+                conn.close_physical()
+            self._open_count -= len(self._idle)
+            self._idle = []
+            self._leases.clear()
+
+    def stats(self):
+        """
+        Get a snapshot of pool usage.
+
+        Returns:
+            dict: Open, idle, in-use and thread-pinned connection counts
+        """
+        with self._cond:
+            return {
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "thread_leases": len(self._leases),
+                "max_size": self.max_size,
+            }
+
+
+# Process-wide pools keyed by resolved database path
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH, profile=None):
+    """
+    Get (or create) the shared connection pool for a database file.
+
+    Args:
+        db_path: Path to database file (defaults to DB_PATH)
+        profile: ConnectionProfile used when the pool is first created
+
+    Returns:
+        ConnectionPool: Pool shared by every caller in this process
+    """
+    key = Path(db_path).resolve()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key, profile=profile)
+            _pools[key] = pool
+        return pool
+
 
 class DatabaseConnection:
     """Database connection manager with context manager support."""
 
     def __init__(self, db_path=DB_PATH):
         """Initialize database connection manager."""
-        self.db_path = db_path
+        self.db_path = Path(db_path)
         self.conn = None
 
     def connect(self):
         """
-        Connect to the SQLite database with Streamlit-safe configuration.
-        Creates parent directory if needed and enables foreign key constraints.
-        
+        Check out a connection from the shared pool for this database.
+        Connections are opened with Streamlit-safe settings and foreign keys enabled.
+
         Returns:
             sqlite3.Connection: Database connection object
         """
-        # Ensure parent directory exists before connecting
-        self.db_path.parent.mkdir(exist_ok=True)
-
-        # Create connection with Streamlit-compatible settings
-        self.conn = sqlite3.connect(
-            str(self.db_path),
-            check_same_thread=False,  # allows Streamlit to use connection safely across threads
-            timeout=10,  # prevents "database is locked" errors
-        )
-
-        # Enable foreign key constraints for referential integrity
-        self.conn.execute("PRAGMA foreign_keys = ON;")
+        self.conn = get_pool(self.db_path).checkout()
         return self.conn
 
     def close(self):
-        """Close the database connection."""
+        """Return the connection to the pool."""
         if self.conn:
             self.conn.close()
             self.conn = None
@@ -68,24 +519,13 @@ class DatabaseConnection:
 def connect_database(db_path=DB_PATH):
     """
     Connect to the SQLite database (Streamlit-safe).
-    Backward compatibility wrapper for direct function calls.
-    
+    Backward compatibility wrapper returning the pooled connection pinned to the
+    calling thread, so page reruns reuse connections instead of opening new ones.
+
     Args:
         db_path: Path to database file (defaults to DB_PATH)
-        
+
     Returns:
         sqlite3.Connection: Database connection object
     """
-    # Ensure parent directory exists
-    db_path.parent.mkdir(exist_ok=True)
-
-    # Create connection with Streamlit-compatible settings
-    conn = sqlite3.connect(
-        str(db_path),
-        check_same_thread=False,  # allows Streamlit to use connection safely across threads
-        timeout=10,  # prevents "database is locked" errors
-    )
-
-    # Enable foreign key constraints for referential integrity
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return get_pool(db_path).thread_connection()
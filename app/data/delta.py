@@ -0,0 +1,271 @@
+"""
+Delta Fetch Module
+Incremental reads of dashboard tables using the row_changes log.
+Triggers record every inserted, updated and deleted key with an increasing
+sequence number; a reader keeps the last sequence it saw (its watermark) and
+later fetches only the rows changed since then, merging them into its frame.
+"""
+
+import threading
+
+import pandas as pd
+
+from app.data.cache import database_key
+
+
+# Log entries kept when pruning (older watermarks fall back to a full reload)
+CHANGE_LOG_RETENTION = 200000
+
+# Above this many changed keys a full reload is cheaper than a keyed fetch
+DELTA_MAX_KEYS = 50000
+
+# SQLite limits host parameters per statement; stay well below it for IN (...) lookups
+_LOOKUP_BATCH_SIZE = 500
+
+
+class ChangeLog:
+    """
+    Reads and prunes the row_changes log for one connection.
+    Call the read methods inside one transaction so the watermark and the
+    rows read with it come from the same snapshot.
+    """
+
+    def __init__(self, conn):
+        """
+        Initialize ChangeLog with database connection.
+
+        Args:
+            conn: SQLite database connection object
+        """
+        self.conn = conn
+
+    def watermark(self):
+        """
+        Get the sequence number of the latest change.
+
+        Returns:
+            int: Current watermark (0 before any change)
+        """
+        row = self.conn.execute("SELECT MAX(seq) FROM row_changes").fetchone()
+        return row[0] or 0
+
+    def is_available(self, watermark):
+        """
+        Check that no entries after a watermark have been pruned.
+
+        Args:
+            watermark: Sequence number previously returned by watermark()
+
+        Returns:
+            bool: True if changes_since(watermark) is complete
+        """
+        oldest, latest = self.conn.execute(
+            "SELECT MIN(seq), MAX(seq) FROM row_changes"
+        ).fetchone()
+        if latest is None:
+            # Empty log: complete only for a reader that has seen nothing yet
+            return watermark == 0
+        # A watermark past the end means the log was emptied and sequence numbers restarted
+        return oldest - 1 <= watermark <= latest
+
+    def changes_since(self, table, watermark):
+        """
+        Get the latest operation for every key of a table changed after a watermark.
+
+        Args:
+            table: Table name
+            watermark: Sequence number to start after
+
+        Returns:
+            dict: record_id -> last op ('I', 'U' or 'D')
+        """
+        rows = self.conn.execute(
+            """
+            SELECT record_id, op
+            FROM row_changes
+            WHERE table_name = ? AND seq > ?
+            ORDER BY seq
+            """,
+            (table, watermark),
+        ).fetchall()
+        # Later entries overwrite earlier ones, leaving the last op per key
+        return dict(rows)
+
+    def prune(self, keep=CHANGE_LOG_RETENTION):
+        """
+        Delete all but the newest log entries. Commits.
+
+        Args:
+            keep: Number of entries to retain (at least 1 so the watermark survives)
+
+        Returns:
+            int: Entries deleted
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM row_changes WHERE seq <= ?", (self.watermark() - max(keep, 1),)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+
+def _select_rows(conn, table, columns, where="", params=()):
+    """Read rows (indexed by rowid) matching a WHERE clause."""
+    query = f"SELECT rowid AS _rowid, {columns} FROM {table} {where}"
+    return pd.read_sql_query(query, conn, params=params, index_col="_rowid")
+
+
+def _fetch_rows(conn, table, key_column, columns, keys):
+    """Read the current rows for a list of keys in batches."""
+    frames = []
+    for start in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+        batch = keys[start : start + _LOOKUP_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        frames.append(
+            _select_rows(conn, table, columns, f"WHERE {key_column} IN ({placeholders})", batch)
+        )
+    return pd.concat(frames) if frames else _select_rows(conn, table, columns, "WHERE 0")
+
+
+def _align_dtypes(fetched, like):
+    """Cast fetched rows to the frame's column types so merging keeps dtypes stable."""
+    for col, dtype in like.dtypes.items():
+        if col in fetched and fetched[col].dtype != dtype:
+            try:
+                fetched[col] = fetched[col].astype(dtype)
+            except (TypeError, ValueError):
+                pass  # Incompatible values - the merged column falls back to object
+    return fetched
+
+
+class DeltaFrame:
+    """
+    A table's rows held in memory and kept current through the change log.
+    Each read compares the log watermark (one primary-key lookup, which also
+    sees writes from other processes) and merges only the changed rows
+    instead of re-reading the whole table.
+    """
+
+    def __init__(self, table, key_column, columns="*", sort_by=None, ascending=True):
+        """
+        Initialize DeltaFrame.
+
+        Args:
+            table: Table name
+            key_column: Primary key column
+            columns: SELECT column list
+            sort_by: Column to order rows by (defaults to rowid order)
+            ascending: Sort direction for sort_by
+        """
+        self.table = table
+        self.key_column = key_column
+        self.columns = columns
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.frame = None  # Rows indexed by rowid
+        self.watermark = 0
+        self._lock = threading.Lock()
+
+    def _sorted(self, frame):
+        """Order rows like the equivalent full SELECT would."""
+        if self.sort_by is None:
+            return frame.sort_index()
+        return frame.sort_values(self.sort_by, ascending=self.ascending, kind="stable")
+
+    def _refresh(self, conn):
+        """Bring the frame up to date inside one read snapshot."""
+        log = ChangeLog(conn)
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+        try:
+            watermark = log.watermark()
+            changes = None
+            if self.frame is not None and log.is_available(self.watermark):
+                changes = log.changes_since(self.table, self.watermark)
+
+            if changes is None or len(changes) > DELTA_MAX_KEYS:
+                self.frame = self._sorted(_select_rows(conn, self.table, self.columns))
+            elif changes:
+                keys = list(changes)
+                fetched = _align_dtypes(
+                    _fetch_rows(conn, self.table, self.key_column, self.columns, keys),
+                    self.frame,
+                )
+                kept = self.frame[~self.frame[self.key_column].isin(keys)]
+                self.frame = self._sorted(pd.concat([kept, fetched]))
+            self.watermark = watermark
+        finally:
+            if own_transaction:
+                conn.commit()
+
+    def read(self, conn):
+        """
+        Get the current table contents.
+
+        Args:
+            conn: SQLite database connection object
+
+        Returns:
+            pd.DataFrame: All rows (a copy callers may modify freely)
+        """
+        with self._lock:
+            if self.frame is None or ChangeLog(conn).watermark() != self.watermark:
+                self._refresh(conn)
+            return self.frame.reset_index(drop=True)
+
+
+# Shared frames keyed by (database, table)
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+# Module-level helpers
+def get_delta_frame(conn, table, key_column, columns="*", sort_by=None, ascending=True):
+    """Get the process-wide DeltaFrame for a table, creating it on first use."""
+    key = (database_key(conn), table)
+    with _frames_lock:
+        frame = _frames.get(key)
+        if frame is None:
+            frame = _frames[key] = DeltaFrame(
+                table, key_column, columns, sort_by, ascending
+            )
+        return frame
+
+
+def fetch_changes(conn, table, key_column, watermark, columns="*"):
+    """
+    Get rows of a table changed since a watermark.
+
+    Args:
+        conn: SQLite database connection object
+        table: Table name
+        key_column: Primary key column
+        watermark: Sequence number from a previous call (0 for everything)
+        columns: SELECT column list
+
+    Returns:
+        tuple: (changed rows DataFrame, deleted keys list, new watermark), or
+            (None, [], new watermark) if the log no longer reaches back to
+            the watermark and the caller must reload the whole table
+    """
+    log = ChangeLog(conn)
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        new_watermark = log.watermark()
+        if watermark and not log.is_available(watermark):
+            return None, [], new_watermark
+
+        if not watermark:
+            rows = _select_rows(conn, table, columns)
+            return rows.reset_index(drop=True), [], new_watermark
+
+        changes = log.changes_since(table, watermark)
+        deleted = [key for key, op in changes.items() if op == "D"]
+        live = [key for key, op in changes.items() if op != "D"]
+        rows = _fetch_rows(conn, table, key_column, columns, live)
+        return rows.reset_index(drop=True), deleted, new_watermark
+    finally:
+        if own_transaction:
+            conn.commit()
@@ -0,0 +1,170 @@
+"""
+Filter Specification Module
+Composable dashboard filters that compile to parameterized SQL WHERE clauses.
+The same specification can also filter an in-memory DataFrame (e.g. rows held
+in the session that are not in the database yet), so pages and AI assistants
+share one definition of "the current filter".
+Date bounds on a table's timestamp column compile against its generated
+epoch-millisecond column (schema migration 8), which reads timestamps by the
+same rules as timestamps.to_datetime64, so SQL and apply() keep the same rows.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from app.data.schema import EPOCH_COLUMNS
+from app.data.timestamps import to_datetime64
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class FilterSpec:
+    """
+    An AND-combined list of column conditions.
+    Methods return self so conditions can be chained; empty selections are
+    ignored, matching how the dashboards treat an empty multiselect.
+    """
+
+    def __init__(self):
+        """Initialize an empty specification (matches every row)."""
+        self.conditions = []  # (kind, column, value)
+
+    # ---------------- BUILDING ----------------
+    def isin(self, column, values):
+        """
+        Keep rows whose column is one of the values.
+
+        Args:
+            column: Column name
+            values: Allowed values (ignored when empty)
+
+        Returns:
+            FilterSpec: self
+        """
+        values = list(values or [])
+        if values:
+            self.conditions.append(("in", column, values))
+        return self
+
+    def equals(self, column, value):
+        """
+        Keep rows whose column equals a value.
+
+        Args:
+            column: Column name
+            value: Required value (ignored when None)
+
+        Returns:
+            FilterSpec: self
+        """
+        if value is not None:
+            self.conditions.append(("in", column, [value]))
+        return self
+
+    def date_range(self, column, start=None, end=None):
+        """
+        Keep rows whose date/time column falls within [start, end] (whole days).
+
+        Args:
+            column: Column holding dates or timestamps
+            start: First day included (optional)
+            end: Last day included (optional)
+
+        Returns:
+            FilterSpec: self
+        """
+        if start is not None:
+            self.conditions.append((">=", column, self._day(start)))
+        if end is not None:
+            # Half-open upper bound so every time on the last day is included
+            self.conditions.append(("<", column, self._day(end) + timedelta(days=1)))
+        return self
+
+    @staticmethod
+    def _day(value):
+        """Normalize a date-like value to a datetime at midnight."""
+        if isinstance(value, datetime):
+            value = value.date()
+        elif not isinstance(value, date):
+            value = pd.Timestamp(value).date()
+        return datetime(value.year, value.month, value.day)
+
+    def is_empty(self):
+        """Check whether the specification matches every row."""
+        return not self.conditions
+
+    # ---------------- COMPILING ----------------
+    @staticmethod
+    def _epoch_ms(value):
+        """Convert a naive (UTC) datetime to epoch milliseconds."""
+        return (value - _EPOCH) // timedelta(milliseconds=1)
+
+    def to_sql(self, allowed_columns, column_map=None, table=None):
+        """
+        Compile to a parameterized WHERE clause.
+
+        Args:
+            allowed_columns: Column names that may appear (guards the SQL text)
+            column_map: Renames applied after validation, e.g. {"timestamp": "day"}
+                to evaluate the filter against a rollup table (optional)
+            table: Table queried; date bounds on its timestamp column compare
+                the epoch-millisecond column instead (optional; without it
+                bounds compare ISO date text, as a rollup's day column holds)
+
+        Returns:
+            tuple: (WHERE clause or "", parameter list)
+
+        Raises:
+            ValueError: If a condition uses a column outside allowed_columns
+        """
+        epoch_columns = dict([EPOCH_COLUMNS[table]]) if table in EPOCH_COLUMNS else {}
+        clauses = []
+        params = []
+        for kind, column, value in self.conditions:
+            if column not in allowed_columns:
+                raise ValueError(f"Cannot filter on column: {column}")
+            if kind == "in":
+                column = (column_map or {}).get(column, column)
+                placeholders = ", ".join("?" for _ in value)
+                clauses.append(f"{column} IN ({placeholders})")
+                params.extend(value)
+            elif column in epoch_columns:
+                # Epoch milliseconds are NULL for values that are not timestamps
+                # (as to_datetime64 gives NaT), and the column is indexed
+                clauses.append(f"{epoch_columns[column]} {kind} ?")
+                params.append(self._epoch_ms(value))
+            else:
+                # ISO text compares in date order and can use the column's index
+                column = (column_map or {}).get(column, column)
+                clauses.append(f"{column} {kind} ?")
+                params.append(value.strftime("%Y-%m-%d"))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def apply(self, df):
+        """
+        Filter a DataFrame with the same conditions.
+
+        Args:
+            df: Rows to filter (missing columns match nothing)
+
+        Returns:
+            pd.DataFrame: Matching rows
+        """
+        if df.empty or self.is_empty():
+            return df
+
+        mask = pd.Series(True, index=df.index)
+        for kind, column, value in self.conditions:
+            if column not in df.columns:
+                return df.iloc[0:0]
+            if kind == "in":
+                mask &= df[column].isin(value)
+            else:
+                # Same parsing rules as the epoch-millisecond columns
+                times = to_datetime64(df[column])
+                bound = pd.Timestamp(value)
+                mask &= (times >= bound) if kind == ">=" else (times < bound)
+        return df[mask]
@@ -0,0 +1,148 @@
+"""
+ID Generation Module
+Monotonic, lexicographically sortable record IDs (ULID layout).
+Each ID is a 48-bit millisecond timestamp followed by 80 random bits, encoded
+as 26 Crockford base32 characters, so IDs sort by creation time and never
+collide within a process; the random bits keep separate processes apart.
+"""
+
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# Crockford base32 alphabet (no I, L, O, U) - preserves sort order when encoded
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+_TIME_CHARS = 10
+_RANDOM_CHARS = 16
+
+
+def _encode(value, length):
+    """Encode an integer as fixed-width Crockford base32."""
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class IdGenerator:
+    """
+    Generates monotonic ULID-style IDs, safe to share between threads.
+    IDs created in the same millisecond increment the random part, and
+    bulk requests reserve a contiguous block under a single lock acquisition.
+    """
+
+    def __init__(self, clock=None):
+        """
+        Initialize IdGenerator.
+
+        Args:
+            clock: Callable returning the current time in milliseconds (optional)
+        """
+        self._clock = clock or (lambda: time.time_ns() // 1_000_000)
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def reset(self):
+        """Forget the last issued ID (used after fork so parent and child diverge)."""
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _reserve(self, count):
+        """
+        Reserve count consecutive IDs.
+
+        Returns:
+            tuple: (millisecond timestamp, first random value) of the block
+        """
+        with self._lock:
+            now = self._clock()
+            if now > self._last_ms:
+                # New millisecond - fresh random start, top bit clear to leave headroom
+                ms, start = now, secrets.randbits(_RANDOM_BITS - 1)
+            else:
+                # Same millisecond (or clock moved back) - continue after the last ID
+                ms, start = self._last_ms, self._last_random + 1
+
+            if start + count - 1 > _RANDOM_MAX:
+                # Random space exhausted for this millisecond - borrow the next one
+                ms, start = ms + 1, secrets.randbits(_RANDOM_BITS - 1)
+                if start + count - 1 > _RANDOM_MAX:
+                    raise ValueError(f"Cannot reserve {count} IDs in one block")
+
+            self._last_ms = ms
+            self._last_random = start + count - 1
+            return ms, start
+
+    def new_ids(self, count, prefix=""):
+        """
+        Generate a block of IDs in ascending order.
+
+        Args:
+            count: Number of IDs
+            prefix: Text prepended to every ID (e.g. "INC")
+
+        Returns:
+            list: count IDs
+        """
+        if count <= 0:
+            return []
+        ms, start = self._reserve(count)
+        head = prefix + _encode(ms, _TIME_CHARS)
+        return [head + _encode(start + i, _RANDOM_CHARS) for i in range(count)]
+
+    def new_id(self, prefix=""):
+        """
+        Generate a single ID.
+
+        Args:
+            prefix: Text prepended to the ID
+
+        Returns:
+            str: New ID
+        """
+        return self.new_ids(1, prefix)[0]
+
+
+# Process-wide generator shared by all models
+_generator = IdGenerator()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_generator.reset)
+
+
+# Module-level helpers using the shared generator
+def new_id(prefix=""):
+    """Generate a single monotonic ID."""
+    return _generator.new_id(prefix)
+
+
+def new_ids(count, prefix=""):
+    """Generate a block of monotonic IDs."""
+    return _generator.new_ids(count, prefix)
+
+
+def id_timestamp(record_id, prefix=""):
+    """
+    Get the creation time embedded in an ID.
+
+    Args:
+        record_id: ID produced by new_id/new_ids
+        prefix: Prefix used when the ID was generated
+
+    Returns:
+        datetime: UTC creation time
+    """
+    encoded = record_id[len(prefix) : len(prefix) + _TIME_CHARS]
+    ms = 0
+    for char in encoded.upper():
+        ms = (ms << 5) | _ALPHABET.index(char)
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
@@ -3,9 +3,16 @@ Security Incident Data Management Module
 Provides OOP interface for cybersecurity incident operations including CRUD and analytics.
 """
 
-import pandas as pd
 from datetime import datetime
 
+from app.data.bulk import BulkInserter, BULK_CHUNK_SIZE
+from app.data.cache import cached_query, invalidate_tables
+from app.data.delta import fetch_changes, get_delta_frame
+from app.data.ids import new_id, new_ids
+from app.data.pagination import DEFAULT_PAGE_SIZE, KeysetPaginator
+from app.data.reconcile import EditorReconciler
+from app.data.timestamps import attach_datetimes
+
 
 # ============================================================
 # SECURITY INCIDENT CLASS (OOP)
@@ -74,14 +81,14 @@ class SecurityIncident:
         """
         cursor = self.conn.cursor()
 
-        # Generate unique incident_id if not provided (format: INC + timestamp)
+        # Generate unique incident_id if not provided (format: INC + sortable ULID)
         if self.incident_id is None:
-            self.incident_id = f"INC{pd.Timestamp.now().strftime('%Y%m%d%H%M%S%f')}"
+            self.incident_id = new_id("INC")
 
         # Use provided timestamp if available, otherwise use current time
         if self.timestamp:
             # Convert timestamp to string format if it's a datetime object
-            if isinstance(self.timestamp, pd.Timestamp):
+            if isinstance(self.timestamp, datetime):
                 timestamp_value = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
             else:
                 timestamp_value = str(self.timestamp)
@@ -105,6 +112,7 @@ class SecurityIncident:
             ),
         )
         self.conn.commit()
+        invalidate_tables(self.conn, "cyber_incidents")
         return self.incident_id
 
     def update_status(self, new_status):
@@ -117,6 +125,7 @@ class SecurityIncident:
         """
         cursor.execute(query, (new_status, self.incident_id))
         self.conn.commit()
+        invalidate_tables(self.conn, "cyber_incidents")
         self.status = new_status
 
     def delete(self):
@@ -125,6 +134,7 @@ class SecurityIncident:
         query = "DELETE FROM cyber_incidents WHERE incident_id = ?"
         cursor.execute(query, (self.incident_id,))
         self.conn.commit()
+        invalidate_tables(self.conn, "cyber_incidents")
 
     def to_dict(self):
         """Convert incident to dictionary."""
@@ -138,11 +148,161 @@ class SecurityIncident:
             "inserted_at": self.inserted_at,
         }
 
+    @classmethod
+    def _new_ids(cls, count):
+        """Generate incident IDs for bulk rows without one."""
+        return new_ids(count, "INC")
+
+    @classmethod
+    def bulk_insert(
+        cls,
+        conn,
+        df,
+        chunk_size=BULK_CHUNK_SIZE,
+        first_row_number=1,
+        on_conflict="skip",
+    ):
+        """
+        Insert many incidents at once with vectorized type conversion.
+        Stores the same values as save(), one transaction per chunk.
+
+        Args:
+            conn: Database connection object
+            df: DataFrame with incident columns
+            chunk_size: Rows per transaction
+            first_row_number: Report number of the first row
+            on_conflict: Existing-id policy - "skip", "overwrite" or "merge_newer"
+                (merge_newer replaces only when the upload's timestamp is newer)
+
+        Returns:
+            BulkInsertResult: Inserted/updated counts plus duplicate and error reports
+        """
+        inserter = BulkInserter(
+            conn,
+            table="cyber_incidents",
+            key_column="incident_id",
+            column_sql={
+                "incident_id": "?",
+                "category": "?",
+                "severity": "?",
+                "status": "?",
+                "description": "?",
+                "timestamp": "COALESCE(?, datetime('now'))",
+            },
+            id_factory=cls._new_ids,
+            timestamp_columns=["timestamp"],
+            version_column="timestamp",
+        )
+        return inserter.insert(df, chunk_size, first_row_number, on_conflict)
+
+    # Columns read by get_all / get_changes_since / get_filtered (timestamp_ms
+    # becomes the datetime64 timestamp column, see attach_datetimes)
+    _COLUMNS = (
+        "incident_id, timestamp, severity, category, status, description, inserted_at, "
+        "timestamp_ms"
+    )
+
     @classmethod
     def get_all(cls, conn):
-        """Get all incidents as DataFrame."""
-        query = "SELECT * FROM cyber_incidents"
-        return pd.read_sql_query(query, conn)
+        """Get all incidents as DataFrame (merged incrementally from the change log)."""
+        rows = get_delta_frame(conn, "cyber_incidents", "incident_id", cls._COLUMNS).read(conn)
+        return attach_datetimes(rows, "cyber_incidents")
+
+    @classmethod
+    def get_changes_since(cls, conn, watermark):
+        """
+        Get incidents changed since a watermark.
+
+        Args:
+            conn: SQLite database connection object
+            watermark: Value returned by a previous call (0 for all incidents)
+
+        Returns:
+            tuple: (changed rows, deleted incident_ids, new watermark); rows is
+                None if the watermark is too old and a full reload is needed
+        """
+        rows, deleted, watermark = fetch_changes(
+            conn, "cyber_incidents", "incident_id", watermark, cls._COLUMNS
+        )
+        if rows is not None:
+            attach_datetimes(rows, "cyber_incidents")
+        return rows, deleted, watermark
+
+    # Columns a FilterSpec may reference
+    FILTER_COLUMNS = ("incident_id", "timestamp", "severity", "category", "status")
+
+    @classmethod
+    def get_filtered(cls, conn, spec):
+        """
+        Get incidents matching a filter, evaluated in SQL.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over FILTER_COLUMNS
+
+        Returns:
+            pd.DataFrame: Matching incidents (all incidents for an empty spec)
+        """
+        if spec.is_empty():
+            return cls.get_all(conn)
+        where, params = spec.to_sql(cls.FILTER_COLUMNS, table="cyber_incidents")
+        query = f"SELECT {cls._COLUMNS} FROM cyber_incidents {where}"
+        rows = cached_query(conn, query, ["cyber_incidents"], params=params)
+        return attach_datetimes(rows, "cyber_incidents")
+
+    # Columns the dashboard data editor may change
+    EDITABLE_COLUMNS = ("timestamp", "severity", "category", "status", "description")
+
+    @classmethod
+    def reconciler(cls):
+        """Get a reconciler writing data editor deletions and edits back to incidents."""
+        return EditorReconciler(
+            "cyber_incidents",
+            "incident_id",
+            cls.EDITABLE_COLUMNS,
+            datetime_formats={"timestamp": "%Y-%m-%d %H:%M:%S.%f"},
+        )
+
+    # Columns the paginated grid may sort by (timestamp seeks its composite index)
+    SORT_COLUMNS = ("timestamp", "severity", "category", "status", "incident_id")
+
+    @classmethod
+    def paginator(cls):
+        """Get a keyset paginator over incidents."""
+        return KeysetPaginator(
+            "cyber_incidents",
+            "incident_id",
+            cls.SORT_COLUMNS,
+            cls.FILTER_COLUMNS,
+            columns=cls._COLUMNS,
+            transform=lambda rows: attach_datetimes(rows, "cyber_incidents"),
+        )
+
+    @classmethod
+    def get_page(
+        cls,
+        conn,
+        spec=None,
+        sort_by="timestamp",
+        descending=True,
+        cursor=None,
+        page_size=DEFAULT_PAGE_SIZE,
+    ):
+        """
+        Get one page of incidents matching a filter, sorted in SQL.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over FILTER_COLUMNS (optional)
+            sort_by: One of SORT_COLUMNS
+            descending: Sort direction
+            cursor: Cursor returned with the previous page (None for the first page)
+            page_size: Maximum incidents returned
+
+        Returns:
+            tuple: (incidents DataFrame, cursor for the next page or None)
+        """
+        return cls.paginator().page(conn, spec, sort_by, descending, cursor, page_size)
 
     @classmethod
     def get_by_type_count(cls, conn):
@@ -153,7 +313,7 @@ class SecurityIncident:
         GROUP BY category
         ORDER BY count DESC
         """
-        return pd.read_sql_query(query, conn)
+        return cached_query(conn, query, ["cyber_incidents"])
 
     @classmethod
     def get_high_severity_by_status(cls, conn):
@@ -165,7 +325,7 @@ class SecurityIncident:
         GROUP BY status
         ORDER BY count DESC
         """
-        return pd.read_sql_query(query, conn)
+        return cached_query(conn, query, ["cyber_incidents"])
 
     @classmethod
     def get_types_with_many_cases(cls, conn, min_count=5):
@@ -177,7 +337,7 @@ class SecurityIncident:
         HAVING COUNT(*) > ?
         ORDER BY count DESC
         """
-        return pd.read_sql_query(query, conn, params=(min_count,))
+        return cached_query(conn, query, ["cyber_incidents"], params=(min_count,))
 
 
 # ============================================================
@@ -236,6 +396,7 @@ def update_incident_status(conn, incident_id, new_status):
         """
     cursor.execute(query, (new_status, incident_id))
     conn.commit()
+    invalidate_tables(conn, "cyber_incidents")
 
 
 def delete_incident(conn, incident_id):
@@ -251,3 +412,4 @@ def delete_incident(conn, incident_id):
         query = "DELETE FROM cyber_incidents WHERE incident_id = ?"
     cursor.execute(query, (incident_id,))
     conn.commit()
+    invalidate_tables(conn, "cyber_incidents")
@@ -0,0 +1,213 @@
+"""
+AI Response Cache Module
+Persistent, content-addressed cache of AI responses stored in SQLite.
+A response is keyed by a hash of the model, temperature, the user's
+question, the data context sent with it and the data version (the
+row_changes watermark), so the same question about the same data is
+answered from the cache - whatever was said earlier in the chat - while
+any write to the dashboard tables moves every key on. Entries expire after a TTL and the
+least recently used are evicted beyond a size cap.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from app.data.db import DB_PATH, get_pool
+from app.data.delta import ChangeLog
+
+
+# Maximum cached responses (least recently used are dropped first)
+LLM_CACHE_MAX_ENTRIES = 2000
+
+# Seconds a cached response stays valid
+LLM_CACHE_TTL = 24 * 3600
+
+
+def normalize_prompt(prompt):
+    """
+    Normalize a prompt so differences in spacing alone share a key.
+    Case is kept: the prompt embeds data values, and prompts about rows
+    that differ only in case must not share a response.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        str: Prompt with whitespace collapsed
+    """
+    return " ".join(str(prompt).split())
+
+
+def request_key(model, temperature, question, context, data_version):
+    """
+    Hash a request into a cache key.
+    The chat history is deliberately not part of the key: it grows with
+    every turn, so keying on it would make repeated questions miss.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature (None for the model default)
+        question: User's current question
+        context: Instructions and data sent with the question
+        data_version: Version of the data the prompt was built from
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        [
+            model,
+            temperature,
+            normalize_prompt(question),
+            normalize_prompt(context),
+            data_version,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Reads and writes the llm_response_cache table of one database.
+    Every call uses a pooled connection of its own; cache failures (for
+    example a locked database) are treated as misses so they never block
+    an answer.
+    """
+
+    def __init__(
+        self, db_path=DB_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL
+    ):
+        """
+        Initialize ResponseCache.
+
+        Args:
+            db_path: Path to database file (defaults to DB_PATH)
+            max_entries: Maximum number of cached responses (0 disables caching)
+            ttl_seconds: Seconds a response stays valid
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    def key(self, model, temperature, question, context=""):
+        """
+        Build the cache key for a request against the current data.
+        Take the key once per request and pass it to get() and put(), so a
+        response is stored under the data version it was generated from.
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature (None for the model default)
+            question: User's current question
+            context: Instructions and data sent with it (not the chat history)
+
+        Returns:
+            str: Cache key
+        """
+        try:
+            with get_pool(self.db_path).connection() as conn:
+                data_version = ChangeLog(conn).watermark()
+        except sqlite3.Error:
+            data_version = None
+        return request_key(model, temperature, question, context, data_version)
+
+    def get(self, key):
+        """
+        Look up a response, marking it as recently used.
+
+        Args:
+            key: Cache key from key()
+
+        Returns:
+            str: Cached response, or None on a miss
+        """
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        try:
+            with get_pool(self.db_path).connection() as conn:
+                row = conn.execute(
+                    "SELECT response FROM llm_response_cache "
+                    "WHERE cache_key = ? AND created_at > ?",
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE llm_response_cache SET last_used_at = ?, hits = hits + 1 "
+                    "WHERE cache_key = ?",
+                    (now, key),
+                )
+                conn.commit()
+                return row[0]
+        except sqlite3.Error:
+            return None
+
+    def put(self, key, model, response):
+        """
+        Store a response and evict expired and least recently used entries. Commits.
+
+        Args:
+            key: Cache key from key()
+            model: Model that produced the response
+            response: Response text
+        """
+        if self.max_entries <= 0 or not response:
+            return
+        now = time.time()
+        try:
+            with get_pool(self.db_path).connection() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_response_cache
+                        (cache_key, model, response, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (key, model, response, now, now),
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn, now):
+        """Delete expired entries and everything past the size cap (oldest use first)."""
+        conn.execute(
+            "DELETE FROM llm_response_cache WHERE created_at <= ?",
+            (now - self.ttl_seconds,),
+        )
+        conn.execute(
+            """
+            DELETE FROM llm_response_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_response_cache
+                ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        """Delete every cached response. Commits."""
+        with get_pool(self.db_path).connection() as conn:
+            conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, hits (total times responses were served from the cache)
+        """
+        with get_pool(self.db_path).connection() as conn:
+            entries, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM llm_response_cache"
+            ).fetchone()
+        return {"entries": entries, "hits": hits}
+
+
+# Process-wide cache of the application database
+response_cache = ResponseCache()
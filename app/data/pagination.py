@@ -0,0 +1,150 @@
+"""
+Keyset Pagination Module
+Pages through a table in a stable sort order without OFFSET.
+Each page remembers its last row's (sort value, primary key) as a cursor and
+the next page seeks past it, so every page costs the same index range scan
+however deep the reader goes, and only the visible rows are read.
+"""
+
+import pandas as pd
+
+from app.data.cache import cached_query
+
+
+# Rows per page unless the caller asks otherwise
+DEFAULT_PAGE_SIZE = 100
+
+
+def _param(value):
+    """Convert a DataFrame cell to a value sqlite3 can bind (NaN/NA become None)."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+class KeysetPaginator:
+    """
+    Reads pages of one table ordered by (sort column, primary key).
+    The primary key breaks ties, so the order is total and a cursor always
+    identifies exactly one position. NULL sort values come first ascending
+    and last descending, as in SQLite's ORDER BY.
+    """
+
+    def __init__(
+        self, table, key_column, sort_columns, filter_columns, columns="*", transform=None
+    ):
+        """
+        Initialize KeysetPaginator.
+
+        Args:
+            table: Table name
+            key_column: Primary key column (the tie breaker)
+            sort_columns: Columns a page may be sorted by
+            filter_columns: Columns a FilterSpec may reference
+            columns: SELECT column list
+            transform: Function applied to each page after its cursor is taken (optional)
+        """
+        self.table = table
+        self.key_column = key_column
+        self.sort_columns = tuple(sort_columns)
+        self.filter_columns = tuple(filter_columns)
+        self.columns = columns
+        self.transform = transform
+
+    def _seek(self, sort_by, descending, cursor):
+        """
+        Build the condition selecting rows after a cursor.
+
+        Returns:
+            tuple: (SQL condition, parameter list)
+        """
+        sort_value, key = cursor
+        op = "<" if descending else ">"
+        if sort_by == self.key_column:
+            return f"{self.key_column} {op} ?", [key]
+        if sort_value is None:
+            # Inside the NULL block: ascending continues into the non-NULL rows
+            condition = f"({sort_by} IS NULL AND {self.key_column} {op} ?)"
+            if not descending:
+                condition = f"({condition} OR {sort_by} IS NOT NULL)"
+            return condition, [key]
+        # Row-value comparison seeks the (sort_by, key) index directly
+        condition = f"({sort_by}, {self.key_column}) {op} (?, ?)"
+        if descending:
+            condition = f"({condition} OR {sort_by} IS NULL)"
+        return condition, [sort_value, key]
+
+    def page(
+        self,
+        conn,
+        spec=None,
+        sort_by=None,
+        descending=False,
+        cursor=None,
+        page_size=DEFAULT_PAGE_SIZE,
+    ):
+        """
+        Read one page.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over filter_columns (optional)
+            sort_by: Sort column (defaults to the primary key)
+            descending: Sort direction
+            cursor: Cursor returned with the previous page (None for the first page)
+            page_size: Maximum rows returned
+
+        Returns:
+            tuple: (page DataFrame, cursor for the next page or None on the last page)
+
+        Raises:
+            ValueError: If sort_by is not one of sort_columns
+        """
+        sort_by = sort_by or self.key_column
+        if sort_by not in self.sort_columns and sort_by != self.key_column:
+            raise ValueError(f"Cannot sort on column: {sort_by}")
+
+        where, params = "", []
+        if spec is not None:
+            where, params = spec.to_sql(self.filter_columns, table=self.table)
+        if cursor is not None:
+            condition, seek_params = self._seek(sort_by, descending, cursor)
+            where = f"{where} AND {condition}" if where else f"WHERE {condition}"
+            params = params + seek_params
+
+        direction = "DESC" if descending else "ASC"
+        order = f"{self.key_column} {direction}"
+        if sort_by != self.key_column:
+            order = f"{sort_by} {direction}, {order}"
+        # One extra row tells whether another page follows
+        query = (
+            f"SELECT {self.columns} FROM {self.table} {where} "
+            f"ORDER BY {order} LIMIT {int(page_size) + 1}"
+        )
+        df = cached_query(conn, query, [self.table], params=params)
+
+        next_cursor = None
+        if len(df) > page_size:
+            df = df.iloc[:page_size].copy()
+            last = df.iloc[-1]
+            next_cursor = (_param(last[sort_by]), _param(last[self.key_column]))
+        if self.transform is not None:
+            df = self.transform(df)
+        return df, next_cursor
+
+    def count(self, conn, spec=None):
+        """
+        Count the rows matching a filter.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over filter_columns (optional)
+
+        Returns:
+            int: Matching rows
+        """
+        where, params = "", []
+        if spec is not None:
+            where, params = spec.to_sql(self.filter_columns, table=self.table)
+        query = f"SELECT COUNT(*) AS n FROM {self.table} {where}"
+        return int(cached_query(conn, query, [self.table], params=params)["n"].iloc[0])
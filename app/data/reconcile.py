@@ -0,0 +1,155 @@
+"""
+Editor Reconciliation Module
+Turns the state of a data editor back into database writes.
+The rows shown and the rows returned by the editor are diffed by primary key
+with vectorized set operations; removed keys become batched DELETEs and
+edited cells become UPDATEs, all written in one transaction.
+"""
+
+import pandas as pd
+
+from app.data.cache import invalidate_tables
+
+
+# SQLite limits host parameters per statement; stay well below it for IN (...) deletes
+_DELETE_BATCH_SIZE = 500
+
+
+class EditorChanges:
+    """
+    Differences between the rows shown in an editor and the rows it returned.
+    deleted is a pd.Index of primary keys; updated holds the new values of
+    every edited row (indexed by key) and edited marks which of its cells
+    actually changed, so a cell cleared to NULL is still written.
+    """
+
+    def __init__(self, deleted, updated, edited):
+        """
+        Initialize EditorChanges.
+
+        Args:
+            deleted: Primary keys removed in the editor
+            updated: New values of the edited rows, indexed by primary key
+            edited: Boolean frame shaped like updated, True for changed cells
+        """
+        self.deleted = deleted
+        self.updated = updated
+        self.edited = edited
+
+    def is_empty(self):
+        """Check whether the editor changed nothing."""
+        return self.deleted.empty and self.updated.empty
+
+
+class EditorReconciler:
+    """
+    Diffs editor state against its source rows and persists the result.
+    Only the listed columns are compared and written; anything else (row
+    numbers, derived columns) is ignored.
+    """
+
+    def __init__(self, table, key_column, columns, datetime_formats=None):
+        """
+        Initialize EditorReconciler.
+
+        Args:
+            table: Table name
+            key_column: Primary key column
+            columns: Editable columns written back to the table
+            datetime_formats: Column -> strftime format used to store parsed
+                datetimes back as text (optional)
+        """
+        self.table = table
+        self.key_column = key_column
+        self.columns = list(columns)
+        self.datetime_formats = datetime_formats or {}
+
+    def _keyed(self, df):
+        """Index rows by primary key (the last row wins for repeated keys)."""
+        df = df[df[self.key_column].notna()]
+        keys = df[self.key_column].astype(str)
+        df = df.set_index(keys)
+        return df[~df.index.duplicated(keep="last")]
+
+    def diff(self, original, edited):
+        """
+        Compare the rows shown with the rows returned by the editor.
+
+        Args:
+            original: Rows passed to the editor
+            edited: Rows returned by the editor
+
+        Returns:
+            EditorChanges: Deleted keys and edited cells
+        """
+        original = self._keyed(original)
+        edited = self._keyed(edited)
+        deleted = original.index.difference(edited.index)
+
+        kept = original.index.intersection(edited.index)
+        columns = [c for c in self.columns if c in original.columns and c in edited.columns]
+        before = original.loc[kept, columns].astype(object)
+        after = edited.loc[kept, columns].astype(object)
+        # NA/None on both sides is not an edit
+        changed = before.ne(after) & ~(before.isna() & after.isna())
+        rows = changed.any(axis=1)
+        return EditorChanges(deleted, after[rows], changed[rows])
+
+    def _value(self, column, value):
+        """Convert an edited cell to a value sqlite3 can bind."""
+        if pd.isna(value):
+            return None
+        if isinstance(value, pd.Timestamp):
+            return value.strftime(self.datetime_formats.get(column, "%Y-%m-%d %H:%M:%S"))
+        return value.item() if hasattr(value, "item") else value
+
+    def apply(self, conn, changes):
+        """
+        Write deletions and edits to the table in one transaction. Commits.
+
+        Args:
+            conn: SQLite database connection object
+            changes: EditorChanges from diff()
+
+        Returns:
+            tuple: (rows deleted, rows updated)
+        """
+        if changes.is_empty():
+            return 0, 0
+
+        deleted = updated = 0
+        try:
+            cursor = conn.cursor()
+            keys = list(changes.deleted)
+            for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+                batch = keys[start : start + _DELETE_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE {self.key_column} IN ({placeholders})",
+                    batch,
+                )
+                deleted += cursor.rowcount
+
+            # One executemany per set of edited columns
+            edited = changes.edited
+            signatures = (
+                edited.apply(lambda row: tuple(edited.columns[row]), axis=1)
+                if not edited.empty
+                else pd.Series(dtype=object)
+            )
+            for edited_columns, rows in changes.updated.groupby(signatures):
+                assignments = ", ".join(f"{col} = ?" for col in edited_columns)
+                cursor.executemany(
+                    f"UPDATE {self.table} SET {assignments} WHERE {self.key_column} = ?",
+                    [
+                        [self._value(col, row[col]) for col in edited_columns] + [key]
+                        for key, row in zip(rows.index, rows.to_dict("records"))
+                    ],
+                )
+                updated += cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        invalidate_tables(conn, self.table)
+        return deleted, updated
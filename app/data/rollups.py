@@ -0,0 +1,128 @@
+"""
+Rollup Module
+Reads the trigger-maintained rollup tables (see schema migration 6).
+Dashboards aggregate a few hundred pre-counted groups instead of the whole
+table; session rows not yet in the database are summarized the same way
+in pandas and merged in.
+"""
+
+import pandas as pd
+
+from app.data.cache import cached_query
+from app.data.schema import ROLLUPS
+
+
+class Rollup:
+    """
+    Per-day group counts for one source table.
+    Frames have a day column (ISO date text), the table's dimension columns,
+    a count column and any extra measures (e.g. resolution_hours_sum).
+    """
+
+    def __init__(self, table):
+        """
+        Initialize Rollup.
+
+        Args:
+            table: Source table name (a key of schema.ROLLUPS)
+        """
+        self.table = table
+        self.rollup_table, self.day_column, self.dimensions, measures = ROLLUPS[table]
+        self.measure_specs = measures
+        self.measures = [name for name, _, _ in measures]
+        self.group_columns = ["day"] + list(self.dimensions)
+        self.value_columns = ["count"] + self.measures
+
+    def read(self, conn, spec=None):
+        """
+        Read the rollup, optionally filtered.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over the source table's columns (optional)
+
+        Returns:
+            pd.DataFrame: One row per non-empty group
+        """
+        where, params = "", []
+        if spec is not None:
+            where, params = spec.to_sql(
+                [self.day_column] + list(self.dimensions), {self.day_column: "day"}
+            )
+        # '' stands in for NULL in the rollup key
+        columns = ", ".join(
+            [f"NULLIF({col}, '') AS {col}" for col in self.group_columns]
+            + ["row_count AS count"]
+            + self.measures
+        )
+        query = f"SELECT {columns} FROM {self.rollup_table} {where}"
+        # Rollups change exactly when their source table does
+        return cached_query(conn, query, [self.table], params=params)
+
+    def summarize(self, df):
+        """
+        Summarize in-memory rows into the rollup shape.
+
+        Args:
+            df: Rows of the source table (e.g. session data)
+
+        Returns:
+            pd.DataFrame: One row per group
+        """
+        if df is None or df.empty:
+            return pd.DataFrame(columns=self.group_columns + self.value_columns)
+
+        # Same rule as the triggers: only values starting YYYY- carry a day
+        values = df[self.day_column]
+        dated = values.astype("string").str.match(r"\d{4}-").fillna(False).astype(bool)
+        frame = pd.DataFrame(
+            {
+                "day": pd.to_datetime(values.where(dated), errors="coerce").dt.strftime(
+                    "%Y-%m-%d"
+                )
+            },
+            index=df.index,
+        )
+        for col in self.dimensions:
+            frame[col] = df[col] if col in df.columns else None
+        frame["count"] = 1
+        for name, source, kind in self.measure_specs:
+            if source in df.columns:
+                values = pd.to_numeric(df[source], errors="coerce")
+            else:
+                values = pd.Series(float("nan"), index=df.index)
+            frame[name] = values.fillna(0) if kind == "sum" else values.notna().astype(int)
+        return (
+            frame.groupby(self.group_columns, dropna=False)[self.value_columns]
+            .sum()
+            .reset_index()
+        )
+
+    def merge(self, *frames):
+        """
+        Add rollup frames together group by group.
+
+        Args:
+            *frames: Frames from read() / summarize()
+
+        Returns:
+            pd.DataFrame: Combined rollup
+        """
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=self.group_columns + self.value_columns)
+        if len(frames) == 1:
+            return frames[0]
+        return (
+            pd.concat(frames, ignore_index=True)
+            .groupby(self.group_columns, dropna=False)[self.value_columns]
+            .sum()
+            .reset_index()
+        )
+
+
+# Module-level helper
+def read_rollup(conn, table, spec=None, session_rows=None):
+    """Read a table's rollup and merge in a summary of session rows."""
+    rollup = Rollup(table)
+    return rollup.merge(rollup.read(conn, spec), rollup.summarize(session_rows))
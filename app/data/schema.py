@@ -1,8 +1,63 @@
 """
 Database Schema Management Module
 Handles creation and management of all database tables.
+Applies ordered, versioned migrations tracked in the schema_version table.
 """
 
+# SQL definitions for every application table (current shape)
+TABLE_DEFINITIONS = {
+    "users": """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,  -- Auto-incrementing primary key
+            username TEXT NOT NULL UNIQUE,  -- Unique username constraint
+            password_hash TEXT NOT NULL,  -- Bcrypt hashed password
+            role TEXT DEFAULT 'user',  -- User role (cyber, data, it, admin)
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  -- Account creation timestamp
+        )
+    """,
+    "cyber_incidents": """
+        CREATE TABLE IF NOT EXISTS cyber_incidents (
+            incident_id TEXT PRIMARY KEY NOT NULL,  -- Unique incident identifier
+            timestamp TEXT,  -- When the incident occurred
+            severity TEXT,  -- Severity level (Critical, High, Medium, Low)
+            category TEXT,  -- Incident category/type
+            status TEXT,  -- Current status (Open, In Progress, Resolved, Closed)
+            description TEXT,  -- Detailed incident description
+            inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  -- Record insertion timestamp
+        )
+    """,
+    "datasets_metadata": """
+        CREATE TABLE IF NOT EXISTS datasets_metadata (
+            dataset_id TEXT PRIMARY KEY NOT NULL,
+            name TEXT NOT NULL,
+            rows INTEGER,
+            columns INTEGER,
+            uploaded_by TEXT,
+            upload_date TEXT
+        )
+    """,
+    "it_tickets": """
+        CREATE TABLE IF NOT EXISTS it_tickets (
+            ticket_id TEXT PRIMARY KEY NOT NULL,
+            priority TEXT,
+            description TEXT,
+            status TEXT,
+            assigned_to TEXT,
+            created_at TEXT,
+            resolution_time_hours REAL,
+            inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+# Primary key column and fallback id prefix for tables rebuilt by migration 2
+PRIMARY_KEYS = {
+    "cyber_incidents": ("incident_id", "INC-LEGACY-"),
+    "datasets_metadata": ("dataset_id", "DS-LEGACY-"),
+    "it_tickets": ("ticket_id", "T-LEGACY-"),
+}
+
+
 class DatabaseSchema:
     """
     Manages database schema creation and management.
@@ -12,7 +67,7 @@ class DatabaseSchema:
     def __init__(self, conn):
         """
         Initialize DatabaseSchema with database connection.
-        
+
         Args:
             conn: SQLite database connection object
         """
@@ -25,19 +80,8 @@ class DatabaseSchema:
         Create the users table if it doesn't exist.
         Stores user authentication credentials and role information.
         """
-        # SQL statement to create users table with authentication fields
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,  # Auto-incrementing primary key
-            username TEXT NOT NULL UNIQUE,  # Unique username constraint
-            password_hash TEXT NOT NULL,  # Bcrypt hashed password
-            role TEXT DEFAULT 'user',  # User role (cyber, data, it, admin)
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  # Account creation timestamp
-        )
-        """
-
         # Execute SQL and commit transaction
-        self.cursor.execute(create_table_sql)
+        self.cursor.execute(TABLE_DEFINITIONS["users"])
         self.conn.commit()
         print(" Users table created successfully!")
 
@@ -46,70 +90,632 @@ class DatabaseSchema:
         Create the cyber_incidents table if it doesn't exist.
         Stores cybersecurity incident records with severity, category, and status.
         """
-        # SQL statement to create cyber incidents table
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
-            incident_id TEXT UNIQUE,  # Unique incident identifier
-            timestamp TEXT,  # When the incident occurred
-            severity TEXT,  # Severity level (Critical, High, Medium, Low)
-            category TEXT,  # Incident category/type
-            status TEXT,  # Current status (Open, In Progress, Resolved, Closed)
-            description TEXT,  # Detailed incident description
-            inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  # Record insertion timestamp
-        )
-        """
-
         # Execute SQL and commit transaction
-        self.cursor.execute(create_table_sql)
+        self.cursor.execute(TABLE_DEFINITIONS["cyber_incidents"])
         self.conn.commit()
         print(" Cyber Incidents table created successfully!")
 
     def create_datasets_metadata_table(self):
         """Create the datasets_metadata table."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS datasets_metadata (
-            dataset_id TEXT UNIQUE,
-            name TEXT NOT NULL,
-            rows INTEGER,
-            columns INTEGER,
-            uploaded_by TEXT,
-            upload_date TEXT
-        )
-        """
-
-        self.cursor.execute(create_table_sql)
+        self.cursor.execute(TABLE_DEFINITIONS["datasets_metadata"])
         self.conn.commit()
         print(" Datasets Metadata table created successfully!")
 
     def create_it_tickets_table(self):
         """Create the it_tickets table."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS it_tickets (
-            ticket_id TEXT UNIQUE NOT NULL,
-            priority TEXT,
-            description TEXT,
-            status TEXT,
-            assigned_to TEXT,
-            created_at TEXT,
-            resolution_time_hours REAL,
-            inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-
-        self.cursor.execute(create_table_sql)
+        self.cursor.execute(TABLE_DEFINITIONS["it_tickets"])
         self.conn.commit()
         print(" IT Tickets table created successfully!")
 
     def create_all_tables(self):
         """
         Create all database tables in the correct order.
-        Ensures all required tables exist before data operations.
+        Ensures all required tables exist before data operations, then
+        applies any pending schema migrations.
         """
         # Create tables in dependency order
         self.create_users_table()  # Users table (no dependencies)
         self.create_cyber_incidents_table()  # Incidents table (no dependencies)
         self.create_datasets_metadata_table()  # Datasets table (no dependencies)
         self.create_it_tickets_table()  # IT tickets table (no dependencies)
+        # Bring the schema up to the latest version
+        self.migrate()
+
+    def migrate(self):
+        """
+        Apply pending schema migrations.
+
+        Returns:
+            list: Versions applied by this call
+        """
+        return SchemaMigrator(self.conn).migrate()
+
+
+# ============================================================
+# MIGRATIONS
+# ============================================================
+def _create_baseline_tables(conn):
+    """Migration 1: create every application table if missing."""
+    for create_sql in TABLE_DEFINITIONS.values():
+        conn.execute(create_sql)
+
+
+def _rebuild_with_primary_keys(conn):
+    """
+    Migration 2: rebuild legacy tables that only had a UNIQUE id column so the id
+    becomes a NOT NULL primary key. Rowids are preserved and NULL ids get a
+    deterministic fallback so no rows are lost.
+    """
+    for table, (pk_column, fallback_prefix) in PRIMARY_KEYS.items():
+        table_info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        # table_info rows: (cid, name, type, notnull, default, pk)
+        if any(col[1] == pk_column and col[5] for col in table_info):
+            continue  # Already has the primary key
+
+        new_table = f"{table}_migrating"
+        create_sql = TABLE_DEFINITIONS[table].replace(
+            f"CREATE TABLE IF NOT EXISTS {table} (", f"CREATE TABLE {new_table} ("
+        )
+        conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+        conn.execute(create_sql)
+
+        # Only carry over columns the current table definition knows about
+        new_columns = {
+            col[1] for col in conn.execute(f"PRAGMA table_info({new_table})")
+        }
+        columns = [col[1] for col in table_info if col[1] in new_columns]
+
+        # Copy rows, keeping rowid order; duplicates of one id keep the first row
+        select_cols = [
+            (
+                f"COALESCE(NULLIF(TRIM({col}), ''), '{fallback_prefix}' || rowid)"
+                if col == pk_column
+                else col
+            )
+            for col in columns
+        ]
+        conn.execute(
+            f"INSERT OR IGNORE INTO {new_table} (rowid, {', '.join(columns)}) "
+            f"SELECT rowid, {', '.join(select_cols)} FROM {table} ORDER BY rowid"
+        )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+
+
+# Secondary indexes backing dashboard filters and GROUP BY aggregations
+_DASHBOARD_INDEXES = [
+    # get_by_type_count / category charts (covering: COUNT(*) GROUP BY category)
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_category ON cyber_incidents(category, severity, status)",
+    # get_high_severity_by_status (covering: WHERE severity = ? GROUP BY status)
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_severity_status ON cyber_incidents(severity, status)",
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_status ON cyber_incidents(status)",
+    "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_timestamp ON cyber_incidents(timestamp)",
+    # get_priority_counts (covering: COUNT(*) GROUP BY priority)
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_priority ON it_tickets(priority, status)",
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_status ON it_tickets(status)",
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_assigned_to ON it_tickets(assigned_to, status)",
+    "CREATE INDEX IF NOT EXISTS idx_it_tickets_created_at ON it_tickets(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_upload_date ON datasets_metadata(upload_date)",
+    "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_uploaded_by ON datasets_metadata(uploaded_by)",
+]
+
+
+def _create_dashboard_indexes(conn):
+    """Migration 3: add secondary indexes used by dashboard aggregations."""
+    for index_sql in _DASHBOARD_INDEXES:
+        conn.execute(index_sql)
+    # Refresh planner statistics so the new indexes are picked up
+    conn.execute("ANALYZE")
+
+
+def _create_csv_manifest(conn):
+    """Migration 4: track loaded source CSV files for incremental bootstrap."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS csv_manifest (
+            source_path TEXT PRIMARY KEY,  -- Absolute path of the source CSV
+            table_name TEXT NOT NULL,  -- Table the file is loaded into
+            content_hash TEXT NOT NULL,  -- SHA-256 of the loaded bytes
+            byte_offset INTEGER NOT NULL,  -- Bytes consumed so far
+            file_size INTEGER,  -- File size at last load
+            mtime_ns INTEGER,  -- Modification time at last load
+            row_count INTEGER DEFAULT 0,  -- Rows loaded from this file
+            loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def _create_change_log(conn):
+    """
+    Migration 5: log inserted, updated and deleted keys of the dashboard tables
+    so readers can fetch only what changed since their last watermark.
+    Deleted keys stay in the log as tombstones.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS row_changes (
+            seq INTEGER PRIMARY KEY,  -- Watermark (rowid; pruning keeps the newest rows, so it only grows)
+            table_name TEXT NOT NULL,  -- Table the row belongs to
+            record_id TEXT NOT NULL,  -- Primary key of the changed row
+            op TEXT NOT NULL,  -- 'I' insert, 'U' update, 'D' delete (tombstone)
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    for table, (pk_column, _) in PRIMARY_KEYS.items():
+        log = "INSERT INTO row_changes (table_name, record_id, op)"
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_log_insert AFTER INSERT ON {table}
+            BEGIN
+                {log} VALUES ('{table}', NEW.{pk_column}, 'I');
+            END
+            """
+        )
+        # A changed primary key is a delete of the old key plus an update of the new one
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_log_update AFTER UPDATE ON {table}
+            BEGIN
+                {log} SELECT '{table}', OLD.{pk_column}, 'D'
+                    WHERE OLD.{pk_column} IS NOT NEW.{pk_column};
+                {log} VALUES ('{table}', NEW.{pk_column}, 'U');
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_log_delete AFTER DELETE ON {table}
+            BEGIN
+                {log} VALUES ('{table}', OLD.{pk_column}, 'D');
+            END
+            """
+        )
+
+
+# Rollup tables: source table -> (rollup table, day source column, dimension columns, measures)
+# Measures are (rollup column, source column, "sum" or "count" of non-NULL values)
+ROLLUPS = {
+    "cyber_incidents": (
+        "incident_rollup",
+        "timestamp",
+        ("severity", "category", "status"),
+        [],
+    ),
+    "it_tickets": (
+        "ticket_rollup",
+        "created_at",
+        ("priority", "assigned_to", "status"),
+        [
+            ("resolution_hours_sum", "resolution_time_hours", "sum"),
+            ("resolution_hours_count", "resolution_time_hours", "count"),
+        ],
+    ),
+}
+
+
+def _create_rollups(conn):
+    """
+    Migration 6: per-day count rollups for dashboard KPIs and charts, kept
+    current by triggers. NULL dimensions are stored as '' so they can be
+    part of the primary key; readers turn them back into NULL.
+    """
+    # SQL for a measure's contribution of one row ({row} is NEW, OLD or the table)
+    measure_sql = {
+        "sum": "COALESCE({row}.{column}, 0)",
+        "count": "({row}.{column} IS NOT NULL)",
+    }
+
+    for table, (rollup, day_column, dimensions, spec) in ROLLUPS.items():
+        key_columns = ("day",) + dimensions
+        measures = [
+            (name, source, measure_sql[kind].replace("{column}", source))
+            for name, source, kind in spec
+        ]
+        measure_ddl = "".join(f"{name} REAL NOT NULL DEFAULT 0, " for name, _, _ in measures)
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {rollup} (
+                day TEXT NOT NULL,  -- date() of {day_column}, '' when missing
+                {" ".join(f"{col} TEXT NOT NULL," for col in dimensions)}
+                row_count INTEGER NOT NULL DEFAULT 0,  -- Rows in this group
+                {measure_ddl}PRIMARY KEY ({", ".join(key_columns)})
+            ) WITHOUT ROWID
+            """
+        )
+
+        def key_values(row):
+            """SQL expressions for the rollup key of NEW/OLD."""
+            # date() reads bare numbers (even as text) as Julian days - require YYYY-
+            value = f"{row}.{day_column}"
+            return [
+                f"CASE WHEN {value} GLOB '[0-9][0-9][0-9][0-9]-*' "
+                f"THEN COALESCE(date({value}), '') ELSE '' END"
+            ] + [
+                f"COALESCE({row}.{col}, '')" for col in dimensions
+            ]
+
+        def add(row):
+            """Statement adding a source row to its group."""
+            columns = list(key_columns) + ["row_count"] + [name for name, _, _ in measures]
+            values = key_values(row) + ["1"] + [expr.format(row=row) for _, _, expr in measures]
+            updates = ", ".join(
+                f"{col} = {col} + excluded.{col}" for col in columns[len(key_columns) :]
+            )
+            return (
+                f"INSERT INTO {rollup} ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+                f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates};"
+            )
+
+        def remove(row):
+            """Statements removing a source row from its group (empty groups are dropped)."""
+            match = " AND ".join(
+                f"{col} = {value}" for col, value in zip(key_columns, key_values(row))
+            )
+            updates = ", ".join(
+                ["row_count = row_count - 1"]
+                + [f"{name} = {name} - {expr.format(row=row)}" for name, _, expr in measures]
+            )
+            return (
+                f"UPDATE {rollup} SET {updates} WHERE {match}; "
+                f"DELETE FROM {rollup} WHERE {match} AND row_count <= 0;"
+            )
+
+        # Only updates touching a rolled-up column move a row between groups
+        watched = ", ".join(
+            dict.fromkeys((day_column,) + dimensions + tuple(src for _, src, _ in measures))
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_insert AFTER INSERT ON {table} "
+            f"BEGIN {add('NEW')} END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_delete AFTER DELETE ON {table} "
+            f"BEGIN {remove('OLD')} END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update "
+            f"AFTER UPDATE OF {watched} ON {table} "
+            f"BEGIN {remove('OLD')} {add('NEW')} END"
+        )
+
+        # Backfill from the rows already in the table
+        group_values = key_values(table)
+        columns = list(key_columns) + ["row_count"] + [name for name, _, _ in measures]
+        values = group_values + ["COUNT(*)"] + [
+            f"SUM({expr.format(row=table)})" for _, _, expr in measures
+        ]
+        conn.execute(f"DELETE FROM {rollup}")
+        conn.execute(
+            f"INSERT INTO {rollup} ({', '.join(columns)}) "
+            f"SELECT {', '.join(values)} FROM {table} GROUP BY {', '.join(group_values)}"
+        )
+
+
+# Timestamp text column -> generated epoch-millisecond column, per dashboard table
+EPOCH_COLUMNS = {
+    "cyber_incidents": ("timestamp", "timestamp_ms"),
+    "it_tickets": ("created_at", "created_at_ms"),
+    "datasets_metadata": ("upload_date", "upload_date_ms"),
+}
+
+
+def _epoch_ms_sql(column):
+    """
+    SQL for a timestamp column as epoch milliseconds (NULL when it is not one).
+    ISO text is read as UTC; numbers (or numeric text) above 1e12 are epoch
+    milliseconds and above 1e9 epoch seconds, the same rules as timestamps.to_datetime64.
+    """
+    number = f"CAST({column} AS REAL)"
+    return f"""
+        CASE
+            WHEN {column} GLOB '[0-9][0-9][0-9][0-9]-*'
+                THEN CAST(ROUND((julianday({column}) - 2440587.5) * 86400000.0) AS INTEGER)
+            WHEN typeof({column}) IN ('integer', 'real')
+                OR ({column} GLOB '[0-9]*' AND {column} NOT GLOB '*[^0-9.]*')
+                THEN CASE
+                    WHEN {number} > 1e12 THEN CAST({number} AS INTEGER)
+                    WHEN {number} > 1e9 THEN CAST({number} * 1000 AS INTEGER)
+                END
+        END"""
+
+
+def _add_epoch_columns(conn):
+    """
+    Migration 8: generated epoch-millisecond columns next to each timestamp.
+    The columns are VIRTUAL (computed by SQLite when read), so every writer
+    keeps them current without triggers or extra storage.
+    """
+    for table, (column, epoch_column) in EPOCH_COLUMNS.items():
+        # table_xinfo (unlike table_info) lists generated columns
+        existing = {col[1] for col in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if epoch_column in existing:
+            continue
+        conn.execute(
+            f"ALTER TABLE {table} ADD COLUMN {epoch_column} INTEGER "
+            f"GENERATED ALWAYS AS ({_epoch_ms_sql(column)}) VIRTUAL"
+        )
+
+
+# Keyset pagination indexes: (sort column, primary key) lets a page seek
+# straight to the row after the previous page's last row. Each replaces the
+# single-column index it extends.
+_SEEK_INDEXES = [
+    ("idx_cyber_incidents_timestamp", "cyber_incidents", "timestamp", "incident_id"),
+    ("idx_it_tickets_created_at", "it_tickets", "created_at", "ticket_id"),
+    ("idx_datasets_metadata_upload_date", "datasets_metadata", "upload_date", "dataset_id"),
+]
+
+
+def _create_seek_indexes(conn):
+    """Migration 7: composite (sort column, primary key) indexes for paginated grids."""
+    for old_index, table, sort_column, pk_column in _SEEK_INDEXES:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{sort_column}_seek "
+            f"ON {table}({sort_column}, {pk_column})"
+        )
+        conn.execute(f"DROP INDEX IF EXISTS {old_index}")
+    conn.execute("ANALYZE")
+
+
+def _create_llm_response_cache(conn):
+    """
+    Migration 9: persistent cache of AI responses keyed by a content hash
+    of model, temperature, question, data context and data version.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key TEXT PRIMARY KEY,  -- SHA-256 of the request (see llm_cache.request_key)
+            model TEXT NOT NULL,  -- Model that produced the response
+            response TEXT NOT NULL,  -- Response text
+            created_at REAL NOT NULL,  -- Epoch seconds when stored (TTL)
+            last_used_at REAL NOT NULL,  -- Epoch seconds of the last hit (LRU)
+            hits INTEGER NOT NULL DEFAULT 0  -- Times served from the cache
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used "
+        "ON llm_response_cache(last_used_at)"
+    )
+
+
+def _create_chat_store(conn):
+    """
+    Migration 10: append-only chat message log. Clearing a thread only
+    moves its cleared_seq marker, so no message is ever rewritten.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_threads (
+            user_id TEXT NOT NULL,  -- Chat owner (user name or user/chat key)
+            thread TEXT NOT NULL,  -- Conversation within the user's chats
+            cleared_seq INTEGER NOT NULL DEFAULT 0,  -- Messages up to this seq were cleared
+            imported_from TEXT,  -- Legacy JSON file imported into the thread
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, thread)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            thread TEXT NOT NULL,
+            seq INTEGER NOT NULL,  -- Position in the thread (1, 2, ...)
+            role TEXT NOT NULL,  -- 'user' or 'assistant'
+            content TEXT NOT NULL,
+            extra TEXT,  -- JSON of any other message fields (e.g. latency)
+            ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # Serves both "next seq" on append and "last N turns" on load
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_chat_messages_thread_seq "
+        "ON chat_messages(user_id, thread, seq)"
+    )
+
+
+def _create_chat_summaries(conn):
+    """
+    Migration 11: rolling summary of each chat thread's older turns, so
+    prompts carry a short summary instead of the whole conversation.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_summaries (
+            user_id TEXT NOT NULL,
+            thread TEXT NOT NULL,
+            covered INTEGER NOT NULL,  -- Messages (since the last clear) folded into the summary
+            summary TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, thread)
+        )
+        """
+    )
+
+
+# Full-text indexes: source table -> FTS5 table mirroring its description column
+SEARCH_INDEXES = {
+    "cyber_incidents": "cyber_incidents_fts",
+    "it_tickets": "it_tickets_fts",
+}
+
+
+def _create_description_search(conn):
+    """
+    Migration 12: FTS5 full-text indexes over incident and ticket descriptions.
+    The indexes are external-content tables keyed by the source rowid (they
+    store only the index, not a second copy of the text) and are kept in
+    sync by triggers; 'rebuild' fills them from the existing rows.
+    """
+    for table, fts in SEARCH_INDEXES.items():
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                description,
+                content='{table}',
+                content_rowid='rowid',
+                tokenize='porter unicode61'
+            )
+            """
+        )
+        # External content: the index is told the old text to remove
+        remove = (
+            f"INSERT INTO {fts} ({fts}, rowid, description) "
+            "VALUES ('delete', OLD.rowid, OLD.description);"
+        )
+        add = f"INSERT INTO {fts} (rowid, description) VALUES (NEW.rowid, NEW.description);"
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+            BEGIN
+                {add}
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update
+            AFTER UPDATE OF description ON {table}
+            BEGIN
+                {remove}
+                {add}
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+            BEGIN
+                {remove}
+            END
+            """
+        )
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _create_epoch_indexes(conn):
+    """
+    Migration 13: index the epoch-millisecond columns, which FilterSpec date
+    bounds compare, so date-filtered reads seek instead of scanning.
+    """
+    for table, (_, epoch_column) in EPOCH_COLUMNS.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{epoch_column} ON {table}({epoch_column})"
+        )
+    conn.execute("ANALYZE")
+
+
+# Ordered list of (version, description, migration function)
+# Append new migrations at the end; never renumber or edit applied ones.
+MIGRATIONS = [
+    (1, "Baseline tables", _create_baseline_tables),
+    (2, "Primary keys on incident, ticket and dataset ids", _rebuild_with_primary_keys),
+    (3, "Secondary indexes for dashboard aggregations", _create_dashboard_indexes),
+    (4, "CSV load manifest", _create_csv_manifest),
+    (5, "Row change log for incremental dashboard reads", _create_change_log),
+    (6, "Trigger-maintained rollups for dashboard KPIs and charts", _create_rollups),
+    (7, "Seek indexes for keyset-paginated data grids", _create_seek_indexes),
+    (8, "Generated epoch-millisecond timestamp columns", _add_epoch_columns),
+    (9, "Persistent AI response cache", _create_llm_response_cache),
+    (10, "Append-only chat message store", _create_chat_store),
+    (11, "Rolling chat summaries", _create_chat_summaries),
+    (12, "Full-text search over incident and ticket descriptions", _create_description_search),
+    (13, "Indexes on epoch-millisecond columns for date filters", _create_epoch_indexes),
+]
+
+
+class SchemaMigrator:
+    """
+    Applies ordered schema migrations exactly once per database.
+    Each migration runs in its own transaction together with its
+    schema_version row, so a failed migration leaves no partial changes.
+    """
+
+    def __init__(self, conn, migrations=None):
+        """
+        Initialize SchemaMigrator.
+
+        Args:
+            conn: SQLite database connection object
+            migrations: Ordered (version, description, function) list (defaults to MIGRATIONS)
+        """
+        self.conn = conn
+        self.migrations = sorted(
+            migrations if migrations is not None else MIGRATIONS, key=lambda m: m[0]
+        )
+
+    def ensure_version_table(self):
+        """Create the schema_version tracking table if it doesn't exist."""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        self.conn.commit()
+
+    def current_version(self):
+        """
+        Get the highest applied migration version.
+
+        Returns:
+            int: Current schema version (0 for an unmigrated database)
+        """
+        self.ensure_version_table()
+        row = self.conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    def pending(self):
+        """
+        Get migrations not yet applied.
+
+        Returns:
+            list: (version, description, function) tuples still to run
+        """
+        current = self.current_version()
+        return [m for m in self.migrations if m[0] > current]
+
+    def migrate(self):
+        """
+        Apply every pending migration in version order.
+
+        Returns:
+            list: Versions applied by this call
+        """
+        applied = []
+        for version, description, migration in self.pending():
+            # Close any implicit transaction, then take the write lock up front
+            self.conn.commit()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the lock
+                already = self.conn.execute(
+                    "SELECT 1 FROM schema_version WHERE version = ?", (version,)
+                ).fetchone()
+                if already is None:
+                    migration(self.conn)
+                    self.conn.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                        (version, description),
+                    )
+                    applied.append(version)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+            if applied and applied[-1] == version:
+                print(f" Schema migration {version} applied: {description}")
+        return applied
 
 
 # Backward compatibility wrapper functions
@@ -141,3 +747,8 @@ def create_all_tables(conn):
     """Create all tables - backward compatibility."""
     schema = DatabaseSchema(conn)
     return schema.create_all_tables()
+
+
+def migrate_database(conn):
+    """Apply pending schema migrations."""
+    return SchemaMigrator(conn).migrate()
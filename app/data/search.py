@@ -0,0 +1,187 @@
+"""
+Description Search Module
+Ranked full-text search over incident and ticket descriptions using the
+FTS5 indexes of migration 12. A search is an index lookup ranked by BM25
+(no table scan), and each hit comes with a highlighted snippet of the
+matching text.
+"""
+
+import re
+
+import pandas as pd
+
+from app.data.schema import SEARCH_INDEXES
+
+
+# Hits returned per search
+SEARCH_LIMIT = 20
+
+# Words around the match shown in a snippet
+SNIPPET_TOKENS = 12
+
+# Markers around matched words in snippets (Markdown bold)
+HIGHLIGHT = ("**", "**")
+
+# Columns returned per hit (primary key first)
+SEARCH_COLUMNS = {
+    "cyber_incidents": (
+        "incident_id",
+        "timestamp",
+        "severity",
+        "category",
+        "status",
+        "description",
+    ),
+    "it_tickets": (
+        "ticket_id",
+        "priority",
+        "description",
+        "status",
+        "assigned_to",
+        "created_at",
+        "resolution_time_hours",
+    ),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def match_query(text, prefix=True):
+    """
+    Turn free text into an FTS5 query matching any of its words.
+    Every word is quoted, so FTS5 operators and punctuation in user input
+    are searched for as plain words rather than parsed.
+
+    Args:
+        text: Search text or question
+        prefix: Also match words starting with each term ("phish" finds "phishing")
+
+    Returns:
+        str: FTS5 MATCH expression ("" when text has no words)
+    """
+    star = "*" if prefix else ""
+    terms = dict.fromkeys(word.lower() for word in _WORD.findall(str(text or "")))
+    return " OR ".join(f'"{term}"{star}' for term in terms)
+
+
+class DescriptionSearch:
+    """
+    Full-text search over the description column of one table.
+    """
+
+    def __init__(self, conn, table):
+        """
+        Initialize DescriptionSearch.
+
+        Args:
+            conn: SQLite database connection object
+            table: Table to search (cyber_incidents or it_tickets)
+
+        Raises:
+            ValueError: If the table has no full-text index
+        """
+        if table not in SEARCH_INDEXES:
+            raise ValueError(f"No full-text index for table: {table}")
+        self.conn = conn
+        self.table = table
+        self.fts = SEARCH_INDEXES[table]
+        self.columns = SEARCH_COLUMNS[table]
+        self.key_column = self.columns[0]
+
+    def search(self, text, limit=SEARCH_LIMIT, prefix=True):
+        """
+        Find the rows whose description best matches a text.
+
+        Args:
+            text: Search text or question (any of its words may match)
+            limit: Maximum rows returned
+            prefix: Also match words starting with each term
+
+        Returns:
+            pd.DataFrame: Matching rows, best first, with two extra columns:
+                snippet (matching text, matched words in bold) and score
+                (BM25; lower is better)
+        """
+        query = match_query(text, prefix)
+        if not query:
+            return pd.DataFrame()
+        before, after = HIGHLIGHT
+        return pd.read_sql_query(
+            f"""
+            SELECT {", ".join(f"t.{column}" for column in self.columns)},
+                   snippet({self.fts}, 0, ?, ?, '…', ?) AS snippet,
+                   bm25({self.fts}) AS score
+            FROM {self.fts}
+            JOIN {self.table} t ON t.rowid = {self.fts}.rowid
+            WHERE {self.fts} MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            self.conn,
+            params=(before, after, SNIPPET_TOKENS, query, int(limit)),
+        )
+
+    def matching_keys(self, text, prefix=True):
+        """
+        Get the primary keys of every row whose description matches a text.
+
+        Args:
+            text: Search text or question
+            prefix: Also match words starting with each term
+
+        Returns:
+            list: Primary keys, best match first
+        """
+        query = match_query(text, prefix)
+        if not query:
+            return []
+        rows = self.conn.execute(
+            f"""
+            SELECT t.{self.key_column}
+            FROM {self.fts}
+            JOIN {self.table} t ON t.rowid = {self.fts}.rowid
+            WHERE {self.fts} MATCH ?
+            ORDER BY rank
+            """,
+            (query,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, text, prefix=True):
+        """
+        Count the rows whose description matches a text.
+
+        Args:
+            text: Search text or question
+            prefix: Also match words starting with each term
+
+        Returns:
+            int: Number of matching rows
+        """
+        query = match_query(text, prefix)
+        if not query:
+            return 0
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM {self.fts} WHERE {self.fts} MATCH ?", (query,)
+        ).fetchone()[0]
+
+    def rebuild(self):
+        """Rebuild the index from the table (after writes that bypassed the triggers). Commits."""
+        self.conn.execute(f"INSERT INTO {self.fts} ({self.fts}) VALUES ('rebuild')")
+        self.conn.commit()
+
+
+# Module-level helpers
+def search_descriptions(conn, table, text, limit=SEARCH_LIMIT):
+    """Ranked description search of a table (see DescriptionSearch.search)."""
+    return DescriptionSearch(conn, table).search(text, limit)
+
+
+def search_incidents(conn, text, limit=SEARCH_LIMIT):
+    """Ranked search of incident descriptions."""
+    return search_descriptions(conn, "cyber_incidents", text, limit)
+
+
+def search_tickets(conn, text, limit=SEARCH_LIMIT):
+    """Ranked search of ticket descriptions."""
+    return search_descriptions(conn, "it_tickets", text, limit)
@@ -6,6 +6,13 @@ Provides OOP interface for IT support ticket operations including creation, upda
 import pandas as pd
 from datetime import datetime
 
+from app.data.bulk import BulkInserter, BULK_CHUNK_SIZE
+from app.data.cache import cached_query, invalidate_tables
+from app.data.delta import fetch_changes, get_delta_frame
+from app.data.ids import new_id, new_ids
+from app.data.reconcile import EditorReconciler
+from app.data.timestamps import attach_datetimes
+
 
 # ============================================================
 # IT TICKET CLASS (OOP)
@@ -89,8 +96,8 @@ class ITTicket:
         # Convert to string first to handle any numeric types
         original_ticket_id = self.ticket_id
         if self.ticket_id is None:
-            # Generate new ticket ID with timestamp (format: T + timestamp)
-            self.ticket_id = f"T{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+            # Generate new ticket ID (format: T + sortable ULID)
+            self.ticket_id = new_id("T")
             if hasattr(st, "write"):
                 st.write(
                     f"🔍 ITTicket.save() - Generated new ticket_id: {self.ticket_id}"
@@ -104,7 +111,7 @@ class ITTicket:
                 or ticket_id_str.lower() == "nan"
             ):
                 # Generate new ID if provided value is invalid
-                self.ticket_id = f"T{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+                self.ticket_id = new_id("T")
                 if hasattr(st, "write"):
                     st.write(
                         f"🔍 ITTicket.save() - Original was empty/none/nan, generated: {self.ticket_id}"
@@ -180,6 +187,7 @@ class ITTicket:
             ),
         )
         self.conn.commit()
+        invalidate_tables(self.conn, "it_tickets")
 
         return self.ticket_id
 
@@ -192,6 +200,7 @@ class ITTicket:
         """
         self.conn.execute(query, (new_status, self.ticket_id))
         self.conn.commit()
+        invalidate_tables(self.conn, "it_tickets")
         self.status = new_status
 
     def to_dict(self):
@@ -207,15 +216,131 @@ class ITTicket:
             "inserted_at": self.inserted_at,
         }
 
+    @classmethod
+    def _new_ids(cls, count):
+        """Generate ticket IDs for bulk rows without one."""
+        return new_ids(count, "T")
+
+    @classmethod
+    def bulk_insert(
+        cls,
+        conn,
+        df,
+        chunk_size=BULK_CHUNK_SIZE,
+        first_row_number=1,
+        on_conflict="skip",
+    ):
+        """
+        Insert many tickets at once with vectorized type conversion.
+        Stores the same values as save(), one transaction per chunk.
+
+        Args:
+            conn: Database connection object
+            df: DataFrame with ticket columns
+            chunk_size: Rows per transaction
+            first_row_number: Report number of the first row
+            on_conflict: Existing-id policy - "skip", "overwrite" or "merge_newer"
+                (merge_newer replaces only when the upload's created_at is newer)
+
+        Returns:
+            BulkInsertResult: Inserted/updated counts plus duplicate and error reports
+        """
+        inserter = BulkInserter(
+            conn,
+            table="it_tickets",
+            key_column="ticket_id",
+            column_sql={
+                "ticket_id": "?",
+                "priority": "?",
+                "description": "?",
+                "status": "?",
+                "assigned_to": "?",
+                "created_at": "COALESCE(?, CURRENT_TIMESTAMP)",
+                "resolution_time_hours": "?",
+            },
+            id_factory=cls._new_ids,
+            timestamp_columns=["created_at"],
+            float_columns=["resolution_time_hours"],
+            version_column="created_at",
+        )
+        return inserter.insert(df, chunk_size, first_row_number, on_conflict)
+
+    # Columns read by get_all / get_changes_since / get_filtered (created_at_ms
+    # becomes the datetime64 created_at column, see attach_datetimes)
+    _COLUMNS = (
+        "ticket_id, priority, description, status, assigned_to, created_at, "
+        "resolution_time_hours, created_at_ms"
+    )
+
     @classmethod
     def get_all(cls, conn):
-        """Get all tickets as DataFrame."""
-        query = """
-            SELECT ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours
-            FROM it_tickets
-            ORDER BY created_at DESC
+        """Get all tickets as DataFrame, newest first (merged incrementally from the change log)."""
+        rows = get_delta_frame(
+            conn, "it_tickets", "ticket_id", cls._COLUMNS, sort_by="created_at", ascending=False
+        ).read(conn)
+        return attach_datetimes(rows, "it_tickets")
+
+    @classmethod
+    def get_changes_since(cls, conn, watermark):
         """
-        return pd.read_sql_query(query, conn)
+        Get tickets changed since a watermark.
+
+        Args:
+            conn: SQLite database connection object
+            watermark: Value returned by a previous call (0 for all tickets)
+
+        Returns:
+            tuple: (changed rows, deleted ticket_ids, new watermark); rows is
+                None if the watermark is too old and a full reload is needed
+        """
+        rows, deleted, watermark = fetch_changes(
+            conn, "it_tickets", "ticket_id", watermark, cls._COLUMNS
+        )
+        if rows is not None:
+            attach_datetimes(rows, "it_tickets")
+        return rows, deleted, watermark
+
+    # Columns a FilterSpec may reference
+    FILTER_COLUMNS = ("ticket_id", "priority", "status", "assigned_to", "created_at")
+
+    @classmethod
+    def get_filtered(cls, conn, spec):
+        """
+        Get tickets matching a filter, evaluated in SQL.
+
+        Args:
+            conn: SQLite database connection object
+            spec: FilterSpec over FILTER_COLUMNS
+
+        Returns:
+            pd.DataFrame: Matching tickets, newest first (all tickets for an empty spec)
+        """
+        if spec.is_empty():
+            return cls.get_all(conn)
+        where, params = spec.to_sql(cls.FILTER_COLUMNS, table="it_tickets")
+        query = f"SELECT {cls._COLUMNS} FROM it_tickets {where} ORDER BY created_at DESC"
+        rows = cached_query(conn, query, ["it_tickets"], params=params)
+        return attach_datetimes(rows, "it_tickets")
+
+    # Columns the dashboard data editor may change
+    EDITABLE_COLUMNS = (
+        "priority",
+        "description",
+        "status",
+        "assigned_to",
+        "created_at",
+        "resolution_time_hours",
+    )
+
+    @classmethod
+    def reconciler(cls):
+        """Get a reconciler writing data editor deletions and edits back to tickets."""
+        return EditorReconciler(
+            "it_tickets",
+            "ticket_id",
+            cls.EDITABLE_COLUMNS,
+            datetime_formats={"created_at": "%Y-%m-%d %H:%M:%S"},
+        )
 
     @classmethod
     def get_priority_counts(cls, conn):
@@ -226,7 +351,7 @@ class ITTicket:
             GROUP BY priority
             ORDER BY count DESC
         """
-        return pd.read_sql_query(query, conn)
+        return cached_query(conn, query, ["it_tickets"])
 
 
 # ============================================================
@@ -261,6 +386,7 @@ def update_ticket_status(conn, ticket_id, new_status):
     """
     conn.execute(query, (new_status, ticket_id))
     conn.commit()
+    invalidate_tables(conn, "it_tickets")
 
 
 def get_ticket_priority_counts(conn):
@@ -0,0 +1,105 @@
+"""
+Timestamp Normalization Module
+Vectorized conversion of mixed-format timestamp values to datetime64.
+Values are split into classes with array masks (epoch milliseconds, epoch
+seconds, ISO text, other text) and each class is converted in one call, so
+no Python code runs per value. The dashboard tables also carry a generated
+epoch-millisecond column per timestamp (schema migration 8) that readers
+turn into datetime64 without parsing any text.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.data.schema import EPOCH_COLUMNS
+
+
+# Numbers above these are epoch milliseconds / seconds (smaller ones are not timestamps)
+EPOCH_MS_THRESHOLD = 1e12
+EPOCH_S_THRESHOLD = 1e9
+
+# Text format timestamps are stored in after ingestion
+STORED_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_datetime64(values):
+    """
+    Convert timestamp values of any supported format to datetime64.
+
+    Args:
+        values: Series (or array-like) of epoch numbers, numeric text,
+            date/time text, datetimes or missing values
+
+    Returns:
+        pd.Series: datetime64[ns] values (NaT where nothing parses), same index
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, "tz", None) is not None:
+            return series.dt.tz_convert(None)
+        return series
+
+    result = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    present = series.notna().to_numpy()
+    if not present.any():
+        return result
+
+    # Numbers and numeric text: epoch values, told apart by magnitude
+    numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    is_number = ~np.isnan(numbers)
+    ms = is_number & (numbers > EPOCH_MS_THRESHOLD)
+    seconds = is_number & ~ms & (numbers > EPOCH_S_THRESHOLD)
+    if ms.any():
+        result[ms] = pd.to_datetime(numbers[ms], unit="ms")
+    if seconds.any():
+        result[seconds] = pd.to_datetime(numbers[seconds], unit="s")
+
+    # Everything else: ISO text (and datetime objects) in one pass, leftovers inferred
+    other = present & ~is_number
+    if other.any():
+        text = series[other]
+        parsed = pd.to_datetime(text, format="ISO8601", errors="coerce", utc=True)
+        retry = parsed.isna().to_numpy()
+        if retry.any():
+            parsed[retry] = pd.to_datetime(
+                text[retry].astype(str), format="mixed", errors="coerce", utc=True
+            )
+        result[other] = parsed.dt.tz_convert(None).astype("datetime64[ns]")
+    return result
+
+
+def normalize_text(values, fmt=STORED_FORMAT):
+    """
+    Rewrite parseable timestamp values as uniform text for storage.
+
+    Args:
+        values: Series of timestamp values in any supported format
+        fmt: strftime format of the stored text
+
+    Returns:
+        pd.Series: Formatted text; values that do not parse are kept as text
+    """
+    parsed = to_datetime64(values)
+    original = values.astype("string")
+    return parsed.dt.strftime(fmt).astype("string").where(parsed.notna(), original)
+
+
+def attach_datetimes(df, table):
+    """
+    Replace a table's timestamp text column with datetime64 from its epoch column.
+    Frames read without the epoch column fall back to to_datetime64.
+
+    Args:
+        df: Rows read from the table (modified in place)
+        table: Table name (a key of schema.EPOCH_COLUMNS)
+
+    Returns:
+        pd.DataFrame: df
+    """
+    column, epoch_column = EPOCH_COLUMNS[table]
+    if epoch_column in df.columns:
+        epochs = pd.to_numeric(df.pop(epoch_column), errors="coerce")
+        df[column] = pd.to_datetime(epochs, unit="ms")
+    elif column in df.columns:
+        df[column] = to_datetime64(df[column])
+    return df
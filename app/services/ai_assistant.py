@@ -7,11 +7,25 @@ persistent chat history, and dataset-aware intelligence.
 # ai_assistant.py
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import time
 import google.generativeai as genai
 # Chat history persistence functions
-from app.data.chat_history import load_chat, save_chat
+from app.data.chat_history import append_message, clear_chat, load_chat
+from app.data.llm_cache import response_cache
+from app.data.timestamps import to_datetime64
+from app.components.pending_reply import PendingReply
+from app.services.conversation_memory import conversation_memory
+from app.services.llm_executor import submit_request
+from app.services.llm_stream import latency_summary
+from app.services.prompt_budget import (
+    DEFAULT_TOKEN_BUDGET,
+    HISTORY_SHARE,
+    ContextBudgeter,
+    mentioned_rows,
+)
+from app.services.retrieval import relevant_rows
 
 
 # -------------------------------------------------------------------
@@ -20,12 +34,13 @@ from app.data.chat_history import load_chat, save_chat
 def fix_all_timestamps(df, date_cols=None):
     """
     Converts numeric or string timestamps to pandas datetime objects.
-    Handles milliseconds, seconds, and string date formats automatically.
-    
+    Handles milliseconds, seconds, and string date formats automatically,
+    converting each whole column at once (see timestamps.to_datetime64).
+
     Args:
         df: DataFrame to process
         date_cols: List of column names to convert (defaults to common date columns)
-        
+
     Returns:
         DataFrame: DataFrame with converted timestamp columns
     """
@@ -34,42 +49,84 @@ def fix_all_timestamps(df, date_cols=None):
     if date_cols is None:
         date_cols = ["timestamp", "created_at", "upload_date"]
 
-    # Process each date column
+    # Process each date column (already-typed columns are returned unchanged)
     for col in date_cols:
         if col in df.columns:
-
-            def convert(val):
-                """
-                Convert single value to datetime, handling multiple formats.
-                
-                Args:
-                    val: Value to convert (int, float, or string)
-                    
-                Returns:
-                    pd.Timestamp or pd.NaT: Converted datetime or Not a Time
-                """
-                try:
-                    # Return NaT for null values
-                    if pd.isna(val):
-                        return pd.NaT
-                    # Numeric timestamps (Unix epoch)
-                    if isinstance(val, (int, float)):
-                        if val > 1e12:  # milliseconds (13+ digits)
-                            return pd.to_datetime(val, unit="ms")
-                        elif val > 1e9:  # seconds (10+ digits)
-                            return pd.to_datetime(val, unit="s")
-                    # String timestamps (ISO format, etc.)
-                    return pd.to_datetime(val, errors="coerce")
-                except:
-                    # Return NaT on any conversion error
-                    return pd.NaT
-
-            # Apply conversion function to entire column
-            df[col] = df[col].apply(convert)
+            df[col] = to_datetime64(df[col])
 
     return df
 
 
+# -------------------------------------------------------------------
+# HELPER: Convert JSON → Human-readable (optional pretty formatting)
+# -------------------------------------------------------------------
+def convert_json_to_human(text):
+    """
+    Pretty-print a reply that is a JSON object or list of rows.
+
+    Args:
+        text: Reply text from the model
+
+    Returns:
+        str: Markdown summary, or the text unchanged if it holds no JSON
+    """
+    import json
+    from datetime import datetime
+
+    def fix_ts(value):
+        try:
+            if isinstance(value, (int, float)):
+                if value > 10**12:  # milliseconds
+                    return datetime.fromtimestamp(value / 1000).strftime(
+                        "%Y-%m-%d %H:%M:%S:%f"
+                    )
+                elif value > 10**9:
+                    return datetime.fromtimestamp(value).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    )
+            return value
+        except:
+            return value
+
+    def severity_badge(level):
+        colors = {
+            "critical": "🔴 **Critical**",
+            "high": "🟠 High",
+            "medium": "🟡 Medium",
+            "low": "🟢 Low",
+        }
+        return colors.get(str(level).lower(), level.title())
+
+    try:
+        if "{" in text and "}" in text:
+            json_str = text[text.index("{") : text.rindex("}") + 1]
+            parsed = json.loads(json_str)
+
+            if isinstance(parsed, dict):
+                parsed = {k: fix_ts(v) for k, v in parsed.items()}
+                out = "### 🧾 Detailed Row Summary\n\n"
+                for k, v in parsed.items():
+                    key = k.replace("_", " ").title()
+                    if k == "severity":
+                        v = severity_badge(v)
+                    out += f"- **{key}:** {v}\n"
+                return out
+
+            if isinstance(parsed, list) and isinstance(parsed[0], dict):
+                df = pd.DataFrame(parsed)
+                for col in df.columns:
+                    df[col] = df[col].apply(fix_ts)
+                return (
+                    "### 📊 Table Summary\nA structured view of the dataset:\n\n"
+                    + df.to_markdown(index=False)
+                )
+
+    except Exception:
+        pass
+
+    return text
+
+
 # -------------------------------------------------------------------
 # Configure Gemini API
 # -------------------------------------------------------------------
@@ -91,6 +148,9 @@ def ai_assistant(
     - Sidebar controls (model, temperature, clear chat)
     - Persistent memory per user
     - Dataset-aware intelligence (optional)
+
+    context_df may be a DataFrame or a function returning one; a function
+    is only called when a question is asked, so reruns skip loading the data.
     """
 
     # ================================================================
@@ -129,6 +189,15 @@ def ai_assistant(
 
         st.metric("Messages", len(st.session_state.assistant_chat))
 
+        # Latency of recent streamed responses
+        latency = latency_summary()
+        if latency:
+            st.caption(
+                f"First token {latency['first_token_p50']:.2f}s · "
+                f"full reply {latency['total_p50']:.2f}s "
+                f"(median of {latency['responses']})"
+            )
+
         model_name = st.selectbox(
             "Gemini Model",
             ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-pro"],
@@ -154,7 +223,7 @@ def ai_assistant(
         ):
             st.session_state.assistant_chat = []
             st.session_state.initial_greeting_sent = False
-            save_chat([], user_id)
+            clear_chat(user_id)
             st.rerun()
 
     # ================================================================
@@ -234,10 +303,9 @@ def ai_assistant(
         for msg in st.session_state.assistant_chat
     ):
         welcome_text = "Hello! I'm your AI Assistant. How can I help you today?"
-        st.session_state.assistant_chat.append(
-            {"role": "assistant", "content": welcome_text}
-        )
-        save_chat(st.session_state.assistant_chat, user_id)
+        greeting = {"role": "assistant", "content": welcome_text}
+        st.session_state.assistant_chat.append(greeting)
+        append_message(user_id, greeting)
 
     # ================================================================
     # SHOW CHAT HISTORY
@@ -252,27 +320,66 @@ def ai_assistant(
     # ================================================================
     # USER INPUT
     # ================================================================
+    pending_reply = PendingReply(f"ai_assistant_pending_{unique_key}")
+
+    def save_reply(ai_text, latency=None):
+        # Save assistant reply (with its latency, or whether it came from the cache)
+        reply = {"role": "assistant", "content": ai_text}
+        if latency is not None:
+            reply["latency"] = latency
+        st.session_state.assistant_chat.append(reply)
+        append_message(user_id, reply)
+
+    def finish_reply(request, context):
+        # Turn a finished background request into the assistant's reply
+        if request.status == "done":
+            ai_text = convert_json_to_human(request.text)
+            response_cache.put(context["cache_key"], context["model_name"], ai_text)
+        elif request.text:
+            # Part of the answer arrived before the error: keep it
+            ai_text = f"{request.text}\n\n⚠️ Response interrupted: {str(request.error)[:200]}"
+        elif request.quota_exhausted:
+            ai_text = (
+                f"⚠️ **Quota Exceeded**\n\n"
+                f"Your Gemini API quota has been exceeded. Please:\n"
+                f"1. **Wait 15-30 minutes** and try again\n"
+                f"2. **Use a different Google account** for a fresh quota\n"
+                f"3. **Check your usage**: https://ai.dev/usage?tab=rate-limit\n\n"
+                f"Error details: {str(request.error)[:200]}"
+            )
+        else:
+            ai_text = f"⚠️ AI Error: {request.error}"
+        save_reply(ai_text, request.metrics)
+
+    # No new question while a reply is still on its way
     user_input = st.chat_input(
-        "Ask your question...", key=f"ai_assistant_input_{unique_key}"
+        "Ask your question...",
+        key=f"ai_assistant_input_{unique_key}",
+        disabled=pending_reply.is_pending(),
     )
 
     if not user_input:
+        pending_reply.render(finish_reply)
         return
 
-    st.session_state.assistant_chat.append({"role": "user", "content": user_input})
+    question = {"role": "user", "content": user_input}
+    st.session_state.assistant_chat.append(question)
+    append_message(user_id, question)
     st.markdown(f"<div class='bubble-user'>{user_input}</div>", unsafe_allow_html=True)
 
     # ================================================================
-    # BUILD CONVERSATION FOR GEMINI
+    # PROMPT BUDGET (instructions, then summary and recent turns, then data)
     # ================================================================
-    conversation_text = "You are a helpful assistant.\n\n"
-    for msg in st.session_state.assistant_chat:
-        role = "User" if msg["role"] == "user" else "Assistant"
-        conversation_text += f"{role}: {msg['content']}\n"
+    system_text = "You are a helpful assistant.\n\n"
+    budgeter = ContextBudgeter(DEFAULT_TOKEN_BUDGET)
+    budgeter.spend(system_text)
+    data_text = ""
 
     # ================================================================
     # DATASET-AWARE PROMPT (if context_df exists)
     # ================================================================
+    if callable(context_df):
+        context_df = context_df()
     if isinstance(context_df, pd.DataFrame) and not context_df.empty:
         # --- Fix timestamps first ---
         context_df = fix_all_timestamps(context_df)
@@ -355,160 +462,64 @@ def ai_assistant(
         format_text += f"<br>Analysis:<br>Generate a clear and concise paragraph summarizing the {entity_name.lower()} above, highlighting key points and any patterns or notable values.\n\n"
         format_text += "Never use emojis or list bullets.<br>Always keep one field per line using <br> tags.<br>\n\n"
 
-        # --- Append JSON to conversation ---
-        conversation_text += (
-            "When I ask 'what is in row X', ONLY use the row where _row_number == X.\n"
+        # --- Instructions first, then as much of the table as the budget allows ---
+        instructions = (
+            "When I ask 'what is in row X', ONLY use the row where _row_number == X. "
+            "If that row is not among the rows below, say it was not included.\n"
+            f"FORMAT RULES FOR {entity_name.upper()} RESPONSES:\n{format_text}\n"
         )
-        conversation_text += (
-            f"FORMAT RULES FOR {entity_name.upper()} RESPONSES:\n{format_text}\nDataset (JSON):\n"
-            + context_df.to_json(orient="records")
-            + "\n"
+        budgeter.spend(instructions)
+        history_text = conversation_memory.history_context(
+            budgeter,
+            user_id,
+            st.session_state.assistant_chat,
+            limit=budgeter.share(HISTORY_SHARE),
+        )
+        # Rows the question names (by row number or ID) come first, then the
+        # records the retrieval index ranks most relevant; with either, only
+        # those rows are sent instead of a sample of the whole table
+        named = np.flatnonzero(mentioned_rows(context_df, user_input, key_column=pk_field))
+        focus = np.concatenate(
+            [named, relevant_rows(context_df, user_input, key_column=pk_field)]
+        )
+        data_text = instructions + budgeter.frame_context(
+            context_df,
+            label=f"{entity_name} data",
+            columns=["_row_number"] + display_fields,
+            focus=focus,
+            summary_columns=display_fields,
+            spread=len(focus) == 0,
+        )
+    else:
+        history_text = conversation_memory.history_context(
+            budgeter, user_id, st.session_state.assistant_chat
         )
 
     # ================================================================
-    # HELPER: Convert JSON → Human-readable (optional pretty formatting)
+    # BUILD CONVERSATION FOR GEMINI
     # ================================================================
-    def convert_json_to_human(text):
-        import json
-        from datetime import datetime
-
-        def fix_ts(value):
-            try:
-                if isinstance(value, (int, float)):
-                    if value > 10**12:  # milliseconds
-                        return datetime.fromtimestamp(value / 1000).strftime(
-                            "%Y-%m-%d %H:%M:%S:%f"
-                        )
-                    elif value > 10**9:
-                        return datetime.fromtimestamp(value).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-                return value
-            except:
-                return value
-
-        def severity_badge(level):
-            colors = {
-                "critical": "🔴 **Critical**",
-                "high": "🟠 High",
-                "medium": "🟡 Medium",
-                "low": "🟢 Low",
-            }
-            return colors.get(str(level).lower(), level.title())
-
-        try:
-            if "{" in text and "}" in text:
-                json_str = text[text.index("{") : text.rindex("}") + 1]
-                parsed = json.loads(json_str)
-
-                if isinstance(parsed, dict):
-                    parsed = {k: fix_ts(v) for k, v in parsed.items()}
-                    out = "### 🧾 Detailed Row Summary\n\n"
-                    for k, v in parsed.items():
-                        key = k.replace("_", " ").title()
-                        if k == "severity":
-                            v = severity_badge(v)
-                        out += f"- **{key}:** {v}\n"
-                    return out
-
-                if isinstance(parsed, list) and isinstance(parsed[0], dict):
-                    df = pd.DataFrame(parsed)
-                    for col in df.columns:
-                        df[col] = df[col].apply(fix_ts)
-                    return (
-                        "### 📊 Table Summary\nA structured view of the dataset:\n\n"
-                        + df.to_markdown(index=False)
-                    )
-
-        except Exception:
-            pass
-
-        return text
+    conversation_text = system_text + history_text + data_text
 
     # ================================================================
-    # SEND TO GEMINI (with retry logic for quota errors)
+    # SEND TO GEMINI (background executor; the reply is polled, never awaited)
     # ================================================================
-    model = genai.GenerativeModel(model_name)
-
-    max_retries = 3
-    retry_delay = 15  # Start with 15 seconds
-    ai_text = None
-
-    for attempt in range(max_retries):
-        try:
-            response = model.generate_content(
-                conversation_text, generation_config={"temperature": temperature}
-            )
-            ai_text = convert_json_to_human(response.text)
-            break  # Success, exit retry loop
-        except Exception as e:
-            error_str = str(e)
-
-            # Check if it's a quota error (429)
-            if (
-                "429" in error_str
-                or "quota" in error_str.lower()
-                or "Quota exceeded" in error_str
-            ):
-                if attempt < max_retries - 1:  # Not the last attempt
-                    # Extract retry delay from error if available
-                    import re
-
-                    retry_match = re.search(r"retry.*?(\d+)\s*[sS]", error_str)
-                    if retry_match:
-                        retry_delay = (
-                            int(retry_match.group(1)) + 2
-                        )  # Add 2 seconds buffer
-
-                    # Show user-friendly message
-                    wait_msg = f"⏳ Quota limit reached. Waiting {retry_delay} seconds before retry {attempt + 1}/{max_retries}..."
-                    placeholder = st.empty()
-                    placeholder.info(wait_msg)
-                    time.sleep(retry_delay)
-                    placeholder.empty()
-
-                    # Exponential backoff for next retry
-                    retry_delay = min(retry_delay * 2, 120)  # Cap at 2 minutes
-                else:
-                    # Last attempt failed
-                    ai_text = (
-                        f"⚠️ **Quota Exceeded**\n\n"
-                        f"Your Gemini API quota has been exceeded. Please:\n"
-                        f"1. **Wait 15-30 minutes** and try again\n"
-                        f"2. **Use a different Google account** for a fresh quota\n"
-                        f"3. **Check your usage**: https://ai.dev/usage?tab=rate-limit\n\n"
-                        f"Error details: {error_str[:200]}"
-                    )
-            else:
-                # Non-quota error, don't retry
-                ai_text = f"⚠️ AI Error: {e}"
-                break
-
+    # Same question, settings and data as before: answer from the response cache
+    # (keyed without the chat history, so repeats and other users' questions hit)
+    started = time.perf_counter()
+    cache_key = response_cache.key(
+        model_name, temperature, user_input, system_text + data_text
+    )
+    ai_text = response_cache.get(cache_key)
     if ai_text is None:
-        ai_text = "⚠️ Failed to get AI response after multiple attempts."
-
-    # ================================================================
-    # STREAMING OUTPUT (WORD-BY-WORD)
-    # ================================================================
-    placeholder = st.empty()
-    full_output = ""
-    words = ai_text.split(" ")
-
-    for word in words:
-        full_output += word + " "
-        placeholder.markdown(
-            f"<div class='bubble-ai'>{full_output}<span class='typing-cursor'></span></div>",
-            unsafe_allow_html=True,
+        request = submit_request(
+            st.secrets["GEMINI_API_KEY"],
+            model_name,
+            conversation_text,
+            generation_config={"temperature": temperature},
         )
-        time.sleep(0.08)  # adjust speed here
-
-    # Final clean bubble without cursor
-    placeholder.markdown(
-        f"<div class='bubble-ai'>{full_output}</div>", unsafe_allow_html=True
-    )
+        pending_reply.start(request, cache_key=cache_key, model_name=model_name)
+        pending_reply.render(finish_reply)
+        return
 
-    # Save assistant reply
-    st.session_state.assistant_chat.append(
-        {"role": "assistant", "content": full_output}
-    )
-    save_chat(st.session_state.assistant_chat, user_id)
+    st.markdown(f"<div class='bubble-ai'>{ai_text}</div>", unsafe_allow_html=True)
+    save_reply(ai_text, {"cached": True, "total_seconds": time.perf_counter() - started})
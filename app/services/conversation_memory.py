@@ -0,0 +1,181 @@
+"""
+Conversation Memory Module
+Keeps AI prompts a bounded size however long a chat gets. The last
+MEMORY_WINDOW messages are sent verbatim; older ones are folded into a
+rolling summary stored next to the chat history (chat_summaries). The
+window advances in steps of SUMMARY_STEP messages, so the summary is only
+recomputed every few turns and the prompt prefix stays stable in between
+(which also keeps response cache keys stable).
+"""
+
+import re
+
+from app.data.chat_store import DEFAULT_THREAD, chat_store
+from app.services.prompt_budget import estimate_tokens
+
+
+# Most recent messages sent verbatim (before the window advances)
+MEMORY_WINDOW = 8
+
+# Messages folded into the summary each time the window advances
+SUMMARY_STEP = 4
+
+# Largest rolling summary (estimated tokens); the oldest lines go first
+SUMMARY_MAX_TOKENS = 300
+
+# Longest text kept per summarized message
+SUMMARY_LINE_CHARS = 200
+
+_TAG = re.compile(r"<[^>]+>")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def summarize_message(message, limit=SUMMARY_LINE_CHARS):
+    """
+    Condense one chat message into a summary line.
+    Markup is stripped and only the first sentence (up to limit
+    characters) is kept: questions are short and replies lead with
+    their answer.
+
+    Args:
+        message: Message dict with role and content
+        limit: Longest text kept
+
+    Returns:
+        str: Summary line ("- User: ..." / "- Assistant: ...")
+    """
+    text = " ".join(_TAG.sub(" ", str(message.get("content", ""))).split())
+    text = _SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(text) > limit:
+        text = text[: limit - 1] + "…"
+    speaker = "User" if message.get("role") == "user" else "Assistant"
+    return f"- {speaker}: {text}"
+
+
+class ConversationMemory:
+    """
+    Splits a chat into a rolling summary and a verbatim window of recent
+    messages. Summaries are persisted per (user, thread) by the chat store,
+    so they are computed once per window step, not once per turn or session.
+    """
+
+    def __init__(
+        self,
+        store=chat_store,
+        window=MEMORY_WINDOW,
+        step=SUMMARY_STEP,
+        summary_tokens=SUMMARY_MAX_TOKENS,
+    ):
+        """
+        Initialize ConversationMemory.
+
+        Args:
+            store: ChatStore holding the summaries
+            window: Most recent messages sent verbatim
+            step: Messages folded into the summary at a time
+            summary_tokens: Largest summary (estimated tokens)
+        """
+        self.store = store
+        self.window = window
+        self.step = max(step, 1)
+        self.summary_tokens = summary_tokens
+
+    def boundary(self, count):
+        """
+        Number of leading messages that belong in the summary.
+
+        Args:
+            count: Messages in the chat
+
+        Returns:
+            int: A multiple of step leaving between window and window + step - 1
+                messages verbatim (0 while the chat fits in the window)
+        """
+        if count <= self.window:
+            return 0
+        return (count - self.window) // self.step * self.step
+
+    def fold(self, summary, messages):
+        """
+        Add messages to a summary, dropping its oldest lines beyond the size cap.
+
+        Args:
+            summary: Current summary text (may be empty)
+            messages: Messages to fold in, oldest first
+
+        Returns:
+            str: New summary text
+        """
+        lines = summary.splitlines() if summary else []
+        if lines and lines[0] == "…":
+            lines = lines[1:]
+        lines += [summarize_message(message) for message in messages]
+        text = "\n".join(lines)
+        while len(lines) > 1 and estimate_tokens(text) > self.summary_tokens:
+            lines.pop(0)
+            text = "\n".join(["…"] + lines)
+        return text
+
+    def split(self, user_id, messages, thread=DEFAULT_THREAD):
+        """
+        Get the summary of a chat's older messages and its recent messages.
+        The stored summary is extended (or rebuilt, if the chat got shorter)
+        only when the boundary has moved.
+
+        Args:
+            user_id: Chat owner
+            messages: All messages of the chat since it was last cleared, oldest first
+            thread: Conversation name
+
+        Returns:
+            tuple: (summary text or "", recent messages sent verbatim)
+        """
+        boundary = self.boundary(len(messages))
+        if boundary == 0:
+            return "", list(messages)
+        try:
+            covered, summary = self.store.load_summary(user_id, thread)
+        except Exception:
+            covered, summary = 0, ""
+        if covered != boundary:
+            if covered > boundary:
+                covered, summary = 0, ""
+            summary = self.fold(summary, messages[covered:boundary])
+            try:
+                self.store.save_summary(user_id, boundary, summary, thread)
+            except Exception:
+                pass  # Recomputed next turn; the prompt is still correct
+        return summary, list(messages[boundary:])
+
+    def history_context(
+        self, budgeter, user_id, messages, thread=DEFAULT_THREAD, limit=None, format_turn=None
+    ):
+        """
+        Chat history for a prompt: the rolling summary, then as many recent
+        messages as fit (see ContextBudgeter.recent_turns).
+
+        Args:
+            budgeter: ContextBudgeter of the prompt
+            user_id: Chat owner
+            messages: All messages of the chat, oldest first
+            thread: Conversation name
+            limit: Tokens the history may use (defaults to the remaining budget)
+            format_turn: Function rendering one message as prompt text (optional)
+
+        Returns:
+            str: Prompt text
+        """
+        limit = budgeter.remaining if limit is None else min(limit, budgeter.remaining)
+        summary, recent = self.split(user_id, messages, thread)
+        text = ""
+        if summary:
+            block = f"Summary of the earlier conversation:\n{summary}\n\n"
+            # The summary may use at most half of the history budget
+            if budgeter.spend(block, limit=limit // 2):
+                text = block
+                limit -= estimate_tokens(block)
+        return text + budgeter.recent_turns(recent, limit=limit, format_turn=format_turn)
+
+
+# Process-wide memory over the application chat store
+conversation_memory = ConversationMemory()
@@ -0,0 +1,362 @@
+"""
+LLM Executor Module
+Runs Gemini requests on background worker threads instead of the
+Streamlit script thread. Requests wait in a shared queue ordered by the
+time they may next run; a token bucket per API key spaces them out, and a
+quota error (429) re-queues the request after its backoff instead of
+sleeping, so one user's backoff never holds a worker or another session.
+Pages submit a request and poll it until it is done.
+"""
+
+import hashlib
+import heapq
+import itertools
+import re
+import threading
+import time
+
+import google.generativeai as genai
+
+from app.services.llm_stream import ResponseStream
+
+
+# Requests per minute allowed per API key, and how many may be sent back to back
+LLM_REQUESTS_PER_MINUTE = 15
+LLM_BURST = 3
+
+# Background worker threads shared by every session
+LLM_WORKERS = 4
+
+# Attempts per request and seconds allowed from submission to the last attempt
+LLM_MAX_ATTEMPTS = 3
+LLM_DEADLINE_SECONDS = 180
+
+# Backoff after a quota error when the error does not say how long to wait
+LLM_RETRY_DELAY = 15
+LLM_MAX_RETRY_DELAY = 120
+
+
+def is_quota_error(error):
+    """
+    Check whether an API error is a quota or rate limit error.
+
+    Args:
+        error: Exception raised by the API
+
+    Returns:
+        bool: True for 429 / quota / resource exhausted errors
+    """
+    text = str(error)
+    return (
+        "429" in text
+        or "quota" in text.lower()
+        or "rate limit" in text.lower()
+        or "ResourceExhausted" in text
+        or type(error).__name__ == "ResourceExhausted"
+    )
+
+
+def retry_delay(error, default):
+    """
+    Get the wait a quota error asks for.
+
+    Args:
+        error: Quota error
+        default: Seconds to wait when the error does not say
+
+    Returns:
+        float: Seconds to wait (2 seconds of margin added)
+    """
+    match = re.search(r"retry.*?(\d+\.?\d*)\s*[sS]", str(error))
+    return float(match.group(1)) + 2 if match else default
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: rate tokens per second up to capacity.
+    A quota error from the API pauses the whole bucket, so every request
+    on that key backs off together instead of each one hitting the limit.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Initialize TokenBucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds):
+        """
+        Hand out no tokens for a while (after the API reported a quota error).
+
+        Args:
+            seconds: Length of the pause
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class LLMRequest:
+    """
+    One queued Gemini request and its progress.
+    Worker threads update it; the page that submitted it polls text,
+    status and retry_at on each rerun. status is one of queued, running,
+    waiting (backing off after a quota error), done or failed.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, bucket_key, model_name, prompt, generation_config, deadline):
+        """
+        Initialize LLMRequest.
+
+        Args:
+            bucket_key: Rate limiter the request draws from (one per API key)
+            model_name: Gemini model name
+            prompt: Prompt text
+            generation_config: Generation settings (optional)
+            deadline: time.monotonic() value after which no new attempt starts
+        """
+        self.id = next(self._ids)
+        self.bucket_key = bucket_key
+        self.model_name = model_name
+        self.prompt = prompt
+        self.generation_config = generation_config
+        self.deadline = deadline
+        self.submitted_at = time.monotonic()
+        self.status = "queued"
+        self.attempts = 0
+        self.text = ""  # Text received so far (complete once done)
+        self.error = None  # Last API error
+        self.quota_exhausted = False  # Failed on quota errors after every allowed attempt
+        self.retry_at = None  # time.monotonic() of the next attempt while waiting
+        self.metrics = None  # ResponseStream.metrics() of the successful attempt
+        self.retry_delay = LLM_RETRY_DELAY
+        self._done = threading.Event()
+
+    def done(self):
+        """Check whether the request finished (successfully or not)."""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the request finishes (for scripts and tests, not pages).
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            bool: True if the request finished
+        """
+        return self._done.wait(timeout)
+
+    def seconds_until_retry(self):
+        """Seconds until the next attempt (0 unless waiting)."""
+        if self.status != "waiting" or self.retry_at is None:
+            return 0
+        return max(self.retry_at - time.monotonic(), 0)
+
+    def _finish(self, status):
+        """Mark the request finished."""
+        self.status = status
+        self.retry_at = None
+        self._done.set()
+
+
+class LLMExecutor:
+    """
+    Shared queue of LLM requests served by a fixed set of worker threads.
+    The queue is a heap ordered by the time each request may run next;
+    workers sleep only while no request is ready, so a request waiting out
+    a backoff costs nothing until its time comes.
+    """
+
+    def __init__(
+        self,
+        workers=LLM_WORKERS,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        burst=LLM_BURST,
+        max_attempts=LLM_MAX_ATTEMPTS,
+    ):
+        """
+        Initialize LLMExecutor (workers start with the first request).
+
+        Args:
+            workers: Number of worker threads
+            requests_per_minute: Rate limit per API key
+            burst: Requests per API key that may be sent back to back
+            max_attempts: Attempts per request before a quota error is final
+        """
+        self.workers = workers
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self._queue = []  # (ready time, sequence, request)
+        self._sequence = itertools.count()
+        self._buckets = {}
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _bucket(self, key):
+        """Get (or create) the rate limiter for an API key."""
+        with self._cond:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def _push(self, request, ready_at):
+        """Queue a request to run at ready_at and wake a worker."""
+        with self._cond:
+            heapq.heappush(self._queue, (ready_at, next(self._sequence), request))
+            self._cond.notify()
+
+    def _start_workers(self):
+        """Start the worker threads if they are not running yet."""
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"llm-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(
+        self, api_key, model_name, prompt, generation_config=None, deadline=LLM_DEADLINE_SECONDS
+    ):
+        """
+        Queue a request.
+
+        Args:
+            api_key: API key the request is sent with (selects the rate limiter)
+            model_name: Gemini model name
+            prompt: Prompt text
+            generation_config: Generation settings (optional)
+            deadline: Seconds from now after which no new attempt starts
+
+        Returns:
+            LLMRequest: Request to poll
+        """
+        bucket_key = hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()
+        request = LLMRequest(
+            bucket_key, model_name, prompt, generation_config, time.monotonic() + deadline
+        )
+        self._start_workers()
+        self._push(request, time.monotonic())
+        return request
+
+    def _next_ready(self):
+        """Wait for and pop the next request whose time has come."""
+        with self._cond:
+            while True:
+                if self._queue:
+                    ready_at = self._queue[0][0]
+                    wait = ready_at - time.monotonic()
+                    if wait <= 0:
+                        return heapq.heappop(self._queue)[2]
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def _work(self):
+        """Worker loop: take ready requests and run one attempt each."""
+        while True:
+            request = self._next_ready()
+            try:
+                self._attempt(request)
+            except Exception as e:  # Never let a request kill the worker
+                request.error = e
+                request._finish("failed")
+
+    def _attempt(self, request):
+        """Run one attempt of a request, re-queueing it if it has to wait."""
+        bucket = self._bucket(request.bucket_key)
+        wait = bucket.acquire()
+        if wait > 0:
+            # Rate limited: try again when the bucket has a token
+            self._schedule_retry(request, wait)
+            return
+
+        request.status = "running"
+        request.attempts += 1
+        stream = ResponseStream(
+            genai.GenerativeModel(request.model_name),
+            request.prompt,
+            generation_config=request.generation_config,
+        )
+        try:
+            for partial in stream:
+                request.text = partial
+        except Exception as e:
+            request.error = e
+            # Part of the answer already arrived, or the error is not about quota: stop
+            if stream.text or not is_quota_error(e):
+                request.metrics = stream.metrics() if stream.text else None
+                request._finish("failed")
+                return
+            delay = retry_delay(e, request.retry_delay)
+            bucket.pause(delay)
+            request.retry_delay = min(delay * 2, LLM_MAX_RETRY_DELAY)
+            if request.attempts >= self.max_attempts:
+                request.quota_exhausted = True
+                request._finish("failed")
+                return
+            self._schedule_retry(request, delay)
+            return
+
+        request.text = stream.text
+        request.metrics = stream.metrics()
+        request._finish("done")
+
+    def _schedule_retry(self, request, delay):
+        """Re-queue a request after delay seconds unless that passes its deadline."""
+        retry_at = time.monotonic() + delay
+        if retry_at > request.deadline:
+            # Only quota errors and the rate limiter make a request wait
+            if request.error is None:
+                request.error = TimeoutError("Request deadline passed while rate limited")
+            request.quota_exhausted = True
+            request._finish("failed")
+            return
+        request.status = "waiting"
+        request.retry_at = retry_at
+        self._push(request, retry_at)
+
+
+# Process-wide executor shared by every session
+llm_executor = LLMExecutor()
+
+
+def submit_request(api_key, model_name, prompt, generation_config=None):
+    """Queue a Gemini request on the shared executor (see LLMExecutor.submit)."""
+    return llm_executor.submit(api_key, model_name, prompt, generation_config)
@@ -0,0 +1,154 @@
+"""
+LLM Streaming Module
+Streams Gemini responses chunk by chunk as they are generated.
+Each response records its time to first token and total latency, and the
+most recent measurements are kept in a process-wide log for reporting.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# Number of recent responses kept in the latency log
+LATENCY_LOG_SIZE = 200
+
+
+class ResponseStream:
+    """
+    One streamed Gemini response.
+    Iterating yields the text received so far after every chunk; text keeps
+    whatever arrived even if the stream fails part way, so callers can show
+    a partial answer instead of starting over.
+    """
+
+    def __init__(self, model, prompt, generation_config=None):
+        """
+        Initialize ResponseStream.
+
+        Args:
+            model: genai.GenerativeModel instance
+            prompt: Prompt text (or contents) sent to the model
+            generation_config: Generation settings such as temperature (optional)
+        """
+        self.model = model
+        self.prompt = prompt
+        self.generation_config = generation_config
+        self.text = ""
+        self.chunks = 0
+        self.first_token_seconds = None
+        self.total_seconds = None
+
+    @staticmethod
+    def _chunk_text(chunk):
+        """Text of one chunk ('' for chunks without text, e.g. safety metadata)."""
+        try:
+            return chunk.text or ""
+        except ValueError:
+            return ""
+
+    def __iter__(self):
+        """
+        Send the prompt and yield the accumulated text as chunks arrive.
+
+        Yields:
+            str: Response text received so far
+        """
+        start = time.perf_counter()
+        try:
+            response = self.model.generate_content(
+                self.prompt, generation_config=self.generation_config, stream=True
+            )
+            for chunk in response:
+                text = self._chunk_text(chunk)
+                if not text:
+                    continue
+                if self.first_token_seconds is None:
+                    self.first_token_seconds = time.perf_counter() - start
+                self.text += text
+                self.chunks += 1
+                yield self.text
+        finally:
+            self.total_seconds = time.perf_counter() - start
+            if self.first_token_seconds is not None:
+                latency_log.record(self)
+
+    def metrics(self):
+        """
+        Latency of the response.
+
+        Returns:
+            dict: first_token_seconds, total_seconds and chunks
+        """
+        return {
+            "first_token_seconds": self.first_token_seconds,
+            "total_seconds": self.total_seconds,
+            "chunks": self.chunks,
+        }
+
+
+class LatencyLog:
+    """
+    Bounded, thread-safe record of recent response latencies.
+    Streamlit serves every session from one process, so the log covers all users.
+    """
+
+    def __init__(self, size=LATENCY_LOG_SIZE):
+        """
+        Initialize LatencyLog.
+
+        Args:
+            size: Maximum number of responses kept
+        """
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, stream):
+        """
+        Add a finished stream's latency.
+
+        Args:
+            stream: ResponseStream that produced at least one chunk
+        """
+        with self._lock:
+            self._entries.append(
+                (stream.first_token_seconds, stream.total_seconds, stream.chunks)
+            )
+
+    def summary(self):
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            dict: Response count and mean/median/p95 time to first token and
+                total latency in seconds (empty dict if nothing recorded)
+        """
+        with self._lock:
+            entries = list(self._entries)
+        if not entries:
+            return {}
+
+        def percentile(values, fraction):
+            values = sorted(values)
+            return values[min(int(fraction * len(values)), len(values) - 1)]
+
+        first = [entry[0] for entry in entries]
+        total = [entry[1] for entry in entries]
+        return {
+            "responses": len(entries),
+            "first_token_mean": sum(first) / len(first),
+            "first_token_p50": percentile(first, 0.5),
+            "first_token_p95": percentile(first, 0.95),
+            "total_mean": sum(total) / len(total),
+            "total_p50": percentile(total, 0.5),
+            "total_p95": percentile(total, 0.95),
+        }
+
+
+# Process-wide latency log shared by every stream
+latency_log = LatencyLog()
+
+
+def latency_summary():
+    """Summarize recent response latencies (see LatencyLog.summary)."""
+    return latency_log.summary()
@@ -0,0 +1,340 @@
+"""
+Prompt Budget Module
+Fits data context and chat history for AI prompts into a token budget.
+Token counts come from a cheap local estimate (no tokenizer or API call).
+Tables are described by their size, per-column aggregates and as many
+sample rows as the budget allows, so a prompt stays the same size whether
+the table holds ten rows or a million.
+"""
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Prompt size targets (estimated tokens)
+DEFAULT_TOKEN_BUDGET = 6000
+MINIMAL_TOKEN_BUDGET = 1200
+
+# Part of the budget left after instructions that chat history may use
+HISTORY_SHARE = 0.3
+
+# Average characters per token for English text and JSON
+CHARS_PER_TOKEN = 4
+
+# Longest cell text sent in a sample row
+MAX_CELL_CHARS = 160
+
+# Most frequent values listed per categorical column
+TOP_VALUES = 5
+
+# Columns with more distinct values than this are summarized by count only
+MAX_CATEGORIES = 50
+
+# Tokens reserved for the section labels of a table description
+_SECTION_TOKENS = 20
+
+
+def estimate_tokens(text):
+    """
+    Estimate how many tokens a text uses.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        int: Estimated token count (about four characters per token)
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _coverage_order(count):
+    """
+    Order 0..count-1 so that every prefix is spread evenly over the range
+    (0, then the end, then the middle, then the quarters, ...).
+    """
+    order, seen = [], np.zeros(count, dtype=bool)
+    step = 1 << max(count - 1, 0).bit_length()
+    while step:
+        positions = np.arange(0, count, step)
+        if step > 1 and count > 1:
+            positions = np.append(positions, count - 1)
+        new = np.unique(positions[~seen[positions]])
+        seen[new] = True
+        order.extend(new.tolist())
+        step //= 2
+    return np.array(order, dtype=int)
+
+
+def _truncate(value, limit):
+    """Shorten long text cells so one row cannot use the whole budget."""
+    if isinstance(value, str) and len(value) > limit:
+        return value[: limit - 1] + "…"
+    return value
+
+
+class ContextBudgeter:
+    """
+    Hands out a fixed token budget across the parts of a prompt.
+    Each part is taken in priority order (instructions, recent turns,
+    aggregates, sample rows) and only added if it still fits, so the
+    estimated prompt size never exceeds the budget.
+    """
+
+    def __init__(self, budget=DEFAULT_TOKEN_BUDGET, max_cell_chars=MAX_CELL_CHARS):
+        """
+        Initialize ContextBudgeter.
+
+        Args:
+            budget: Total estimated tokens allowed for the prompt
+            max_cell_chars: Longest cell text sent in a sample row
+        """
+        self.budget = budget
+        self.remaining = budget
+        self.max_cell_chars = max_cell_chars
+
+    def spend(self, text, limit=None):
+        """
+        Take text out of the budget if it fits.
+
+        Args:
+            text: Prompt text
+            limit: Smaller cap to check against (optional)
+
+        Returns:
+            bool: True if the text fits and was counted
+        """
+        cost = estimate_tokens(text)
+        available = self.remaining if limit is None else min(limit, self.remaining)
+        if cost > available:
+            return False
+        self.remaining -= cost
+        return True
+
+    def share(self, fraction):
+        """Tokens in a fraction of the remaining budget."""
+        return int(self.remaining * fraction)
+
+    def recent_turns(self, messages, limit=None, format_turn=None):
+        """
+        Pick the most recent chat turns that fit.
+
+        Args:
+            messages: Chat messages (dicts with role and content), oldest first
+            limit: Tokens the turns may use (defaults to the remaining budget)
+            format_turn: Function rendering one message as prompt text
+                (defaults to "User: ..." / "Assistant: ...")
+
+        Returns:
+            str: The chosen turns, oldest first
+        """
+        if format_turn is None:
+            format_turn = lambda msg: (
+                f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}\n"
+            )
+        limit = self.remaining if limit is None else min(limit, self.remaining)
+
+        turns = []
+        for msg in reversed(messages):
+            text = format_turn(msg)
+            cost = estimate_tokens(text)
+            if cost > limit:
+                if not turns and limit > 1:
+                    # The latest turn alone is too long: keep its end
+                    turns.append("…" + text[-(limit - 1) * CHARS_PER_TOKEN :])
+                break
+            turns.append(text)
+            limit -= cost
+
+        text = "".join(reversed(turns))
+        self.remaining -= estimate_tokens(text)
+        return text
+
+    def aggregates(self, df, columns=None, limit=None):
+        """
+        Summarize columns with vectorized aggregates, skipping lines that do not fit.
+
+        Args:
+            df: Table to describe
+            columns: Columns to summarize (defaults to all)
+            limit: Tokens the summary may use (defaults to the remaining budget)
+
+        Returns:
+            str: One line per summarized column
+        """
+        limit = self.remaining if limit is None else min(limit, self.remaining)
+        lines = []
+        for column in columns if columns is not None else df.columns:
+            values = df[column].dropna()
+            if values.empty:
+                continue
+            if pd.api.types.is_bool_dtype(values):
+                values = values.astype(str)
+            if pd.api.types.is_numeric_dtype(values):
+                line = (
+                    f"{column}: min {values.min():g}, mean {values.mean():g}, "
+                    f"max {values.max():g}"
+                )
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                line = f"{column}: from {values.min()} to {values.max()}"
+            else:
+                values = values.astype(str)
+                distinct = values.nunique()
+                if distinct > MAX_CATEGORIES:
+                    line = f"{column}: {distinct} distinct values"
+                else:
+                    counts = values.value_counts().head(TOP_VALUES)
+                    top = ", ".join(f"{value} ({count})" for value, count in counts.items())
+                    line = f"{column}: {distinct} distinct; top {top}"
+
+            line = f"- {line}\n"
+            cost = estimate_tokens(line)
+            if cost > limit:
+                continue
+            lines.append(line)
+            limit -= cost
+
+        text = "".join(lines)
+        self.remaining -= estimate_tokens(text)
+        return text
+
+    def sample_rows(self, df, columns=None, focus=None, limit=None, spread=True):
+        """
+        Pick rows that fit, starting with focus rows and then spread evenly
+        over the table so the sample covers all of it.
+
+        Args:
+            df: Table to sample
+            columns: Columns sent per row (defaults to all)
+            focus: Rows to include first: a boolean mask, or row positions
+                in priority order (optional)
+            limit: Tokens the rows may use (defaults to the remaining budget)
+            spread: Fill the rest of the limit with rows spread over the table
+
+        Returns:
+            tuple: (JSON array text of the chosen rows, number of rows)
+        """
+        limit = self.remaining if limit is None else min(limit, self.remaining)
+        if df.empty or limit <= 2:
+            return "[]", 0
+        frame = df[list(columns)] if columns is not None else df
+
+        # Candidate positions in priority order; no more than could ever fit
+        positions = np.arange(len(frame))
+        first = positions[:0]
+        if focus is not None:
+            focus = np.asarray(focus)
+            first = positions[focus] if focus.dtype == bool else focus.astype(int)
+        rest = positions[:0]
+        if spread:
+            most = max(limit // 8, 1)
+            rest = np.unique(np.linspace(0, len(frame) - 1, min(len(frame), most)).astype(int))
+            rest = rest[_coverage_order(len(rest))]
+        candidates = list(dict.fromkeys(np.concatenate([first, rest]).tolist()))
+        if not candidates:
+            return "[]", 0
+
+        chosen, used = [], 2  # the enclosing brackets
+        records = frame.iloc[candidates].to_dict(orient="records")
+        for i, (record, position) in enumerate(zip(records, candidates)):
+            record = {key: _truncate(value, self.max_cell_chars) for key, value in record.items()}
+            text = json.dumps(record, separators=(",", ":"), default=str, ensure_ascii=False)
+            cost = estimate_tokens(text) + 1
+            if used + cost > limit:
+                if i < len(first):
+                    continue  # a later focus row may still fit
+                break
+            chosen.append((position, text))
+            used += cost
+
+        chosen.sort()
+        text = "[" + ",".join(text for _, text in chosen) + "]"
+        self.remaining -= estimate_tokens(text)
+        return text, len(chosen)
+
+    def frame_context(
+        self,
+        df,
+        label="Dataset",
+        columns=None,
+        focus=None,
+        limit=None,
+        aggregate_share=0.35,
+        summary_columns=None,
+        spread=True,
+    ):
+        """
+        Describe a table within a token limit: size, aggregates and sample rows.
+
+        Args:
+            df: Table to describe
+            label: Name used in the description
+            columns: Columns to include (defaults to all; missing ones are skipped)
+            focus: Rows the question refers to: a boolean mask, or row
+                positions in priority order (optional)
+            limit: Tokens the description may use (defaults to the remaining budget)
+            aggregate_share: Part of the limit reserved for aggregates
+            summary_columns: Columns to aggregate (defaults to columns)
+            spread: Also sample rows spread over the table (False sends only
+                the focus rows)
+
+        Returns:
+            str: Prompt text describing the table
+        """
+        limit = self.remaining if limit is None else min(limit, self.remaining)
+        if columns is not None:
+            columns = [c for c in columns if c in df.columns]
+        else:
+            columns = list(df.columns)
+
+        header = f"{label}: {len(df)} rows; columns: {', '.join(map(str, columns))}\n"
+        cost = estimate_tokens(header) + _SECTION_TOKENS
+        if cost > min(limit, self.remaining):
+            return ""
+        self.remaining -= cost
+        limit -= cost
+
+        before = self.remaining
+        if summary_columns is not None:
+            summary_columns = [c for c in summary_columns if c in df.columns]
+        else:
+            summary_columns = columns
+        summary = self.aggregates(df, summary_columns, limit=int(limit * aggregate_share))
+        limit -= before - self.remaining
+        rows, shown = self.sample_rows(df, columns, focus, limit=limit, spread=spread)
+
+        text = header
+        if summary:
+            text += f"Column summary:\n{summary}"
+        if shown:
+            kind = "Sample rows" if spread else "Relevant rows"
+            text += f"{kind} ({shown} of {len(df)}, JSON):\n{rows}\n"
+        return text
+
+
+def mentioned_rows(df, question, row_column="_row_number", key_column=None):
+    """
+    Find rows a question refers to by row number or primary key.
+
+    Args:
+        df: Table the question is about
+        question: User question
+        row_column: Column holding 1-based row numbers (optional)
+        key_column: Primary key column (optional)
+
+    Returns:
+        np.ndarray: Boolean mask of the referenced rows
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    tokens = set(re.findall(r"[A-Za-z]*-?\d+", question or ""))
+    if not tokens:
+        return mask
+    numbers = {int(token) for token in re.findall(r"\d+", question)}
+    if row_column in df.columns:
+        mask |= df[row_column].isin(numbers).to_numpy()
+    if key_column in df.columns:
+        keys = df[key_column].astype(str)
+        mask |= keys.isin(tokens | {str(n) for n in numbers}).to_numpy()
+    return mask
@@ -0,0 +1,268 @@
+"""
+Retrieval Module
+BM25 keyword search over incidents, tickets and datasets, used to pick
+the records an AI prompt should include instead of sampling the table
+blindly. Each table has an in-memory inverted index kept current through
+the row_changes log: a search first merges only the rows changed since
+the index's watermark, so the index is built once per process and then
+updated incrementally.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from app.data.db import DB_PATH, get_pool
+from app.data.delta import ChangeLog, fetch_changes
+
+
+# Searchable tables: table -> (primary key column, text columns indexed)
+RETRIEVAL_TABLES = {
+    "cyber_incidents": ("incident_id", ["category", "severity", "status", "description"]),
+    "it_tickets": ("ticket_id", ["priority", "status", "assigned_to", "description"]),
+    "datasets_metadata": ("dataset_id", ["name", "uploaded_by"]),
+}
+
+# Records returned per question
+RETRIEVAL_TOP_K = 20
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words too common in questions to say anything about which rows are relevant
+_STOPWORDS = frozenset(
+    """
+    a about all an and any are as at be by can could did do does for from give
+    had has have how i in is it its list me my of on or please show tell than
+    that the their them there these this those to was we were what when where
+    which who why will with would you your
+    """.split()
+)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase search terms.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        list: Alphanumeric terms without stopwords
+    """
+    return [t for t in _TOKEN.findall(str(text).lower()) if t not in _STOPWORDS]
+
+
+def key_text(values):
+    """
+    Normalize primary key values to the text the index uses.
+    Whole numbers lose any float formatting, so 7, 7.0 and "7" match.
+
+    Args:
+        values: Key values (Series or list)
+
+    Returns:
+        pd.Series: Keys as text
+    """
+    values = pd.Series(values, dtype=object)
+    numbers = pd.to_numeric(values, errors="coerce")
+    whole = numbers.notna() & (numbers % 1 == 0)
+    text = values.astype(str)
+    text[whole] = numbers[whole].astype("int64").astype(str)
+    return text
+
+
+class BM25Index:
+    """
+    Inverted index over one table's text columns, ranked with Okapi BM25.
+    Documents are keyed by the row's primary key (as text); re-indexing a
+    key replaces its old terms, so updated rows never score twice.
+    """
+
+    def __init__(self, table, key_column, fields, k1=BM25_K1, b=BM25_B):
+        """
+        Initialize BM25Index (empty until refresh()).
+
+        Args:
+            table: Table name
+            key_column: Primary key column
+            fields: Text columns indexed
+            k1: Term frequency saturation
+            b: Document length normalization (0 = none, 1 = full)
+        """
+        self.table = table
+        self.key_column = key_column
+        self.fields = list(fields)
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {key: term frequency}
+        self.terms = {}  # key -> Counter of the document's terms
+        self.lengths = {}  # key -> number of terms
+        self.total_length = 0
+        self.watermark = None  # row_changes watermark indexed up to (None = never built)
+        self._lock = threading.Lock()
+
+    def _remove(self, key):
+        """Drop a document's terms."""
+        terms = self.terms.pop(key, None)
+        if terms is None:
+            return
+        self.total_length -= self.lengths.pop(key)
+        for term in terms:
+            postings = self.postings[term]
+            del postings[key]
+            if not postings:
+                del self.postings[term]
+
+    def _add(self, key, text):
+        """Index a document (replacing any previous version)."""
+        self._remove(key)
+        terms = self.terms[key] = Counter(tokenize(text))
+        self.lengths[key] = sum(terms.values())
+        self.total_length += self.lengths[key]
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[key] = count
+
+    def _index_rows(self, rows):
+        """Index the rows of a DataFrame."""
+        fields = [f for f in self.fields if f in rows.columns]
+        keys = key_text(rows[self.key_column])
+        texts = rows[fields].fillna("").astype(str).agg(" ".join, axis=1) if fields else keys
+        for key, text in zip(keys, texts):
+            self._add(key, text)
+
+    def refresh(self, conn):
+        """
+        Bring the index up to date with the table.
+
+        Args:
+            conn: SQLite database connection object
+        """
+        with self._lock:
+            if self.watermark is not None and ChangeLog(conn).watermark() == self.watermark:
+                return
+            columns = ", ".join([self.key_column] + self.fields)
+            since = self.watermark or 0
+            rows, deleted, watermark = fetch_changes(
+                conn, self.table, self.key_column, since, columns
+            )
+            if rows is None:
+                # The log no longer reaches back to the watermark
+                since = 0
+                rows, deleted, watermark = fetch_changes(
+                    conn, self.table, self.key_column, since, columns
+                )
+            if not since:
+                # Full read: index everything from scratch
+                self.postings, self.terms, self.lengths, self.total_length = {}, {}, {}, 0
+            for key in key_text(deleted):
+                self._remove(key)
+            self._index_rows(rows)
+            self.watermark = watermark
+
+    def search(self, query, k=RETRIEVAL_TOP_K):
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Question or keywords
+            k: Number of results
+
+        Returns:
+            list: (key, score) pairs, best first (only documents sharing a term)
+        """
+        with self._lock:
+            count = len(self.lengths)
+            if not count:
+                return []
+            average = self.total_length / count or 1
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[key] / average)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+# Indexes keyed by (database path, table)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(table, db_path=DB_PATH):
+    """Get the process-wide index of a table, creating it on first use."""
+    key = (str(db_path), table)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            key_column, fields = RETRIEVAL_TABLES[table]
+            index = _indexes[key] = BM25Index(table, key_column, fields)
+        return index
+
+
+def retrieve(table, question, k=RETRIEVAL_TOP_K, db_path=DB_PATH):
+    """
+    Find the records of a table most relevant to a question.
+
+    Args:
+        table: Table name (a key of RETRIEVAL_TABLES)
+        question: User question
+        k: Number of records
+        db_path: Path to database file (defaults to DB_PATH)
+
+    Returns:
+        list: Primary keys (as text), most relevant first
+    """
+    index = get_index(table, db_path)
+    with get_pool(db_path).connection() as conn:
+        index.refresh(conn)
+    return [key for key, _ in index.search(question, k)]
+
+
+def relevant_rows(df, question, key_column=None, k=RETRIEVAL_TOP_K, db_path=DB_PATH):
+    """
+    Find the rows of a frame most relevant to a question.
+    The table is picked by the frame's primary key column; rows whose key is
+    not in the database (e.g. uploaded but not imported) are never returned.
+
+    Args:
+        df: Frame of incidents, tickets or datasets
+        question: User question
+        key_column: Primary key column (defaults to the first known one in df)
+        k: Number of rows
+        db_path: Path to database file (defaults to DB_PATH)
+
+    Returns:
+        np.ndarray: Row positions in df, most relevant first (empty if none)
+    """
+    table = next(
+        (
+            table
+            for table, (column, _) in RETRIEVAL_TABLES.items()
+            if column in df.columns and key_column in (None, column)
+        ),
+        None,
+    )
+    if table is None or not question:
+        return np.array([], dtype=int)
+    try:
+        keys = retrieve(table, question, k, db_path)
+    except Exception:
+        # Retrieval is an optimization: fall back to sampling without it
+        return np.array([], dtype=int)
+    ranks = key_text(df[RETRIEVAL_TABLES[table][0]]).map({key: i for i, key in enumerate(keys)})
+    ranks = ranks.to_numpy(dtype=float, na_value=np.nan)
+    positions = np.flatnonzero(~np.isnan(ranks))
+    return positions[np.argsort(ranks[positions], kind="stable")]
@@ -154,9 +154,12 @@ if role != "cyber":
 # =====================================================
 from app.data.db import connect_database
 from app.data.incidents import (
-    get_all_incidents,
+    SecurityIncident,
     insert_incident,
 )
+from app.data.filters import FilterSpec
+from app.data.rollups import read_rollup
+from app.data.timestamps import to_datetime64
 
 DB_PATH = Path("DATA/intelligence_platform.db")
 conn = connect_database(DB_PATH)
@@ -248,16 +251,16 @@ html(
 
 
 # =====================================================
-# LOAD INCIDENT DATA
+# FILTER OPTIONS
 # =====================================================
-data = get_all_incidents(conn)
+# Distinct values come from the trigger-maintained rollup (one row per
+# day/severity/category/status group), so no incident rows are read here
+option_rollup = read_rollup(conn, "cyber_incidents")
 
-# --- PARSE TIMESTAMP ONCE ---
-if "timestamp" in data.columns:
-    # convert to datetime WITHOUT changing timezone
-    data["timestamp"] = pd.to_datetime(
-        data["timestamp"], errors="coerce", format="%Y-%m-%d %H:%M:%S.%f"
-    )
+
+def filter_options(column):
+    """Sorted distinct values of a rollup column."""
+    return sorted(option_rollup[column].dropna().unique().tolist())
 
 
 # =====================================================
@@ -270,65 +273,64 @@ with st.container():
         with colA:
             sev_filter = st.multiselect(
                 "Severity",
-                sorted(data["severity"].dropna().unique().tolist()),
+                filter_options("severity"),
                 default=None,
             )
 
         with colB:
             status_filter = st.multiselect(
                 "Status",
-                sorted(data["status"].dropna().unique().tolist()),
+                filter_options("status"),
                 default=None,
             )
 
         with colC:
             cat_filter = st.multiselect(
                 "Category",
-                sorted(data["category"].dropna().unique().tolist()),
+                filter_options("category"),
                 default=None,
             )
 
         with colD:
             date_filter = st.date_input("Date Range", [])
 
-# APPLY FILTERS
-filtered = data.copy()
-
-if sev_filter:
-    filtered = filtered[filtered["severity"].isin(sev_filter)]
-
-if status_filter:
-    filtered = filtered[filtered["status"].isin(status_filter)]
+# FILTER SPEC (evaluated in SQL by the grid, rollups and AI context reads)
+incident_filter = (
+    FilterSpec()
+    .isin("severity", sev_filter)
+    .isin("status", status_filter)
+    .isin("category", cat_filter)
+)
+if len(date_filter) == 2:
+    incident_filter.date_range("timestamp", *date_filter)
 
-if cat_filter:
-    filtered = filtered[filtered["category"].isin(cat_filter)]
+# =====================================================
+# DESCRIPTION SEARCH (full-text index, ranked with snippets)
+# =====================================================
+from app.components.description_search import DescriptionSearchBox
 
-if len(date_filter) == 2:
-    start, end = date_filter
-    filtered = filtered[
-        (filtered["timestamp"] >= pd.to_datetime(start))
-        & (filtered["timestamp"] <= pd.to_datetime(end))
-    ]
+with st.expander("🔎 Search Incident Descriptions", expanded=False):
+    DescriptionSearchBox("incidents", "cyber_incidents").render(conn)
 
 # =====================================================
 # DATA MANAGEMENT & AI ASSISTANT
 # =====================================================
 from app.components.data_manager import DataManager
+from app.components.paginated_grid import PaginatedGrid
+from app.data.bulk import CONFLICT_POLICIES
+from app.data.ids import new_id
 from app.services.ai_assistant import ai_assistant
 
-# Initialize data manager - get expected columns from actual data
-if not data.empty:
-    expected_columns = list(data.columns)
-else:
-    expected_columns = [
-        "incident_id",
-        "timestamp",
-        "severity",
-        "category",
-        "status",
-        "description",
-        "inserted_at",  # Include inserted_at if it exists in the database
-    ]
+# Initialize data manager - expected columns are those incident reads return
+expected_columns = [
+    "incident_id",
+    "timestamp",
+    "severity",
+    "category",
+    "status",
+    "description",
+    "inserted_at",
+]
 
 
 # Helper function to insert incident from row dict
@@ -349,7 +351,11 @@ def insert_incident_from_row(conn, **row_dict):
 
 
 data_manager = DataManager(
-    "cyber_incidents", expected_columns, conn=conn, insert_func=insert_incident_from_row
+    "cyber_incidents",
+    expected_columns,
+    conn=conn,
+    insert_func=insert_incident_from_row,
+    bulk_insert_func=SecurityIncident.bulk_insert,
 )
 
 # Get all data sources
@@ -357,47 +363,22 @@ matching_data = data_manager.get_matching_data()
 unmatching_data = data_manager.get_unmatching_data()
 manual_data = data_manager.get_manual_data()
 
-# IMPORTANT: Combine with FULL data (not filtered) first, so manual rows are included
-# Then apply filters to the combined dataset
-combined_data = data_manager.combine_with_original(data)
-
-# Parse timestamps in combined data (for manual/matching data that might not be parsed)
-if "timestamp" in combined_data.columns:
-    combined_data["timestamp"] = pd.to_datetime(
-        combined_data["timestamp"], errors="coerce", format="%Y-%m-%d %H:%M:%S.%f"
-    )
-
-# Apply filters to combined data (so charts include manual/uploaded data)
-filtered_combined = combined_data.copy()
 
-if sev_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["severity"].isin(sev_filter)
-    ]
-
-if status_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["status"].isin(status_filter)
-    ]
-
-if cat_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["category"].isin(cat_filter)
-    ]
-
-if len(date_filter) == 2:
-    start, end = date_filter
-    filtered_combined = filtered_combined[
-        (filtered_combined["timestamp"] >= pd.to_datetime(start))
-        & (filtered_combined["timestamp"] <= pd.to_datetime(end))
-    ]
 
-# Save the original filtered database data length for deletion logic
-original_filtered_db_len = len(filtered)
+def filtered_combined():
+    """
+    Filtered database rows plus the session (manual/uploaded) rows that pass
+    the same filter. Only the AI assistants need every row, and they call
+    this when a question is asked rather than on every rerun.
+    """
+    combined = data_manager.combine_with_original(
+        SecurityIncident.get_filtered(conn, incident_filter), row_filter=incident_filter
+    )
+    # Parse timestamps of the session rows (database rows are already datetime64)
+    if "timestamp" in combined.columns:
+        combined["timestamp"] = to_datetime64(combined["timestamp"])
+    return combined
 
-# For display in data editor, use filtered_combined (filtered version of combined data)
-# But keep the original filtered for backward compatibility if needed
-filtered = filtered_combined.copy()
 
 # =====================================================
 # DATA DISPLAY
@@ -415,10 +396,28 @@ tab1, tab2, tab3 = st.tabs(
 
 with tab1:
     st.markdown("#### All Data (Original + Matching + Manual)")
-    if not filtered_combined.empty:
-        # Display with index for deletion - use filtered_combined to match charts
-        display_data = filtered_combined.copy()
-        display_data.insert(0, "Row #", range(1, len(display_data) + 1))
+    # Database rows are read one sorted page at a time (keyset pagination);
+    # session rows that pass the filter are listed above the first page
+    combined_grid = PaginatedGrid(
+        "cyber_combined", SecurityIncident.paginator(), default_sort="timestamp"
+    )
+    page_rows = combined_grid.render(conn, incident_filter)
+    session_rows = (
+        data_manager.get_session_rows(incident_filter)
+        if combined_grid.page_number == 1
+        else pd.DataFrame()
+    )
+    shows_session_rows = not session_rows.empty
+    display_data = (
+        pd.concat([session_rows, page_rows], ignore_index=True)
+        if shows_session_rows
+        else page_rows
+    )
+    if not display_data.empty:
+        display_data["timestamp"] = to_datetime64(display_data["timestamp"])
+        # Row numbers continue across pages
+        first_row = combined_grid.first_row
+        display_data.insert(0, "Row #", range(first_row, first_row + len(display_data)))
 
         # Use data editor with delete capability - full width display
         edited_df = st.data_editor(
@@ -426,82 +425,20 @@ with tab1:
             use_container_width=True,
             height=500,
             num_rows="dynamic",
-            key="combined_data_editor",
-            disabled=["Row #"],  # Make row number non-editable
+            key=data_manager.editor_key(combined_grid.editor_key),
+            disabled=["Row #", "incident_id"],  # Row numbers and ids are not editable
             hide_index=True,  # Hide default index
         )
 
-        # Handle row deletions from data editor
-        # Remove "Row #" column for processing
-        if "Row #" in edited_df.columns:
-            edited_df_clean = edited_df.drop(columns=["Row #"]).reset_index(drop=True)
-        else:
-            edited_df_clean = edited_df.reset_index(drop=True)
-
-        # Check if rows were deleted by comparing lengths
-        original_combined_len = len(filtered_combined)
-        current_len = len(edited_df_clean)
-
-        # Track processed deletions to prevent infinite rerun loop
-        deletion_tracking_key = "cyber_deletion_tracking"
-        deletion_processed_key = "cyber_deletion_processed"
-
-        # Initialize tracking
-        if deletion_tracking_key not in st.session_state:
-            st.session_state[deletion_tracking_key] = original_combined_len
-        if deletion_processed_key not in st.session_state:
-            st.session_state[deletion_processed_key] = False
-
-        # Only process deletion if:
-        # 1. Current length is less than original (deletion detected)
-        # 2. We haven't already processed this deletion (prevent rerun loop)
-        # 3. The tracked length matches the original (ensures we're processing a new deletion)
-        if (
-            current_len < original_combined_len
-            and not st.session_state[deletion_processed_key]
-            and st.session_state[deletion_tracking_key] == original_combined_len
-        ):
-            # Mark deletion as being processed
-            st.session_state[deletion_processed_key] = True
-            st.session_state[deletion_tracking_key] = current_len
-
-            # Rows were deleted - use primary key to identify which rows are manual/matching
-            # Get list of incident_ids from database
-            db_incident_ids = set(data["incident_id"].astype(str).unique())
-
-            # Separate remaining rows into database vs manual/matching
-            remaining_manual_matching = []
-            for idx, row in edited_df_clean.iterrows():
-                incident_id = str(row.get("incident_id", ""))
-                # If incident_id is not in database, it's a manual/matching row
-                if incident_id not in db_incident_ids:
-                    remaining_manual_matching.append(row)
-
-            # Convert to DataFrame
-            if remaining_manual_matching:
-                remaining_df = pd.DataFrame(remaining_manual_matching)
-                # Try to preserve matching vs manual split if possible
-                # But simpler: just put all remaining in manual (matching data is usually inserted into DB anyway)
-                st.session_state["cyber_incidents_manual_data"] = (
-                    remaining_df.reset_index(drop=True)
-                )
-                # Clear matching data (it's usually inserted into DB, so if it's still here, treat as manual)
-                st.session_state["cyber_incidents_matching_data"] = pd.DataFrame()
-            else:
-                # All manual/matching rows deleted
-                st.session_state["cyber_incidents_matching_data"] = pd.DataFrame()
-                st.session_state["cyber_incidents_manual_data"] = pd.DataFrame()
-
-            deleted_count = original_combined_len - current_len
-            st.success(f"Deleted {deleted_count} row(s).")
-            # Reset flags before rerun so charts update properly
-            st.session_state[deletion_processed_key] = False
+        # Persist deletions and edits: rows are matched by incident_id, database
+        # rows are deleted/updated in one transaction and session rows in place
+        deleted_count, edited_count = data_manager.apply_editor_changes(
+            SecurityIncident.reconciler(), display_data, edited_df
+        )
+        if deleted_count or edited_count:
+            st.success(f"Deleted {deleted_count} row(s), updated {edited_count} row(s).")
             # Rerun once to refresh the display and charts
             st.rerun()
-        elif current_len == original_combined_len:
-            # No deletion detected - reset processing flag and update tracking
-            st.session_state[deletion_processed_key] = False
-            st.session_state[deletion_tracking_key] = original_combined_len
     else:
         st.info("No data available")
 
@@ -562,6 +499,14 @@ with upload_col1:
         "Choose CSV file", type="csv", key="cyber_csv_upload"
     )
 
+    # What to do with uploaded rows whose ID already exists in the database
+    conflict_policy = st.selectbox(
+        "If a record already exists",
+        list(CONFLICT_POLICIES),
+        format_func=CONFLICT_POLICIES.get,
+        key="cyber_conflict_policy",
+    )
+
     # Continue with CSV processing...
 
     # Track processed files to prevent infinite rerun loop
@@ -596,7 +541,13 @@ with upload_col1:
             status_text.info("⏳ Processing CSV file...")
 
             try:
-                success, message = data_manager.handle_csv_upload(uploaded_file)
+                success, message = data_manager.handle_csv_upload(
+                    uploaded_file,
+                    progress_callback=lambda rows, fraction: progress_bar.progress(
+                        int(fraction * 100), text=f"{rows:,} rows processed"
+                    ),
+                    on_conflict=conflict_policy,
+                )
                 progress_bar.progress(100)
                 status_text.empty()
 
@@ -607,7 +558,7 @@ with upload_col1:
                     # Rerun if data was inserted OR if unmatching data was added
                     if (
                         "inserted" in message.lower() and "0" not in message
-                    ) or "unmatching data" in message.lower():
+                    ) or "unmatching data" in message.lower() or "updated" in message.lower():
                         # Clear processing flag BEFORE rerun to prevent stuck state
                         st.session_state[processing_key] = False
                         st.rerun()
@@ -692,7 +643,7 @@ with upload_col2b:
             )
             manual_incident_id = st.text_input(
                 "Incident ID",
-                value=f"INC{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}",
+                value=new_id("INC"),
                 key="manual_incident_id",
             )
             manual_description = st.text_area("Description", key="manual_description")
@@ -705,7 +656,7 @@ with upload_col2b:
                 "incident_id": (
                     manual_incident_id
                     if manual_incident_id
-                    else f"INC{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+                    else new_id("INC")
                 ),
                 "timestamp": final_timestamp,  # Always current time - never None
                 "severity": manual_severity,
@@ -727,6 +678,21 @@ with upload_col2b:
 # =====================================================
 st.markdown("## 📊 Analytics")
 
+# KPIs and charts read pre-aggregated (day, severity, category, status) counts
+# maintained by triggers, plus the session rows summarized the same way
+incident_rollup = read_rollup(
+    conn,
+    "cyber_incidents",
+    incident_filter,
+    data_manager.get_session_rows(incident_filter),
+)
+
+
+def rollup_counts(column):
+    """Total incidents per value of a rollup column."""
+    return incident_rollup.groupby(column)["count"].sum().reset_index()
+
+
 c1, c2, c3, c4 = st.columns(4)
 
 c1.markdown(
@@ -734,7 +700,7 @@ c1.markdown(
     <div style="padding: 0 9px;">
         <div class="metric-card">
             <h3>Total Incidents</h3>
-            <div class="metric-value">{len(filtered_combined)}</div>
+            <div class="metric-value">{int(incident_rollup['count'].sum())}</div>
         </div>
     </div>
     """,
@@ -746,7 +712,7 @@ c2.markdown(
     <div style="padding: 0 80px;">
         <div class="metric-card">
             <h3>High Severity</h3>
-            <div class="metric-value">{(filtered_combined['severity']=='High').sum()}</div>
+            <div class="metric-value">{int(incident_rollup.loc[incident_rollup['severity']=='High', 'count'].sum())}</div>
         </div>
     </div>
     """,
@@ -758,7 +724,7 @@ c3.markdown(
     <div style="padding: 0 150px;">
         <div class="metric-card">
             <h3>Open Incidents</h3>
-            <div class="metric-value">{(filtered_combined['status']=='Open').sum()}</div>
+            <div class="metric-value">{int(incident_rollup.loc[incident_rollup['status']=='Open', 'count'].sum())}</div>
         </div>
     </div>
     """,
@@ -770,7 +736,7 @@ c4.markdown(
     <div style="padding: 0 220px;">
         <div class="metric-card">
             <h3>Categories</h3>
-            <div class="metric-value">{filtered_combined['category'].nunique()}</div>
+            <div class="metric-value">{incident_rollup['category'].nunique()}</div>
         </div>
     </div>
     """,
@@ -792,9 +758,11 @@ severity_colors = {
     "Critical": "#ff0000",
 }
 
+severity_counts = rollup_counts("severity")
 fig1 = px.pie(
-    filtered_combined,
+    severity_counts,
     names="severity",
+    values="count",
     title="🛡️ Severity Distribution",
     color="severity",
     color_discrete_map=severity_colors,
@@ -802,7 +770,7 @@ fig1 = px.pie(
 )
 fig1.update_traces(
     textinfo="percent+label",
-    pull=[0.08] * len(filtered_combined["severity"].unique()),
+    pull=[0.08] * len(severity_counts),
     hoverinfo="label+percent+value",
     marker=dict(line=dict(color="#ffffff", width=2)),
 )
@@ -817,7 +785,7 @@ fig1.update_layout(
 )
 
 # ------------------ BAR CHART: Incidents by Category ------------------
-cat_counts = filtered_combined.groupby("category").size().reset_index(name="count")
+cat_counts = rollup_counts("category")
 fig2 = px.bar(
     cat_counts,
     x="category",
@@ -845,42 +813,39 @@ fig2.update_layout(
 )
 
 # ------------------ LINE CHART: Trend Over Time ------------------
-if "timestamp" in filtered_combined.columns:
-    time_series = (
-        filtered_combined.dropna(subset=["timestamp"])
-        .groupby(filtered_combined["timestamp"].dt.date)
-        .size()
-        .reset_index(name="count")
-    )
-    fig3 = px.line(
-        time_series,
-        x="timestamp",
-        y="count",
-        title="📈 Trend Over Time",
-        markers=True,
-    )
-    fig3.update_traces(
-        line_color="#ff33ff",
-        line_width=4,
-        marker=dict(size=12, color="#00ffcc", line=dict(width=2, color="#ffffff")),
-        hovertemplate="<b>%{x}</b><br>Incidents: %{y}<extra></extra>",
-    )
-    fig3.update_layout(
-        title_font=dict(family="Orbitron", size=28, color="#ff33ff"),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
-        font=dict(family="Orbitron", color="#ffffff"),
-        margin=dict(t=60, b=50, l=40, r=40),
-        height=550,
-    )
+time_series = rollup_counts("day").rename(columns={"day": "timestamp"})
+time_series["timestamp"] = pd.to_datetime(time_series["timestamp"]).dt.date
+fig3 = px.line(
+    time_series,
+    x="timestamp",
+    y="count",
+    title="📈 Trend Over Time",
+    markers=True,
+)
+fig3.update_traces(
+    line_color="#ff33ff",
+    line_width=4,
+    marker=dict(size=12, color="#00ffcc", line=dict(width=2, color="#ffffff")),
+    hovertemplate="<b>%{x}</b><br>Incidents: %{y}<extra></extra>",
+)
+fig3.update_layout(
+    title_font=dict(family="Orbitron", size=28, color="#ff33ff"),
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
+    yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
+    font=dict(family="Orbitron", color="#ffffff"),
+    margin=dict(t=60, b=50, l=40, r=40),
+    height=550,
+)
 
 # ------------------ HEATMAP: Severity vs Category ------------------
 fig4 = px.density_heatmap(
-    filtered_combined,
+    incident_rollup,
     x="category",
     y="severity",
+    z="count",
+    histfunc="sum",
     title="🔥 Severity vs Category Heatmap",
     color_continuous_scale=["#00ffcc", "#bb00ff", "#ff33ff", "#ff0000"],
 )
@@ -257,21 +257,20 @@ html(
 # =====================================================
 from app.data.db import connect_database
 from app.data.datasets import (
+    Dataset,
     insert_dataset_metadata,
     get_all_datasets,
 )
+from app.data.filters import FilterSpec
+from app.data.timestamps import to_datetime64
 
 DB_PATH = Path("DATA/intelligence_platform.db")
 conn = connect_database(DB_PATH)
 
 
-# fetch
+# fetch (upload_date arrives as datetime64, read from the generated upload_date_ms column)
 df = get_all_datasets(conn)
 
-# ensure upload_date is datetime if you need date sorting/filtering
-if "upload_date" in df.columns:
-    df["upload_date"] = pd.to_datetime(df["upload_date"], errors="coerce")
-
 # sort by dataset_id ascending and reset index so left column becomes 0..n-1
 df = df.sort_values(by="dataset_id", ascending=True).reset_index(drop=True)
 
@@ -309,33 +308,23 @@ with colD:
 # =====================================================
 # APPLY FILTERS
 # =====================================================
-filtered_df = df.copy()
-
-# Apply filters using existing columns
-if name_filter:
-    filtered_df = filtered_df[filtered_df["name"].isin(name_filter)]
-
-if uploaded_by_filter:
-    filtered_df = filtered_df[filtered_df["uploaded_by"].isin(uploaded_by_filter)]
-
-# Date range filter
+# Evaluated in SQL - only matching rows leave the database
+dataset_filter = (
+    FilterSpec()
+    .isin("name", name_filter)
+    .isin("uploaded_by", uploaded_by_filter)
+)
 if len(date_filter) == 2:
-    start, end = date_filter
-    filtered_df = filtered_df[
-        (filtered_df["upload_date"] >= pd.to_datetime(start))
-        & (filtered_df["upload_date"] <= pd.to_datetime(end))
-    ]
-
-# Ensure upload_date is datetime
-filtered_df["upload_date"] = pd.to_datetime(filtered_df["upload_date"])
+    dataset_filter.date_range("upload_date", *date_filter)
 
-# Date range filter
-if len(date_filter) == 2:
-    start, end = date_filter
-    filtered_df = filtered_df[
-        (filtered_df["upload_date"] >= pd.to_datetime(start))
-        & (filtered_df["upload_date"] <= pd.to_datetime(end))
-    ]
+if dataset_filter.is_empty():
+    filtered_df = df.copy()
+else:
+    filtered_df = Dataset.get_filtered(conn, dataset_filter)
+    # Same ordering as the unfiltered table
+    filtered_df = filtered_df.sort_values(by="dataset_id", ascending=True).reset_index(
+        drop=True
+    )
 
 # Save original unfiltered data before overwriting df
 original_df = df.copy()
@@ -347,6 +336,8 @@ df = filtered_df
 # DATA MANAGEMENT & AI ASSISTANT
 # =====================================================
 from app.components.data_manager import DataManager
+from app.data.bulk import CONFLICT_POLICIES
+from app.data.ids import new_id
 from app.services.ai_assistant import ai_assistant
 
 # Initialize data manager - get expected columns from actual data
@@ -381,7 +372,11 @@ def insert_dataset_from_row(conn, **row_dict):
 
 
 data_manager = DataManager(
-    "datasets", expected_columns, conn=conn, insert_func=insert_dataset_from_row
+    "datasets",
+    expected_columns,
+    conn=conn,
+    insert_func=insert_dataset_from_row,
+    bulk_insert_func=Dataset.bulk_insert,
 )
 
 # Get all data sources
@@ -389,33 +384,13 @@ matching_data = data_manager.get_matching_data()
 unmatching_data = data_manager.get_unmatching_data()
 manual_data = data_manager.get_manual_data()
 
-# IMPORTANT: Combine with FULL original data (not filtered) first, so manual rows are included
-# Then apply filters to the combined dataset
-combined_data = data_manager.combine_with_original(original_df)
-
-# Parse upload_date in combined data (for manual/matching data that might not be parsed)
-if "upload_date" in combined_data.columns:
-    combined_data["upload_date"] = pd.to_datetime(
-        combined_data["upload_date"], errors="coerce"
-    )
-
-# Apply filters to combined data (so charts include manual/uploaded data)
-filtered_combined = combined_data.copy()
+# Combine the filtered database rows with session (manual/uploaded) rows that
+# pass the same filter, so charts include manual/uploaded data
+filtered_combined = data_manager.combine_with_original(df, row_filter=dataset_filter)
 
-if name_filter:
-    filtered_combined = filtered_combined[filtered_combined["name"].isin(name_filter)]
-
-if uploaded_by_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["uploaded_by"].isin(uploaded_by_filter)
-    ]
-
-if len(date_filter) == 2:
-    start, end = date_filter
-    filtered_combined = filtered_combined[
-        (filtered_combined["upload_date"] >= pd.to_datetime(start))
-        & (filtered_combined["upload_date"] <= pd.to_datetime(end))
-    ]
+# Parse upload_date of the session rows (database rows are already datetime64)
+if "upload_date" in filtered_combined.columns:
+    filtered_combined["upload_date"] = to_datetime64(filtered_combined["upload_date"])
 
 # Save the original filtered database data length for deletion logic
 original_filtered_db_len = len(df)
@@ -447,79 +422,20 @@ with tab1:
             use_container_width=True,
             height=500,
             num_rows="dynamic",
-            key="datasets_combined_editor",
-            disabled=["Row #"],
+            key=data_manager.editor_key("datasets_combined_editor"),
+            disabled=["Row #", "dataset_id"],
             hide_index=True,
         )
 
-        # Handle row deletions from data editor
-        if "Row #" in edited_df.columns:
-            edited_df_clean = edited_df.drop(columns=["Row #"]).reset_index(drop=True)
-        else:
-            edited_df_clean = edited_df.reset_index(drop=True)
-
-        original_combined_len = len(filtered_combined)
-        current_len = len(edited_df_clean)
-
-        # Track processed deletions to prevent infinite rerun loop
-        deletion_tracking_key = "datasets_deletion_tracking"
-        deletion_processed_key = "datasets_deletion_processed"
-
-        # Initialize tracking
-        if deletion_tracking_key not in st.session_state:
-            st.session_state[deletion_tracking_key] = original_combined_len
-        if deletion_processed_key not in st.session_state:
-            st.session_state[deletion_processed_key] = False
-
-        # Only process deletion if:
-        # 1. Current length is less than original (deletion detected)
-        # 2. We haven't already processed this deletion (prevent rerun loop)
-        # 3. The tracked length matches the original (ensures we're processing a new deletion)
-        if (
-            current_len < original_combined_len
-            and not st.session_state[deletion_processed_key]
-            and st.session_state[deletion_tracking_key] == original_combined_len
-        ):
-            # Mark deletion as being processed
-            st.session_state[deletion_processed_key] = True
-            st.session_state[deletion_tracking_key] = current_len
-
-            # Rows were deleted - use primary key to identify which rows are manual/matching
-            # Get list of dataset_ids from database
-            db_dataset_ids = set(original_df["dataset_id"].astype(str).unique())
-
-            # Separate remaining rows into database vs manual/matching
-            remaining_manual_matching = []
-            for idx, row in edited_df_clean.iterrows():
-                dataset_id = str(row.get("dataset_id", ""))
-                # If dataset_id is not in database, it's a manual/matching row
-                if dataset_id not in db_dataset_ids:
-                    remaining_manual_matching.append(row)
-
-            # Convert to DataFrame
-            if remaining_manual_matching:
-                remaining_df = pd.DataFrame(remaining_manual_matching)
-                # Put all remaining in manual (matching data is usually inserted into DB anyway)
-                st.session_state["datasets_manual_data"] = remaining_df.reset_index(
-                    drop=True
-                )
-                # Clear matching data
-                st.session_state["datasets_matching_data"] = pd.DataFrame()
-            else:
-                # All manual/matching rows deleted
-                st.session_state["datasets_matching_data"] = pd.DataFrame()
-                st.session_state["datasets_manual_data"] = pd.DataFrame()
-
-            deleted_count = original_combined_len - current_len
-            st.success(f"Deleted {deleted_count} row(s).")
-            # Reset flags before rerun so charts update properly
-            st.session_state[deletion_processed_key] = False
+        # Persist deletions and edits: rows are matched by dataset_id, database
+        # rows are deleted/updated in one transaction and session rows in place
+        deleted_count, edited_count = data_manager.apply_editor_changes(
+            Dataset.reconciler(), display_data, edited_df
+        )
+        if deleted_count or edited_count:
+            st.success(f"Deleted {deleted_count} row(s), updated {edited_count} row(s).")
             # Rerun once to refresh the display and charts
             st.rerun()
-        elif current_len == original_combined_len:
-            # No deletion detected - reset processing flag and update tracking
-            st.session_state[deletion_processed_key] = False
-            st.session_state[deletion_tracking_key] = original_combined_len
     else:
         st.info("No data available")
 
@@ -579,6 +495,14 @@ with upload_col1:
         "Choose CSV file", type="csv", key="datasets_csv_upload"
     )
 
+    # What to do with uploaded rows whose ID already exists in the database
+    conflict_policy = st.selectbox(
+        "If a record already exists",
+        list(CONFLICT_POLICIES),
+        format_func=CONFLICT_POLICIES.get,
+        key="datasets_conflict_policy",
+    )
+
     # Track processed files to prevent infinite rerun loop
     processed_files_key = "datasets_processed_files"
     if processed_files_key not in st.session_state:
@@ -611,7 +535,13 @@ with upload_col1:
             status_text.info("⏳ Processing CSV file...")
 
             try:
-                success, message = data_manager.handle_csv_upload(uploaded_file)
+                success, message = data_manager.handle_csv_upload(
+                    uploaded_file,
+                    progress_callback=lambda rows, fraction: progress_bar.progress(
+                        int(fraction * 100), text=f"{rows:,} rows processed"
+                    ),
+                    on_conflict=conflict_policy,
+                )
                 progress_bar.progress(100)
                 status_text.empty()
 
@@ -622,7 +552,7 @@ with upload_col1:
                     # Rerun if data was inserted OR if unmatching data was added
                     if (
                         "inserted" in message.lower() and "0" not in message
-                    ) or "unmatching data" in message.lower():
+                    ) or "unmatching data" in message.lower() or "updated" in message.lower():
                         # Clear processing flag BEFORE rerun to prevent stuck state
                         st.session_state[processing_key] = False
                         st.rerun()
@@ -702,7 +632,7 @@ with upload_col2b:
                 "dataset_id": (
                     manual_dataset_id
                     if manual_dataset_id
-                    else f"DS{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+                    else new_id("DS")
                 ),
                 "name": manual_name if manual_name else "",
                 "rows": manual_rows,
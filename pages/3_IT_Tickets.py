@@ -269,9 +269,13 @@ html(
 # =====================================================
 from app.data.db import connect_database
 from app.data.tickets import (
+    ITTicket,
     insert_ticket,
     get_all_tickets,
 )
+from app.data.filters import FilterSpec
+from app.data.rollups import read_rollup
+from app.data.timestamps import to_datetime64
 
 DB_PATH = Path("DATA/intelligence_platform.db")
 conn = connect_database(DB_PATH)
@@ -317,31 +321,42 @@ with st.container():
 # =====================================================
 # APPLY FILTERS
 # =====================================================
-filtered_df = df.copy()
-if priority_filter:
-    filtered_df = filtered_df[filtered_df["priority"].isin(priority_filter)]
-if status_filter:
-    filtered_df = filtered_df[filtered_df["status"].isin(status_filter)]
-if assigned_filter:
-    filtered_df = filtered_df[filtered_df["assigned_to"].isin(assigned_filter)]
-# Convert created_at to datetime, handling invalid values gracefully
-if "created_at" in filtered_df.columns:
-    filtered_df["created_at"] = pd.to_datetime(
-        filtered_df["created_at"], errors="coerce"
-    )
+# Evaluated in SQL - only matching rows leave the database
+ticket_filter = (
+    FilterSpec()
+    .isin("priority", priority_filter)
+    .isin("status", status_filter)
+    .isin("assigned_to", assigned_filter)
+)
 if len(date_filter) == 2:
-    start, end = date_filter
-    # Filter by date, excluding rows with invalid dates (NaT)
-    filtered_df = filtered_df[
-        (filtered_df["created_at"].notna())
-        & (filtered_df["created_at"] >= pd.to_datetime(start))
-        & (filtered_df["created_at"] <= pd.to_datetime(end))
-    ]
+    # Rows with missing/invalid dates never match a date range
+    ticket_filter.date_range("created_at", *date_filter)
+
+if ticket_filter.is_empty():
+    filtered_df = df.copy()
+else:
+    filtered_df = ITTicket.get_filtered(conn, ticket_filter)
+    # Same ordering as the unfiltered table
+    filtered_df["ticket_id"] = filtered_df["ticket_id"].astype(str)
+    filtered_df = filtered_df.sort_values(by="ticket_id", ascending=True).reset_index(
+        drop=True
+    )
+# created_at arrives as datetime64 (read from the generated created_at_ms column)
+
+# =====================================================
+# DESCRIPTION SEARCH (full-text index, ranked with snippets)
+# =====================================================
+from app.components.description_search import DescriptionSearchBox
+
+with st.expander("🔎 Search Ticket Descriptions", expanded=False):
+    DescriptionSearchBox("tickets", "it_tickets").render(conn)
 
 # =====================================================
 # DATA MANAGEMENT & AI ASSISTANT
 # =====================================================
 from app.components.data_manager import DataManager
+from app.data.bulk import CONFLICT_POLICIES
+from app.data.ids import new_id
 from app.services.ai_assistant import ai_assistant
 
 # Initialize data manager - get expected columns from actual data
@@ -387,7 +402,11 @@ def insert_ticket_from_row(conn, **row_dict):
 
 
 data_manager = DataManager(
-    "it_tickets", expected_columns, conn=conn, insert_func=insert_ticket_from_row
+    "it_tickets",
+    expected_columns,
+    conn=conn,
+    insert_func=insert_ticket_from_row,
+    bulk_insert_func=ITTicket.bulk_insert,
 )
 
 # Get all data sources
@@ -395,42 +414,15 @@ matching_data = data_manager.get_matching_data()
 unmatching_data = data_manager.get_unmatching_data()
 manual_data = data_manager.get_manual_data()
 
-# IMPORTANT: Combine with FULL data (not filtered_df) first, so manual rows are included
-# Then apply filters to the combined dataset
-combined_data = data_manager.combine_with_original(df)
-
-# Parse created_at in combined data (for manual/matching data that might not be parsed)
-if "created_at" in combined_data.columns:
-    combined_data["created_at"] = pd.to_datetime(
-        combined_data["created_at"], errors="coerce"
-    )
-
-# Apply filters to combined data (so charts include manual/uploaded data)
-filtered_combined = combined_data.copy()
-
-if priority_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["priority"].isin(priority_filter)
-    ]
-
-if status_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["status"].isin(status_filter)
-    ]
-
-if assigned_filter:
-    filtered_combined = filtered_combined[
-        filtered_combined["assigned_to"].isin(assigned_filter)
-    ]
+# Combine the filtered database rows with session (manual/uploaded) rows that
+# pass the same filter, so charts include manual/uploaded data
+filtered_combined = data_manager.combine_with_original(
+    filtered_df, row_filter=ticket_filter
+)
 
-if len(date_filter) == 2:
-    start, end = date_filter
-    # Filter by date, excluding rows with invalid dates (NaT)
-    filtered_combined = filtered_combined[
-        (filtered_combined["created_at"].notna())
-        & (filtered_combined["created_at"] >= pd.to_datetime(start))
-        & (filtered_combined["created_at"] <= pd.to_datetime(end))
-    ]
+# Parse created_at of the session rows (database rows are already datetime64)
+if "created_at" in filtered_combined.columns:
+    filtered_combined["created_at"] = to_datetime64(filtered_combined["created_at"])
 
 # Save the original filtered database data length for deletion logic
 original_filtered_db_len = len(filtered_df)
@@ -462,79 +454,20 @@ with tab1:
             use_container_width=True,
             height=500,
             num_rows="dynamic",
-            key="it_tickets_combined_editor",
-            disabled=["Row #"],
+            key=data_manager.editor_key("it_tickets_combined_editor"),
+            disabled=["Row #", "ticket_id"],
             hide_index=True,
         )
 
-        # Handle row deletions from data editor
-        if "Row #" in edited_df.columns:
-            edited_df_clean = edited_df.drop(columns=["Row #"]).reset_index(drop=True)
-        else:
-            edited_df_clean = edited_df.reset_index(drop=True)
-
-        original_combined_len = len(filtered_combined)
-        current_len = len(edited_df_clean)
-
-        # Track processed deletions to prevent infinite rerun loop
-        deletion_tracking_key = "it_tickets_deletion_tracking"
-        deletion_processed_key = "it_tickets_deletion_processed"
-
-        # Initialize tracking
-        if deletion_tracking_key not in st.session_state:
-            st.session_state[deletion_tracking_key] = original_combined_len
-        if deletion_processed_key not in st.session_state:
-            st.session_state[deletion_processed_key] = False
-
-        # Only process deletion if:
-        # 1. Current length is less than original (deletion detected)
-        # 2. We haven't already processed this deletion (prevent rerun loop)
-        # 3. The tracked length matches the original (ensures we're processing a new deletion)
-        if (
-            current_len < original_combined_len
-            and not st.session_state[deletion_processed_key]
-            and st.session_state[deletion_tracking_key] == original_combined_len
-        ):
-            # Mark deletion as being processed
-            st.session_state[deletion_processed_key] = True
-            st.session_state[deletion_tracking_key] = current_len
-
-            # Rows were deleted - use primary key to identify which rows are manual/matching
-            # Get list of ticket_ids from database
-            db_ticket_ids = set(df["ticket_id"].astype(str).unique())
-
-            # Separate remaining rows into database vs manual/matching
-            remaining_manual_matching = []
-            for idx, row in edited_df_clean.iterrows():
-                ticket_id = str(row.get("ticket_id", ""))
-                # If ticket_id is not in database, it's a manual/matching row
-                if ticket_id not in db_ticket_ids:
-                    remaining_manual_matching.append(row)
-
-            # Convert to DataFrame
-            if remaining_manual_matching:
-                remaining_df = pd.DataFrame(remaining_manual_matching)
-                # Put all remaining in manual (matching data is usually inserted into DB anyway)
-                st.session_state["it_tickets_manual_data"] = remaining_df.reset_index(
-                    drop=True
-                )
-                # Clear matching data
-                st.session_state["it_tickets_matching_data"] = pd.DataFrame()
-            else:
-                # All manual/matching rows deleted
-                st.session_state["it_tickets_matching_data"] = pd.DataFrame()
-                st.session_state["it_tickets_manual_data"] = pd.DataFrame()
-
-            deleted_count = original_combined_len - current_len
-            st.success(f"Deleted {deleted_count} row(s).")
-            # Reset flags before rerun so charts update properly
-            st.session_state[deletion_processed_key] = False
+        # Persist deletions and edits: rows are matched by ticket_id, database
+        # rows are deleted/updated in one transaction and session rows in place
+        deleted_count, edited_count = data_manager.apply_editor_changes(
+            ITTicket.reconciler(), display_data, edited_df
+        )
+        if deleted_count or edited_count:
+            st.success(f"Deleted {deleted_count} row(s), updated {edited_count} row(s).")
             # Rerun once to refresh the display and charts
             st.rerun()
-        elif current_len == original_combined_len:
-            # No deletion detected - reset processing flag and update tracking
-            st.session_state[deletion_processed_key] = False
-            st.session_state[deletion_tracking_key] = original_combined_len
     else:
         st.info("No data available")
 
@@ -659,6 +592,14 @@ with upload_col1:
         "Choose CSV file", type="csv", key="it_tickets_csv_upload"
     )
 
+    # What to do with uploaded rows whose ID already exists in the database
+    conflict_policy = st.selectbox(
+        "If a record already exists",
+        list(CONFLICT_POLICIES),
+        format_func=CONFLICT_POLICIES.get,
+        key="it_tickets_conflict_policy",
+    )
+
     # Track processed files to prevent infinite rerun loop
     processed_files_key = "it_tickets_processed_files"
     if processed_files_key not in st.session_state:
@@ -691,7 +632,13 @@ with upload_col1:
             status_text.info("⏳ Processing CSV file...")
 
             try:
-                success, message = data_manager.handle_csv_upload(uploaded_file)
+                success, message = data_manager.handle_csv_upload(
+                    uploaded_file,
+                    progress_callback=lambda rows, fraction: progress_bar.progress(
+                        int(fraction * 100), text=f"{rows:,} rows processed"
+                    ),
+                    on_conflict=conflict_policy,
+                )
                 progress_bar.progress(100)
                 status_text.empty()
 
@@ -702,7 +649,7 @@ with upload_col1:
                     # Rerun if data was inserted OR if unmatching data was added
                     if (
                         "inserted" in message.lower() and "0" not in message
-                    ) or "unmatching data" in message.lower():
+                    ) or "unmatching data" in message.lower() or "updated" in message.lower():
                         # Clear processing flag BEFORE rerun to prevent stuck state
                         st.session_state[processing_key] = False
                         st.rerun()
@@ -783,7 +730,7 @@ with upload_col2b:
                 "ticket_id": (
                     manual_ticket_id
                     if manual_ticket_id
-                    else f"T{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
+                    else new_id("T")
                 ),
                 "priority": manual_priority,
                 "description": manual_description if manual_description else "",
@@ -800,13 +747,33 @@ with upload_col2b:
 # KPI CARDS
 # =====================================================
 st.markdown("## 📊 Analytics")
+
+# KPIs and charts read pre-aggregated (day, priority, assigned_to, status) counts
+# maintained by triggers, plus the session rows summarized the same way
+ticket_rollup = read_rollup(
+    conn, "it_tickets", ticket_filter, data_manager.get_session_rows(ticket_filter)
+)
+total_tickets = int(ticket_rollup["count"].sum())
+resolution_count = ticket_rollup["resolution_hours_count"].sum()
+avg_resolution_hours = (
+    ticket_rollup["resolution_hours_sum"].sum() / resolution_count
+    if resolution_count
+    else 0
+)
+
+
+def rollup_counts(column):
+    """Total tickets per value of a rollup column, largest first."""
+    return ticket_rollup.groupby(column)["count"].sum().sort_values(ascending=False)
+
+
 c1, c2, c3 = st.columns([1, 1, 1], gap="large")
 
 c1.markdown(
     f"""
 <div class="metric-card">
     <h3>Total Tickets</h3>
-    <div class="metric-value">{len(filtered_combined)}</div>
+    <div class="metric-value">{total_tickets}</div>
 </div>
 """,
     unsafe_allow_html=True,
@@ -816,7 +783,7 @@ c2.markdown(
     f"""
 <div class="metric-card">
     <h3>Open Tickets</h3>
-    <div class="metric-value">{(filtered_combined['status']=='Open').sum()}</div>
+    <div class="metric-value">{int(ticket_rollup.loc[ticket_rollup['status']=='Open', 'count'].sum())}</div>
 </div>
 """,
     unsafe_allow_html=True,
@@ -826,7 +793,7 @@ c3.markdown(
     f"""
 <div class="metric-card">
     <h3>Avg Resolution (hrs)</h3>
-    <div class="metric-value">{round(filtered_combined['resolution_time_hours'].mean(),2) if not filtered_combined.empty else 0}</div>
+    <div class="metric-value">{round(avg_resolution_hours, 2)}</div>
 </div>
 """,
     unsafe_allow_html=True,
@@ -841,7 +808,7 @@ import plotly.graph_objects as go
 neon_colors = ["#FF00FF", "#BB00FF", "#FF33FF", "#FF66FF", "#D400FF"]
 
 # ----------------- Pie chart - Status -----------------
-status_counts = filtered_combined["status"].value_counts()
+status_counts = rollup_counts("status")
 fig_status = go.Figure(
     go.Pie(
         labels=status_counts.index,
@@ -868,7 +835,7 @@ fig_status.update_layout(
 st.plotly_chart(fig_status, use_container_width=True)
 
 # ----------------- Bar chart - Priority -----------------
-priority_counts = filtered_combined.groupby("priority").size().reset_index(name="count")
+priority_counts = rollup_counts("priority").sort_index().reset_index()
 fig_priority = go.Figure()
 for idx, row in priority_counts.iterrows():
     fig_priority.add_trace(
@@ -898,10 +865,9 @@ st.plotly_chart(fig_priority, use_container_width=True)
 
 # ----------------- Line chart - Tickets over time -----------------
 time_counts = (
-    filtered_combined.groupby(filtered_combined["created_at"].dt.date)
-    .size()
-    .reset_index(name="count")
+    rollup_counts("day").sort_index().reset_index().rename(columns={"day": "created_at"})
 )
+time_counts["created_at"] = pd.to_datetime(time_counts["created_at"]).dt.date
 fig_time = go.Figure()
 fig_time.add_trace(
     go.Scatter(
@@ -960,7 +926,7 @@ if not filtered_combined.empty:
 
     # ------------------ FUNNEL CHART: Priority Flow ------------------
     priority_order = ["Low", "Medium", "High", "Critical"]
-    priority_counts = filtered_combined["priority"].value_counts()
+    priority_counts = rollup_counts("priority")
     funnel_priority = [
         priority_counts.get(pri, 0)
         for pri in priority_order
@@ -1003,11 +969,7 @@ if not filtered_combined.empty:
         )
 
     # ------------------ GAUGE: Average Resolution Time ------------------
-    avg_resolution = (
-        filtered_combined["resolution_time_hours"].mean()
-        if not filtered_combined.empty
-        else 0
-    )
+    avg_resolution = avg_resolution_hours
     max_resolution = (
         filtered_combined["resolution_time_hours"].max()
         if not filtered_combined.empty
@@ -1061,14 +1023,12 @@ if not filtered_combined.empty:
         and "priority" in filtered_combined.columns
     ):
         radar_data = (
-            filtered_combined.groupby(["assigned_to", "priority"])
-            .size()
-            .reset_index(name="count")
+            ticket_rollup.groupby(["assigned_to", "priority"])["count"]
+            .sum()
+            .reset_index()
         )
         if not radar_data.empty:
-            top_assignees = (
-                filtered_combined["assigned_to"].value_counts().head(5).index.tolist()
-            )
+            top_assignees = rollup_counts("assigned_to").head(5).index.tolist()
             priority_levels = ["Low", "Medium", "High", "Critical"]
 
             fig_radar = go.Figure()
@@ -1131,7 +1091,7 @@ if not filtered_combined.empty:
 
     # ------------------ WATERFALL CHART: Status Changes ------------------
     status_order_waterfall = ["Open", "In Progress", "Resolved"]
-    status_counts_waterfall = filtered_combined["status"].value_counts()
+    status_counts_waterfall = rollup_counts("status")
     waterfall_values = []
     waterfall_labels = []
     cumulative = 0
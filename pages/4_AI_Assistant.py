@@ -10,7 +10,6 @@ import pandas as pd
 import google.generativeai as genai
 import time
 import sys
-import re
 from pathlib import Path
 from streamlit.components.v1 import html
 
@@ -22,6 +21,11 @@ from app.data.db import connect_database
 from app.data.incidents import get_all_incidents
 from app.data.tickets import get_all_tickets
 from app.data.datasets import Dataset
+from app.data.llm_cache import response_cache
+from app.components.pending_reply import PendingReply
+from app.services.llm_executor import submit_request
+from app.services.prompt_budget import DEFAULT_TOKEN_BUDGET, ContextBudgeter
+from app.services.retrieval import relevant_rows
 
 # Render sidebar with user profile and navigation
 render_sidebar()
@@ -353,7 +357,7 @@ html(
 # GEMINI SETUP
 # =====================================================
 genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-model_default = genai.GenerativeModel("gemini-2.0-flash")
+DEFAULT_MODEL = "gemini-2.0-flash"
 
 # =====================================================
 # NEON THEME STYLING
@@ -545,10 +549,75 @@ for msg in chat_history:
         f"<div class='{css_class}'>{msg['content']}</div>", unsafe_allow_html=True
     )
 
+# =====================================================
+# GEMINI REQUESTS (background executor; replies are polled, never awaited)
+# =====================================================
+pending_reply = PendingReply(f"assistant_pending_{user_role}")
+
+
+def ask_gemini(prompt, question, line_break="\n"):
+    """
+    Answer a prompt from the response cache, or queue it for Gemini.
+
+    Args:
+        prompt: Prompt text
+        question: User question the prompt answers
+        line_break: Line break used in the reply (<br> for HTML-formatted replies)
+    """
+    # Same question about the same data: answer from the response cache
+    started = time.perf_counter()
+    cache_key = response_cache.key(DEFAULT_MODEL, None, question, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        st.markdown(f"<div class='bubble-ai'>{cached}</div>", unsafe_allow_html=True)
+        latency = {"cached": True, "total_seconds": time.perf_counter() - started}
+        chat_history.append({"role": "assistant", "content": cached, "latency": latency})
+        return
+
+    request = submit_request(st.secrets["GEMINI_API_KEY"], DEFAULT_MODEL, prompt)
+    pending_reply.start(request, cache_key=cache_key, line_break=line_break)
+
+
+def finish_reply(request, context):
+    """
+    Add a finished Gemini request to the chat as the assistant's reply.
+
+    Args:
+        request: Finished LLMRequest
+        context: Values given to pending_reply.start()
+    """
+    br = context["line_break"]
+    if request.status == "done":
+        text = request.text.replace("\n", br)
+        response_cache.put(context["cache_key"], DEFAULT_MODEL, text)
+    elif request.text:
+        # Part of the answer arrived before the error: keep it
+        text = (
+            request.text.replace("\n", br)
+            + f"{br}{br}⚠️ Response interrupted: {str(request.error)[:200]}"
+        )
+    elif request.quota_exhausted:
+        text = (
+            f"⚠️ **Quota Exceeded**{br}{br}"
+            f"Your Gemini API quota has been exceeded. Please:{br}"
+            f"1. Wait a few minutes and try again{br}"
+            f"2. Check your API usage at: https://ai.dev/usage?tab=rate-limit{br}"
+            f"3. Consider upgrading your API plan if needed"
+        )
+    else:
+        text = f"⚠️ AI Error: {str(request.error)[:200]}"
+
+    reply = {"role": "assistant", "content": text}
+    if request.metrics is not None:
+        reply["latency"] = request.metrics
+    chat_history.append(reply)
+
+
 # =====================================================
 # USER INPUT
 # =====================================================
-user_q = st.chat_input("Ask me anything:")
+# No new question while a reply is still on its way
+user_q = st.chat_input("Ask me anything:", disabled=pending_reply.is_pending())
 
 if user_q:
     chat_history.append({"role": "user", "content": user_q})
@@ -565,7 +634,6 @@ if user_q:
         # Map topic to the key in data_context
         topic_key = topic  # incidents, tickets, or datasets
         context_data = data_context.get(topic_key) if topic != "general" else None
-        clean_output = ""
 
         # -------------------
         # ROW-SPECIFIC REQUEST
@@ -625,97 +693,27 @@ A concise paragraph summarizing this {entity_name.lower()} using the exact data
 
 User question: {user_q}
 """
-            # Retry logic for quota errors
-            max_retries = 3
-            retry_delay = 15  # Start with 15 seconds
-            clean_output = None
-
-            for attempt in range(max_retries):
-                try:
-                    response = model_default.generate_content(prompt)
-                    clean_output = response.text.replace("\n", "<br>")
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    error_str = str(e)
-
-                    # Check if it's a quota error (429)
-                    if (
-                        "429" in error_str
-                        or "quota" in error_str.lower()
-                        or "Quota exceeded" in error_str
-                        or "ResourceExhausted" in error_str
-                    ):
-                        if attempt < max_retries - 1:  # Not the last attempt
-                            # Extract retry delay from error if available
-                            retry_match = re.search(
-                                r"retry.*?(\d+\.?\d*)\s*[sS]", error_str
-                            )
-                            if retry_match:
-                                retry_delay = (
-                                    int(float(retry_match.group(1))) + 2
-                                )  # Add 2 seconds buffer
-
-                            # Show user-friendly message
-                            wait_msg = f"⏳ Quota limit reached. Waiting {retry_delay} seconds before retry {attempt + 1}/{max_retries}..."
-                            placeholder = st.empty()
-                            placeholder.info(wait_msg)
-                            time.sleep(retry_delay)
-                            placeholder.empty()
-
-                            # Exponential backoff for next retry
-                            retry_delay = min(retry_delay * 2, 120)  # Cap at 2 minutes
-                        else:
-                            # Last attempt failed
-                            clean_output = (
-                                f"⚠️ **Quota Exceeded**<br><br>"
-                                f"Your Gemini API quota has been exceeded. Please:<br>"
-                                f"1. Wait a few minutes and try again<br>"
-                                f"2. Check your API usage at: https://ai.dev/usage?tab=rate-limit<br>"
-                                f"3. Consider upgrading your API plan if needed"
-                            )
-                            break
-                    else:
-                        # Non-quota error, don't retry
-                        clean_output = f"⚠️ AI Error: {str(e)[:200]}"
-                        break
-
-            if clean_output is None:
-                clean_output = "⚠️ Failed to get AI response after multiple attempts."
-
-            st.markdown(
-                f"<div class='bubble-ai'>{clean_output}</div>", unsafe_allow_html=True
-            )
-            chat_history.append({"role": "assistant", "content": clean_output})
+            ask_gemini(prompt, user_q, line_break="<br>")
 
         # -------------------
         # GENERAL REQUEST
         # -------------------
         else:
-            context_text = ""
-            if context_data is not None:
-                try:
-                    if isinstance(context_data, pd.DataFrame):
-                        context_text = context_data.to_json(orient="records")
-                    elif isinstance(context_data, dict):
-                        context_text = str(context_data)
-                    else:
-                        context_text = str(context_data)
-                except:
-                    context_text = ""
             with st.spinner("Thinking..."):
                 # Build context based on topic
                 role_context = ""
                 if topic != "general" and context_data is not None:
                     try:
                         if isinstance(context_data, pd.DataFrame):
-                            # Provide summary statistics and sample data
-                            summary = f"""
-Database Summary:
-- Total records: {len(context_data)}
-- Columns: {', '.join(context_data.columns.tolist())}
-- Sample data (first 5 rows): {context_data.head().to_dict(orient='records')}
-"""
-                            role_context = summary
+                            # Size, column aggregates and the records most relevant
+                            # to the question (an even sample if none match)
+                            focus = relevant_rows(context_data, user_q)
+                            role_context = ContextBudgeter(DEFAULT_TOKEN_BUDGET).frame_context(
+                                context_data,
+                                label="Database",
+                                focus=focus,
+                                spread=len(focus) == 0,
+                            )
                         else:
                             role_context = str(context_data)
                     except Exception as e:
@@ -750,83 +748,13 @@ Use the following database information to answer the question accurately:
 Provide a clear, helpful answer based on the data. If the data doesn't contain enough information, say so and provide what you can from the available data.
 """
 
-                # Retry logic for quota errors
-                max_retries = 3
-                retry_delay = 15  # Start with 15 seconds
-                ai_text = None
-
-                for attempt in range(max_retries):
-                    try:
-                        response = model_default.generate_content(prompt)
-                        ai_text = response.text
-                        break  # Success, exit retry loop
-                    except Exception as e:
-                        error_str = str(e)
-
-                        # Check if it's a quota error (429)
-                        if (
-                            "429" in error_str
-                            or "quota" in error_str.lower()
-                            or "Quota exceeded" in error_str
-                            or "ResourceExhausted" in error_str
-                        ):
-                            if attempt < max_retries - 1:  # Not the last attempt
-                                # Extract retry delay from error if available
-                                retry_match = re.search(
-                                    r"retry.*?(\d+\.?\d*)\s*[sS]", error_str
-                                )
-                                if retry_match:
-                                    retry_delay = (
-                                        int(float(retry_match.group(1))) + 2
-                                    )  # Add 2 seconds buffer
-
-                                # Show user-friendly message
-                                wait_msg = f"⏳ Quota limit reached. Waiting {retry_delay} seconds before retry {attempt + 1}/{max_retries}..."
-                                placeholder = st.empty()
-                                placeholder.info(wait_msg)
-                                time.sleep(retry_delay)
-                                placeholder.empty()
-
-                                # Exponential backoff for next retry
-                                retry_delay = min(
-                                    retry_delay * 2, 120
-                                )  # Cap at 2 minutes
-                            else:
-                                # Last attempt failed
-                                ai_text = (
-                                    f"⚠️ **Quota Exceeded**\n\n"
-                                    f"Your Gemini API quota has been exceeded. Please:\n"
-                                    f"1. Wait a few minutes and try again\n"
-                                    f"2. Check your API usage at: https://ai.dev/usage?tab=rate-limit\n"
-                                    f"3. Consider upgrading your API plan if needed"
-                                )
-                                break
-                        else:
-                            # Non-quota error, don't retry
-                            ai_text = f"⚠️ AI Error: {str(e)[:200]}"
-                            break
-
-                if ai_text is None:
-                    ai_text = "⚠️ Failed to get AI response after multiple attempts."
-
-                # Streaming effect
-                full_output = ""
-                placeholder = st.empty()
-                for word in ai_text.split():
-                    full_output += word + " "
-                    placeholder.markdown(
-                        f"<div class='bubble-ai'>{full_output}<span class='typing-cursor'></span></div>",
-                        unsafe_allow_html=True,
-                    )
-                    time.sleep(0.02)
-                placeholder.markdown(
-                    f"<div class='bubble-ai'>{full_output}</div>",
-                    unsafe_allow_html=True,
-                )
-                chat_history.append({"role": "assistant", "content": full_output})
+                ask_gemini(prompt, user_q)
 
     st.session_state[f"assistant_chat_{user_role}"] = chat_history
 
+# Reply still being generated (streams in without blocking the page)
+pending_reply.render(finish_reply)
+
 # =====================================================
 # CLEAR CHAT BUTTON
 # =====================================================